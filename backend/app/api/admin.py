@@ -0,0 +1,47 @@
+"""
+Admin API endpoints
+"""
+
+import hmac
+import os
+from fastapi import APIRouter, HTTPException, Depends, Header
+from typing import Optional
+from app.services.database_loader import DatabaseLoader
+
+router = APIRouter()
+
+_database_loader = None
+
+def set_dependencies(database_loader: DatabaseLoader, ai_processor):
+    """Set dependencies from main.py"""
+    global _database_loader
+    _database_loader = database_loader
+
+def get_database_loader():
+    """Dependency to get database loader"""
+    if _database_loader is None:
+        raise HTTPException(status_code=503, detail="Database loader not initialized")
+    return _database_loader
+
+def verify_admin_token(x_admin_token: Optional[str] = Header(None)):
+    """Require the X-Admin-Token header; admin endpoints are disabled until ADMIN_TOKEN is configured"""
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=503, detail="Admin endpoints disabled: ADMIN_TOKEN is not configured")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token.encode('utf-8'), expected.encode('utf-8')):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.post("/admin/reload", dependencies=[Depends(verify_admin_token)])
+async def reload_requirements_database(db_loader: DatabaseLoader = Depends(get_database_loader)):
+    """
+    Reload requirements.json without restarting the API
+    
+    The new file is parsed, validated and indexed off the event loop and then
+    swapped in atomically. In-flight requests finish on the previous version.
+    """
+    try:
+        return await db_loader.reload()
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Requirements database not found at: {db_loader.db_path}")
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid requirements database: {str(e)}")
@@ -0,0 +1,111 @@
+"""
+Analytics API endpoints - aggregates over survey history
+"""
+
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from app.api.admin import verify_admin_token
+from app.services.analytics_store import AnalyticsStore, TIME_INTERVALS
+
+router = APIRouter(dependencies=[Depends(verify_admin_token)])
+
+_analytics_store = None
+
+def set_dependencies(database_loader, ai_processor, analytics_store: AnalyticsStore = None):
+    """Set dependencies from main.py"""
+    global _analytics_store
+    _analytics_store = analytics_store
+
+def get_analytics_store():
+    """Dependency to get the analytics store"""
+    if _analytics_store is None:
+        raise HTTPException(status_code=503, detail="Analytics store not initialized")
+    return _analytics_store
+
+def survey_filters(
+    since: Optional[str] = Query(None, description="ISO date/time, inclusive"),
+    until: Optional[str] = Query(None, description="ISO date/time, exclusive"),
+    min_size: Optional[float] = None,
+    max_size: Optional[float] = None,
+    min_people: Optional[int] = None,
+    max_people: Optional[int] = None,
+    uses_gas: Optional[bool] = None,
+    has_delivery: Optional[bool] = None,
+    serves_meat: Optional[bool] = None,
+    kind: Optional[str] = Query(None, description="survey or batch"),
+    database_version: Optional[str] = None,
+    business_type: Optional[str] = Query(None, description="Business type (database partition), e.g. food")
+):
+    """Filters shared by every analytics endpoint"""
+    return {
+        'since': since,
+        'until': until,
+        'min_size': min_size,
+        'max_size': max_size,
+        'min_people': min_people,
+        'max_people': max_people,
+        'uses_gas': uses_gas,
+        'has_delivery': has_delivery,
+        'serves_meat': serves_meat,
+        'kind': kind,
+        'database_version': database_version,
+        'business_type': business_type.strip().lower() if business_type else None
+    }
+
+def _active(filters: dict):
+    return {name: value for name, value in filters.items() if value is not None}
+
+@router.get("/analytics/summary")
+async def get_summary(
+    filters: dict = Depends(survey_filters),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Survey totals, averages and feature counts"""
+    # SQLite calls run off the event loop
+    summary = await asyncio.to_thread(store.summary, **filters)
+    return {"summary": summary, "filters": _active(filters)}
+
+@router.get("/analytics/profiles")
+async def get_profile_counts(
+    size_step: float = Query(50, gt=0, description="Size bucket width (m²)"),
+    people_step: int = Query(25, gt=0, description="Capacity bucket width"),
+    filters: dict = Depends(survey_filters),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Survey counts by size bucket, capacity bucket and feature flags"""
+    profiles = await asyncio.to_thread(store.profile_counts, size_step, people_step, **filters)
+    return {"profiles": profiles, "count": len(profiles), "filters": _active(filters)}
+
+@router.get("/analytics/requirements/top")
+async def get_top_requirements(
+    limit: int = Query(20, ge=1, le=500),
+    filters: dict = Depends(survey_filters),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Most frequently matched requirements"""
+    requirements = await asyncio.to_thread(store.top_requirements, limit, **filters)
+    return {"requirements": requirements, "count": len(requirements), "filters": _active(filters)}
+
+@router.get("/analytics/costs")
+async def get_cost_distribution(
+    bucket: float = Query(5000, gt=0, description="Histogram bucket width (₪)"),
+    filters: dict = Depends(survey_filters),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Distribution of estimated total licensing costs"""
+    distribution = await asyncio.to_thread(store.cost_distribution, bucket, **filters)
+    return {"costs": distribution, "filters": _active(filters)}
+
+@router.get("/analytics/timeline")
+async def get_submissions_over_time(
+    interval: str = Query("day", description=f"One of: {', '.join(TIME_INTERVALS)}"),
+    filters: dict = Depends(survey_filters),
+    store: AnalyticsStore = Depends(get_analytics_store)
+):
+    """Survey submissions per time period"""
+    if interval not in TIME_INTERVALS:
+        raise HTTPException(status_code=422, detail=f"interval must be one of: {', '.join(TIME_INTERVALS)}")
+
+    periods = await asyncio.to_thread(store.submissions_over_time, interval, **filters)
+    return {"interval": interval, "periods": periods, "filters": _active(filters)}
@@ -6,17 +6,33 @@ from fastapi import APIRouter, Depends
 from datetime import datetime
 from app.models import HealthCheck
 from app.services.database_loader import DatabaseLoader
+from app.services.result_cache import SurveyResultCache
+from app.services.response_log import SurveyResponseLog
+from app.services.report_renderer import ReportRenderer
+from app.services.report_generator import ai_calls
 
 router = APIRouter()
 
 _database_loader = None
 _ai_processor = None
+_result_cache = None
+_response_log = None
+_report_renderer = None
 
-def set_dependencies(database_loader: DatabaseLoader, ai_processor):
+def set_dependencies(
+    database_loader: DatabaseLoader,
+    ai_processor,
+    result_cache: SurveyResultCache = None,
+    response_log: SurveyResponseLog = None,
+    report_renderer: ReportRenderer = None
+):
     """Set dependencies from main.py"""
-    global _database_loader, _ai_processor
+    global _database_loader, _ai_processor, _result_cache, _response_log, _report_renderer
     _database_loader = database_loader
     _ai_processor = ai_processor
+    _result_cache = result_cache
+    _response_log = response_log
+    _report_renderer = report_renderer
 
 def get_database_loader():
     """Dependency to get database loader"""
@@ -60,8 +76,21 @@ async def detailed_health_check(db_loader: DatabaseLoader = Depends(get_database
                 "status": "healthy" if _ai_processor else "unhealthy",
                 "details": {
                     "initialized": _ai_processor is not None,
-                    "usage_tracker": getattr(_ai_processor, 'usage_tracker', {})
+                    "usage_tracker": getattr(_ai_processor, 'usage_tracker', {}),
+                    "single_flight": ai_calls.get_stats()
                 }
+            },
+            "survey_cache": {
+                "status": "enabled" if _result_cache else "disabled",
+                "details": _result_cache.get_stats() if _result_cache else {}
+            },
+            "response_log": {
+                "status": "enabled" if _response_log else "disabled",
+                "details": _response_log.get_stats() if _response_log else {}
+            },
+            "report_renderer": {
+                "status": "enabled" if _report_renderer else "disabled",
+                "details": _report_renderer.get_stats() if _report_renderer else {}
             }
         },
         "overall_status": "healthy" if all([
@@ -0,0 +1,14 @@
+"""
+Metrics API endpoint - Prometheus scrape target
+"""
+
+from fastapi import APIRouter
+from fastapi.responses import Response
+from app.services.metrics import REGISTRY
+
+router = APIRouter()
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Request, matching, report, AI, persistence and render metrics in the Prometheus text format"""
+    return Response(content=REGISTRY.render(), media_type=REGISTRY.content_type)
@@ -0,0 +1,108 @@
+"""
+Report export API endpoints - PDF and DOCX downloads of generated reports
+"""
+
+import asyncio
+import logging
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import Response
+from app.services.pdf_generator import DOCUMENT_MEDIA_TYPES
+from app.services.report_renderer import ReportRenderer
+from app.services.report_store import ReportStore
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+_report_store = None
+_report_renderer = None
+
+def set_dependencies(
+    database_loader,
+    ai_processor,
+    report_store: ReportStore = None,
+    report_renderer: ReportRenderer = None
+):
+    """Set dependencies from main.py"""
+    global _report_store, _report_renderer
+    _report_store = report_store
+    _report_renderer = report_renderer
+
+def get_report_store():
+    """Dependency to get the generated report store"""
+    if _report_store is None:
+        raise HTTPException(status_code=503, detail="Report store not initialized")
+    return _report_store
+
+def get_report_renderer():
+    """Dependency to get the document renderer"""
+    if _report_renderer is None:
+        raise HTTPException(status_code=503, detail="Report renderer not initialized")
+    return _report_renderer
+
+async def _get_report(report_id: str, store: ReportStore):
+    report = await asyncio.to_thread(store.get, report_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Report not found or expired")
+    return report
+
+@router.get("/report/{report_id}")
+async def get_report(report_id: str, store: ReportStore = Depends(get_report_store)):
+    """Get a generated report and its download links"""
+    report = await _get_report(report_id, store)
+    return {
+        "report_id": report_id,
+        "business_name": report['business_name'],
+        "personalized_report": report['personalized_report'],
+        "created_at": report['created_at'].isoformat(),
+        "downloads": {
+            document_format: f"/api/report/{report_id}/{document_format}"
+            for document_format in DOCUMENT_MEDIA_TYPES
+        }
+    }
+
+@router.get("/report/{report_id}/pdf")
+async def download_report_pdf(
+    report_id: str,
+    request: Request,
+    store: ReportStore = Depends(get_report_store),
+    renderer: ReportRenderer = Depends(get_report_renderer)
+):
+    """Download a generated report as PDF"""
+    return await _download(report_id, "pdf", request, store, renderer)
+
+@router.get("/report/{report_id}/docx")
+async def download_report_docx(
+    report_id: str,
+    request: Request,
+    store: ReportStore = Depends(get_report_store),
+    renderer: ReportRenderer = Depends(get_report_renderer)
+):
+    """Download a generated report as DOCX"""
+    return await _download(report_id, "docx", request, store, renderer)
+
+async def _download(report_id: str, document_format: str, request: Request, store: ReportStore, renderer: ReportRenderer):
+    """Render (or reuse) a report document and return its bytes"""
+    report = await _get_report(report_id, store)
+    generated_at = report['created_at'].strftime('%d/%m/%Y %H:%M')
+
+    # Unchanged content has the same hash, so clients can revalidate without a render
+    etag = f'"{renderer.content_hash(document_format, report["personalized_report"], generated_at)}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
+    try:
+        content, _ = await renderer.render(document_format, report['personalized_report'], generated_at)
+    except Exception as e:
+        logger.error("Document generation error", extra={'format': document_format, 'report_id': report_id, 'error': str(e)})
+        raise HTTPException(status_code=500, detail=f"{document_format.upper()} generation failed: {str(e)}")
+
+    return Response(
+        content=content,
+        media_type=DOCUMENT_MEDIA_TYPES[document_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="business_report_{report_id}.{document_format}"',
+            "ETag": etag,
+            "Cache-Control": "private, max-age=3600"
+        }
+    )
@@ -2,8 +2,10 @@
 Requirements API endpoints
 """
 
-from fastapi import APIRouter, HTTPException, Depends
-from app.models import RequirementsInfo
+import asyncio
+from fastapi import APIRouter, HTTPException, Depends, Query
+from typing import Optional
+from app.models import DEFAULT_BUSINESS_TYPE, RequirementsInfo
 from app.services.database_loader import DatabaseLoader
 
 router = APIRouter()
@@ -21,32 +23,65 @@ def get_database_loader():
         raise HTTPException(status_code=503, detail="Database loader not initialized")
     return _database_loader
 
+def _partition(db_loader: DatabaseLoader, business_type: str):
+    """The business type's partition of the loaded database"""
+    snapshot = db_loader.get_snapshot()
+    partition = snapshot.partition(business_type.strip().lower())
+    if partition is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown business_type '{business_type}'. Available: {', '.join(sorted(snapshot.partitions))}"
+        )
+    return partition
+
 @router.get("/requirements", response_model=RequirementsInfo)
-async def get_requirements_info(db_loader: DatabaseLoader = Depends(get_database_loader)):
-    """Get information about available requirements"""
+async def get_requirements_info(
+    business_type: Optional[str] = Query(None, description="Only this business type (default: all)"),
+    db_loader: DatabaseLoader = Depends(get_database_loader)
+):
+    """Get information about available requirements, over all business types or one"""
     
     if not db_loader or not db_loader.is_loaded():
         raise HTTPException(status_code=503, detail="Requirements database not loaded")
     
     info = db_loader.get_requirements_info()
     
+    if business_type is not None:
+        partition = _partition(db_loader, business_type)
+        figures = info["partitions"][partition.business_type]
+        return RequirementsInfo(
+            total_requirements=figures["total_requirements"],
+            categories=figures["categories"],
+            regulatory_authorities=figures["regulatory_authorities"],
+            last_processed=info["last_processed"],
+            business_types=info["business_types"],
+            business_type=partition.business_type
+        )
+    
     return RequirementsInfo(
         total_requirements=info["total_requirements"],
         categories=info["categories"],
         regulatory_authorities=info["regulatory_authorities"],
-        last_processed=info["last_processed"]
+        last_processed=info["last_processed"],
+        business_types=info["business_types"],
+        partitions=info["partitions"]
     )
 
 @router.get("/requirements/categories")
-async def get_requirements_by_category(db_loader: DatabaseLoader = Depends(get_database_loader)):
-    """Get requirements organized by category"""
+async def get_requirements_by_category(
+    business_type: str = DEFAULT_BUSINESS_TYPE,
+    db_loader: DatabaseLoader = Depends(get_database_loader)
+):
+    """Get a business type's requirements organized by category"""
     
     if not db_loader or not db_loader.is_loaded():
         raise HTTPException(status_code=503, detail="Requirements database not loaded")
     
-    db = db_loader.get_database()
+    partition = _partition(db_loader, business_type)
+    db = partition.data
     
     return {
+        "business_type": partition.business_type,
         "general_requirements": db.get('general_requirements', []),
         "size_specific_requirements": db.get('size_specific_requirements', []),
         "capacity_specific_requirements": db.get('capacity_specific_requirements', []),
@@ -60,6 +95,15 @@ async def get_regulatory_authorities(db_loader: DatabaseLoader = Depends(get_dat
     if not db_loader or not db_loader.is_loaded():
         raise HTTPException(status_code=503, detail="Requirements database not loaded")
     
+    # Corpus databases share one authorities table across business types
+    authorities = db_loader.get_snapshot().authorities
+    if authorities:
+        return {
+            "authorities": [authority['name'] for authority in authorities],
+            "count": len(authorities),
+            "details": authorities
+        }
+    
     info = db_loader.get_requirements_info()
     
     return {
@@ -72,49 +116,40 @@ async def search_requirements(
     query: str = None,
     authority: str = None,
     category: str = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    business_type: str = DEFAULT_BUSINESS_TYPE,
     db_loader: DatabaseLoader = Depends(get_database_loader)
 ):
-    """Search requirements by query, authority, or category"""
+    """Search requirements by query, authority, or category (ranked, paginated)"""
     
     if not db_loader or not db_loader.is_loaded():
         raise HTTPException(status_code=503, detail="Requirements database not loaded")
     
-    db = db_loader.get_database()
+    # One snapshot for the whole request, so a reload cannot mix versions
+    snapshot = _partition(db_loader, business_type)
+    # A binary snapshot builds its search index on the first search, off the event loop
+    search_index = await asyncio.to_thread(lambda: snapshot.search_index)
     
-    # Get all requirements
-    all_requirements = (
-        db.get('general_requirements', []) +
-        db.get('size_specific_requirements', []) +
-        db.get('capacity_specific_requirements', []) +
-        db.get('feature_specific_requirements', [])
-    )
+    page, total = search_index.search(query, authority, category, limit=limit, offset=offset)
     
-    filtered_requirements = []
-    
-    for req in all_requirements:
-        # Filter by authority if specified
-        if authority and authority.lower() not in req.get('authority', '').lower():
-            continue
-            
-        # Filter by category if specified
-        if category and category.lower() not in req.get('category', '').lower():
-            continue
-            
-        # Filter by query if specified (search in name and description)
-        if query:
-            query_lower = query.lower()
-            if (query_lower not in req.get('name', '').lower() and 
-                query_lower not in req.get('description', '').lower()):
-                continue
-        
-        filtered_requirements.append(req)
+    results = []
+    for position, score in page:
+        result = dict(search_index.requirements[position])
+        if score is not None:
+            result["score"] = round(score, 4)
+        results.append(result)
     
     return {
-        "results": filtered_requirements,
-        "count": len(filtered_requirements),
+        "results": results,
+        "count": len(results),
+        "total": total,
+        "limit": limit,
+        "offset": offset,
         "filters": {
             "query": query,
             "authority": authority,
-            "category": category
+            "category": category,
+            "business_type": snapshot.business_type
         }
-    }
\ No newline at end of file
+    }
@@ -3,26 +3,60 @@ Survey API endpoints
 """
 
 import os
-import json
-from fastapi import APIRouter, HTTPException, Depends
+import io
+import csv
+import asyncio
+import hashlib
+import logging
+import time
+import orjson
+from fastapi import APIRouter, HTTPException, Depends, File, Form, Query, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
-from app.models import SurveyRequest, SurveyResponse, RequirementResponse
+from app.models import (
+    SurveyRequest, SurveyResponse, RequirementResponse, RequirementBody,
+    BatchSurveyRequest, BatchSurveyResponse, BatchSurveyResult, BatchProfile, MAX_BATCH_SURVEYS
+)
 from app.services.database_loader import DatabaseLoader
 from app.services.requirements_matcher import RequirementsMatcher
-from app.services.report_generator import ReportGenerator
+from app.services.requirement_payloads import SplicedJSONResponse, splice_json
+from app.services.report_generator import ReportGenerator, get_requirements_catalog
+from app.services.result_cache import SurveyResultCache
+from app.services.response_log import SurveyResponseLog
+from app.services.report_store import ReportStore
+from app.services.template_report import REPORT_MODES
+from app.services.metrics import MATCH_SECONDS, REPORT_SECONDS, set_report_mode, request_labels
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 _database_loader = None
 _ai_processor = None
+_result_cache = None
+_response_log = None
+_report_store = None
+
+# Report mode when the request does not choose one (fast, ai or hybrid)
+DEFAULT_REPORT_MODE = os.getenv("DEFAULT_REPORT_MODE", "ai")
 
-def set_dependencies(database_loader: DatabaseLoader, ai_processor):
+def set_dependencies(
+    database_loader: DatabaseLoader,
+    ai_processor,
+    result_cache: SurveyResultCache = None,
+    response_log: SurveyResponseLog = None,
+    report_store: ReportStore = None
+):
     """Set dependencies from main.py"""
-    global _database_loader, _ai_processor
+    global _database_loader, _ai_processor, _result_cache, _response_log, _report_store
     _database_loader = database_loader
     _ai_processor = ai_processor
+    _result_cache = result_cache
+    _response_log = response_log
+    _report_store = report_store
 
 def get_database_loader():
     """Dependency to get database loader"""
@@ -34,9 +68,25 @@ def get_ai_processor():
     """Dependency to get AI processor"""
     return _ai_processor  
 
+def get_report_mode(
+    report_mode: str = Query(
+        DEFAULT_REPORT_MODE,
+        description="fast: template report without AI, ai: full AI report, hybrid: template report with an AI narrative"
+    )
+):
+    """Dependency to validate the requested report mode"""
+    return _check_report_mode(report_mode)
+
+def _check_report_mode(report_mode: str):
+    if report_mode not in REPORT_MODES:
+        raise HTTPException(status_code=422, detail=f"report_mode must be one of: {', '.join(REPORT_MODES)}")
+    set_report_mode(report_mode)
+    return report_mode
+
 @router.post("/survey/submit", response_model=SurveyResponse)
 async def submit_survey(
     survey_data: SurveyRequest,
+    report_mode: str = Depends(get_report_mode),
     db_loader: DatabaseLoader = Depends(get_database_loader),
     ai_processor = Depends(get_ai_processor)
 ):
@@ -45,6 +95,7 @@ async def submit_survey(
     
     Args:
         survey_data: User's business information
+        report_mode: fast (template, no AI call), ai or hybrid
         
     Returns:
         SurveyResponse: Personalized report with relevant requirements
@@ -58,51 +109,190 @@ async def submit_survey(
         )
     
     try:
-        requirements_db = db_loader.get_database()
+        match = _match_survey(survey_data, db_loader, report_mode)
+        relevant_requirements = match['relevant_requirements']
         
-        # Initialize matcher service
-        matcher = RequirementsMatcher(requirements_db)
+        # Estimates come from values parsed at database load time
+        total_cost_estimate, total_time_estimate = match['snapshot'].report_engine.estimate(relevant_requirements)
         
-        # Filter relevant requirements based on survey data
-        relevant_requirements = matcher.filter_requirements_for_business(survey_data)
+        personalized_report = await _build_report(survey_data, match, ai_processor, report_mode)
         
-        if not relevant_requirements:
-            raise HTTPException(
-                status_code=404,
-                detail="No relevant requirements found for your business profile"
-            )
+        # Log survey response for analytics (queued, written in the background)
+        log_survey_response(
+            survey_data, relevant_requirements, match['version'],
+            total_cost_estimate, total_time_estimate, match['cached'] is not None, report_mode
+        )
         
-        # Initialize report generator
-        report_generator = ReportGenerator(ai_processor)
+        # SurveyResponse body spliced from the requirement JSON serialized at load time;
+        # every part is already validated, so the response model is not rebuilt
+        return SplicedJSONResponse(splice_json({
+            'success': True,
+            'survey_data': survey_data.dict(),
+            'relevant_requirements': match['requirements_json'],
+            'personalized_report': personalized_report,
+            'requirements_count': len(relevant_requirements),
+            'estimated_total_cost': total_cost_estimate,
+            'estimated_total_time': total_time_estimate,
+            'report_mode': report_mode,
+            'report_id': await _save_report(survey_data, personalized_report),
+            'timestamp': datetime.now()
+        }))
         
-        # Generate AI-powered personalized report
-        personalized_report = await report_generator.generate_personalized_report(
-            survey_data, 
-            relevant_requirements
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Survey processing error")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/survey/submit/stream")
+async def submit_survey_stream(
+    survey_data: SurveyRequest,
+    report_mode: str = Depends(get_report_mode),
+    db_loader: DatabaseLoader = Depends(get_database_loader),
+    ai_processor = Depends(get_ai_processor)
+):
+    """
+    Process user survey and stream the personalized report as Server-Sent Events
+    
+    Events:
+        requirements: matched requirements and cost/time estimates (sent first)
+        report_delta: a chunk of the personalized report text (the whole
+            report in one event for fast/hybrid modes and cached reports)
+        done: report finished
+        error: report generation failed mid-stream
+    """
+    
+    # Check if database is loaded
+    if not db_loader or not db_loader.is_loaded():
+        raise HTTPException(
+            status_code=503, 
+            detail="Requirements database not loaded. Please check server logs."
         )
+    
+    # Matching errors are raised before the stream starts, as regular HTTP errors
+    match = _match_survey(survey_data, db_loader, report_mode)
+    relevant_requirements = match['relevant_requirements']
+    cached = match['cached']
+    snapshot = match['snapshot']
+    total_cost_estimate, total_time_estimate = snapshot.report_engine.estimate(relevant_requirements)
+    
+    async def event_stream():
+        yield _sse_event("requirements", splice_json({
+            "survey_data": survey_data.dict(),
+            "relevant_requirements": match['requirements_json'],
+            "requirements_count": len(relevant_requirements),
+            "estimated_total_cost": total_cost_estimate,
+            "estimated_total_time": total_time_estimate,
+            "timestamp": datetime.now().isoformat()
+        }))
         
-        # Calculate estimates 
-        total_cost_estimate = report_generator.calculate_total_cost_estimate(relevant_requirements)
-        total_time_estimate = report_generator.calculate_total_time_estimate(relevant_requirements)
-        
-        # Save survey response for analytics (optional)
-        await save_survey_response(survey_data, relevant_requirements)
+        if report_mode != "ai" or cached:
+            # Template-based and cached reports are sent whole
+            report = await _build_report(survey_data, match, ai_processor, report_mode)
+            yield _sse_event("report_delta", {"text": report})
+        else:
+            report_generator = ReportGenerator(
+                ai_processor, get_requirements_catalog(snapshot), snapshot.report_engine, match['profile_bounds']
+            )
+            report_chunks = []
+            started = time.perf_counter()
+            try:
+                async for text in report_generator.stream_personalized_report(survey_data, relevant_requirements):
+                    report_chunks.append(text)
+                    yield _sse_event("report_delta", {"text": text})
+            except Exception as e:
+                logger.exception("Report streaming error")
+                yield _sse_event("error", {"detail": f"Report generation failed: {str(e)}"})
+                return
+            
+            REPORT_SECONDS.observe(time.perf_counter() - started, **request_labels())
+            report = "".join(report_chunks)
+            if not report_generator.used_fallback:
+                _cache_result(match, personalized_report=report)
         
-        return SurveyResponse(
-            success=True,
-            survey_data=survey_data,
-            relevant_requirements=relevant_requirements,
-            personalized_report=personalized_report,
-            requirements_count=len(relevant_requirements),
-            estimated_total_cost=total_cost_estimate,
-            estimated_total_time=total_time_estimate,
-            timestamp=datetime.now()
+        log_survey_response(
+            survey_data, relevant_requirements, match['version'],
+            total_cost_estimate, total_time_estimate, cached is not None, report_mode
         )
+        yield _sse_event("done", {
+            "success": True,
+            "cached": cached is not None,
+            "report_mode": report_mode,
+            "report_id": await _save_report(survey_data, report)
+        })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.post("/survey/batch", response_model=BatchSurveyResponse)
+async def submit_survey_batch(
+    batch: BatchSurveyRequest,
+    db_loader: DatabaseLoader = Depends(get_database_loader),
+    ai_processor = Depends(get_ai_processor)
+):
+    """
+    Evaluate many business profiles (e.g. franchise branches) in one request
+    
+    Surveys are grouped by profile equivalence class and each class is
+    matched once. Requirement bodies are returned once in `requirements`;
+    each survey result only lists requirement IDs.
+    
+    Args:
+        batch: Surveys, whether to generate reports (one per class) and the report mode
         
+    Returns:
+        BatchSurveyResponse: Per-survey requirement IDs and per-class results
+    """
+    
+    if not db_loader or not db_loader.is_loaded():
+        raise HTTPException(
+            status_code=503, 
+            detail="Requirements database not loaded. Please check server logs."
+        )
+    
+    try:
+        report_mode = _check_report_mode(batch.report_mode or DEFAULT_REPORT_MODE)
+        return await _evaluate_batch(batch.surveys, batch.include_reports, report_mode, db_loader, ai_processor)
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ Survey processing error: {e}")
+        logger.exception("Batch survey processing error")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+@router.post("/survey/batch/csv", response_model=BatchSurveyResponse)
+async def submit_survey_batch_csv(
+    file: UploadFile = File(..., description="CSV with a header row of SurveyRequest fields"),
+    include_reports: bool = Form(False),
+    report_mode: str = Form(DEFAULT_REPORT_MODE),
+    db_loader: DatabaseLoader = Depends(get_database_loader),
+    ai_processor = Depends(get_ai_processor)
+):
+    """
+    Evaluate a CSV upload of business profiles
+    
+    Columns: size, max_people, uses_gas, has_delivery, serves_meat and
+    optionally business_name, location. Boolean cells accept
+    true/false, 1/0, yes/no and כן/לא.
+    """
+    
+    if not db_loader or not db_loader.is_loaded():
+        raise HTTPException(
+            status_code=503, 
+            detail="Requirements database not loaded. Please check server logs."
+        )
+    
+    report_mode = _check_report_mode(report_mode)
+    surveys = _parse_survey_csv(await file.read())
+    
+    try:
+        return await _evaluate_batch(surveys, include_reports, report_mode, db_loader, ai_processor)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Batch survey processing error")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @router.get("/survey/test")
@@ -113,35 +303,313 @@ async def test_survey_endpoint():
         "timestamp": datetime.now().isoformat(),
         "endpoints": {
             "submit": "POST /survey/submit",
+            "submit_stream": "POST /survey/submit/stream",
+            "batch": "POST /survey/batch",
+            "batch_csv": "POST /survey/batch/csv",
             "test": "GET /survey/test"
         }
     }
 
-async def save_survey_response(survey: SurveyRequest, requirements: List[RequirementResponse]):
-    """Save survey response for analytics (optional)"""
-    try:
-        # Create responses directory if it doesn't exist
-        responses_dir = os.path.join("data", "responses")
-        os.makedirs(responses_dir, exist_ok=True)
+def _match_survey(survey: SurveyRequest, db_loader: DatabaseLoader, report_mode: str = "ai"):
+    """Match a survey against the loaded database, consulting the profile cache"""
+    started = time.perf_counter()
+    
+    # One snapshot per request, so a concurrent reload cannot mix versions
+    snapshot = _partition(db_loader.get_snapshot(), survey.business_type)
+    index = snapshot.index
+    matcher = RequirementsMatcher(snapshot.data, index, snapshot.payloads)
+    
+    # Surveys in the same equivalence class share matches and report
+    profile_key = index.profile_key(survey)
+    cache_key = (snapshot.version, snapshot.business_type, profile_key, report_mode)
+    cached = _cached_result(cache_key)
+    
+    mask = cached['mask'] if cached else index.match_profile(profile_key)
+    relevant_requirements = matcher.requirements_for_mask(mask, survey)
+    MATCH_SECONDS.observe(time.perf_counter() - started, **request_labels())
+    
+    if not relevant_requirements:
+        raise HTTPException(
+            status_code=404,
+            detail="No relevant requirements found for your business profile"
+        )
+    
+    return {
+        'snapshot': snapshot,
+        'version': snapshot.version,
+        'cache_key': cache_key,
+        'profile_bounds': index.profile_bounds(profile_key),
+        'mask': mask,
+        'cached': cached,
+        'relevant_requirements': relevant_requirements,
+        'requirements_json': matcher.requirements_json(mask, survey)
+    }
+
+def _partition(snapshot, business_type: str):
+    """The business type's partition of the database (a dict lookup)"""
+    partition = snapshot.partition(business_type)
+    if partition is None:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Unknown business_type '{business_type}'. Available: {', '.join(sorted(snapshot.partitions))}"
+        )
+    return partition
+
+def _cached_result(cache_key: tuple):
+    """Cached AI output for a profile class; fast-mode reports are not cached"""
+    if _result_cache is None or cache_key[-1] == "fast":
+        return None
+    return _result_cache.get(cache_key)
+
+def _cache_result(match: dict, **values):
+    """Store AI output (personalized_report or narrative) for the survey's equivalence class"""
+    if _result_cache:
+        _result_cache.put(match['cache_key'], {'mask': match['mask'], **values})
+
+async def _build_report(survey: SurveyRequest, match: dict, ai_processor, report_mode: str):
+    """
+    Build the personalized report in the requested mode
+    
+    fast renders the template report from the snapshot's pre-rendered
+    fragments; hybrid adds an AI narrative to it (cached per profile class);
+    ai generates the whole report (cached per profile class).
+    """
+    with REPORT_SECONDS.time(**request_labels()):
+        return await _generate_report(survey, match, ai_processor, report_mode)
+
+async def _generate_report(survey: SurveyRequest, match: dict, ai_processor, report_mode: str):
+    """Report of the requested mode, from cache when the profile class has one"""
+    snapshot = match['snapshot']
+    report_engine = snapshot.report_engine
+    requirements = match['relevant_requirements']
+    cached = match['cached']
+    
+    if report_mode == "fast":
+        return report_engine.render(survey, requirements)
+    
+    if cached:
+        if report_mode == "hybrid":
+            return report_engine.render(survey, requirements, cached['narrative'])
+        return cached['personalized_report']
+    
+    # Initialize report generator (catalog = cached prompt prefix); its output is
+    # cached for the profile class, so the prompt describes the class's ranges
+    report_generator = ReportGenerator(ai_processor, get_requirements_catalog(snapshot), report_engine, match['profile_bounds'])
+    
+    if report_mode == "hybrid":
+        narrative = await report_generator.generate_narrative(survey, requirements)
+        if not report_generator.used_fallback:
+            _cache_result(match, narrative=narrative)
+        return report_engine.render(survey, requirements, narrative)
+    
+    personalized_report = await report_generator.generate_personalized_report(survey, requirements)
+    
+    # Fallback reports are not cached so the next request retries the AI
+    if not report_generator.used_fallback:
+        _cache_result(match, personalized_report=personalized_report)
+    return personalized_report
+
+async def _evaluate_batch(surveys: List[SurveyRequest], include_reports: bool, report_mode: str, db_loader: DatabaseLoader, ai_processor):
+    """Match a batch of surveys, one index lookup (and optional report) per profile class"""
+    root = db_loader.get_snapshot()
+    
+    # (business type, profile key) -> indexes of the surveys in that equivalence class
+    classes = {}
+    for i, survey in enumerate(surveys):
+        partition = _partition(root, survey.business_type)
+        classes.setdefault((partition.business_type, partition.index.profile_key(survey)), []).append(i)
+    matchers = {}
+    
+    results = [None] * len(surveys)
+    profiles = []
+    requirements = {}
+    report_jobs = []
+    
+    labels = request_labels()
+    for (business_type, profile_key), survey_indexes in classes.items():
+        started = time.perf_counter()
+        snapshot = root.partition(business_type)
+        if business_type not in matchers:
+            matchers[business_type] = RequirementsMatcher(snapshot.data, snapshot.index, snapshot.payloads)
+        matcher = matchers[business_type]
+        cache_key = (snapshot.version, business_type, profile_key, report_mode)
+        cached = _cached_result(cache_key)
+        mask = cached['mask'] if cached else snapshot.index.match_profile(profile_key)
         
-        # Create response data
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"survey_{timestamp}.json"
+        # Requirements and estimates depend only on the class, not the individual survey
+        representative = surveys[survey_indexes[0]]
+        class_requirements = matcher.requirements_for_mask(mask, representative)
+        MATCH_SECONDS.observe(time.perf_counter() - started, **labels)
+        requirement_ids = [req.id for req in class_requirements]
+        for req in class_requirements:
+            if req.id not in requirements:
+                requirements[req.id] = RequirementBody(**req.dict(exclude={'why_relevant'}))
         
-        response_data = {
-            "timestamp": datetime.now().isoformat(),
-            "survey_data": survey.dict(),
-            "requirements_count": len(requirements),
-            "requirements": [req.dict() for req in requirements]
-        }
+        total_cost_estimate, total_time_estimate = snapshot.report_engine.estimate(class_requirements)
         
-        # Save to file
-        file_path = os.path.join(responses_dir, filename)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(response_data, f, ensure_ascii=False, indent=2)
+        profile = BatchProfile(
+            profile_id=hashlib.sha1(repr((snapshot.version, business_type, profile_key)).encode('utf-8')).hexdigest()[:12],
+            survey_indexes=survey_indexes,
+            requirement_ids=requirement_ids,
+            estimated_total_cost=total_cost_estimate,
+            estimated_total_time=total_time_estimate
+        )
+        profiles.append(profile)
         
-        print(f"📊 Survey response saved: {filename}")
+        if include_reports and class_requirements:
+            match = {
+                'snapshot': snapshot,
+                'cache_key': cache_key,
+                'profile_bounds': snapshot.index.profile_bounds(profile_key),
+                'mask': mask,
+                'cached': cached,
+                'relevant_requirements': class_requirements
+            }
+            report_jobs.append(_generate_class_report(ai_processor, report_mode, profile, match, representative))
         
+        for i in survey_indexes:
+            results[i] = BatchSurveyResult(
+                index=i,
+                business_name=surveys[i].business_name,
+                profile_id=profile.profile_id,
+                requirement_ids=requirement_ids,
+                requirements_count=len(requirement_ids)
+            )
+    
+    # AI calls for uncached classes run concurrently (bounded by the AI semaphore)
+    if report_jobs:
+        await asyncio.gather(*report_jobs)
+    
+    log_batch_response(surveys, results, profiles, root.version)
+    
+    return BatchSurveyResponse(
+        success=True,
+        database_version=root.version,
+        survey_count=len(surveys),
+        profile_count=len(profiles),
+        results=results,
+        profiles=profiles,
+        requirements=requirements,
+        timestamp=datetime.now()
+    )
+
+async def _generate_class_report(ai_processor, report_mode: str, profile: BatchProfile, match: dict, survey: SurveyRequest):
+    """Generate the report for one profile class from its first survey"""
+    profile.personalized_report = await _build_report(survey, match, ai_processor, report_mode)
+    profile.report_id = await _save_report(survey, profile.personalized_report)
+
+async def _save_report(survey: SurveyRequest, personalized_report: str) -> Optional[str]:
+    """Keep a generated report for the PDF/DOCX export endpoints (None if it could not be saved)"""
+    if _report_store is None:
+        return None
+    
+    try:
+        return await asyncio.to_thread(_report_store.put, survey.business_name, personalized_report)
     except Exception as e:
-        print(f"⚠️ Error saving survey response: {e}")
-        # Don't raise error - this shouldn't block the main response
\ No newline at end of file
+        # The report is still returned, only without export links
+        logger.warning("Error saving report", extra={'error': str(e)})
+        return None
+
+CSV_TRUE_VALUES = {'true', '1', 'yes', 'y', 'כן'}
+CSV_FALSE_VALUES = {'false', '0', 'no', 'n', 'לא', ''}
+CSV_BOOLEAN_FIELDS = ('uses_gas', 'has_delivery', 'serves_meat')
+
+def _parse_survey_csv(content: bytes) -> List[SurveyRequest]:
+    """Parse and validate a CSV upload, reporting every invalid row"""
+    try:
+        text = content.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=422, detail="CSV file must be UTF-8 encoded")
+    
+    reader = csv.DictReader(io.StringIO(text))
+    columns = {name.strip() for name in reader.fieldnames or []}
+    missing = [name for name in ('size', 'max_people') + CSV_BOOLEAN_FIELDS if name not in columns]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"CSV is missing columns: {', '.join(missing)}")
+    
+    surveys = []
+    errors = []
+    for row_number, row in enumerate(reader, start=2):
+        data = {key.strip(): (value or '').strip() or None for key, value in row.items() if key}
+        # Optional column; empty cells fall back to the default business type
+        if data.get('business_type') is None:
+            data.pop('business_type', None)
+        for field in CSV_BOOLEAN_FIELDS:
+            value = (data.get(field) or '').lower()
+            if value in CSV_TRUE_VALUES:
+                data[field] = True
+            elif value in CSV_FALSE_VALUES:
+                data[field] = False
+        
+        try:
+            surveys.append(SurveyRequest(**data))
+        except ValidationError as e:
+            errors.append({
+                "row": row_number,
+                "errors": [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()]
+            })
+    
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Invalid CSV rows", "rows": errors[:50]})
+    if not surveys:
+        raise HTTPException(status_code=422, detail="CSV contains no survey rows")
+    if len(surveys) > MAX_BATCH_SURVEYS:
+        raise HTTPException(status_code=422, detail=f"Batch is limited to {MAX_BATCH_SURVEYS} surveys")
+    
+    return surveys
+
+def _sse_event(event: str, data):
+    """Format a Server-Sent Event (data is a dict or already serialized JSON bytes)"""
+    payload = data if isinstance(data, bytes) else orjson.dumps(data)
+    return b"event: " + event.encode('utf-8') + b"\ndata: " + payload + b"\n\n"
+
+def log_survey_response(
+    survey: SurveyRequest,
+    requirements: List[RequirementResponse],
+    database_version: str,
+    estimated_total_cost: str = None,
+    estimated_total_time: str = None,
+    cached: bool = False,
+    report_mode: str = None
+):
+    """Queue a survey response record for analytics (optional)"""
+    if _response_log is None:
+        return
+    
+    # Requirement bodies are in the versioned database; only IDs are logged
+    _response_log.record({
+        "timestamp": datetime.now().isoformat(),
+        "kind": "survey",
+        "database_version": database_version,
+        "survey_data": survey.dict(),
+        "requirement_ids": [req.id for req in requirements],
+        "estimated_total_cost": estimated_total_cost,
+        "estimated_total_time": estimated_total_time,
+        "cached": cached,
+        "report_mode": report_mode
+    })
+
+def log_batch_response(surveys: List[SurveyRequest], results: List[BatchSurveyResult], profiles: List[BatchProfile], database_version: str):
+    """Queue one analytics record per survey of a batch (optional)"""
+    if _response_log is None:
+        return
+    
+    profiles_by_id = {profile.profile_id: profile for profile in profiles}
+    
+    timestamp = datetime.now().isoformat()
+    batch_id = hashlib.sha1(f"{timestamp}:{id(surveys)}".encode('utf-8')).hexdigest()[:12]
+    for survey, result in zip(surveys, results):
+        profile = profiles_by_id[result.profile_id]
+        _response_log.record({
+            "timestamp": timestamp,
+            "kind": "batch",
+            "batch_id": batch_id,
+            # Position in the batch: identical branch surveys stay distinct records
+            "batch_index": result.index,
+            "database_version": database_version,
+            "survey_data": survey.dict(),
+            "requirement_ids": result.requirement_ids,
+            "profile_id": result.profile_id,
+            "estimated_total_cost": profile.estimated_total_cost,
+            "estimated_total_time": profile.estimated_total_time
+        })
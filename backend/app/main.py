@@ -5,16 +5,29 @@ Clean, organized structure for Business Licensing AI System
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 import uvicorn
+import asyncio
+import logging
 import sys
 import os
-from app.api import health, survey, requirements
-from app.services.database_loader import DatabaseLoader
+from app.api import health, survey, requirements, admin, analytics, report, metrics
+from app.services.database_loader import DatabaseLoader, BACKEND_DIR
+from app.services.result_cache import SurveyResultCache
+from app.services.response_log import SurveyResponseLog
+from app.services.analytics_store import AnalyticsStore
+from app.services.report_store import ReportStore
+from app.services.report_renderer import ReportRenderer
+from app.services.metrics import MetricsMiddleware
+from app.utils.logging_config import configure_logging
 from document_processor import ComprehensiveDocumentProcessor
 
 # Add parent directory to path for document_processor import
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+configure_logging()
+logger = logging.getLogger(__name__)
+
 # Global application state
 app_state = {}
 
@@ -40,58 +53,144 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request latency histograms for GET /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Include API routers
 app.include_router(health.router, prefix="/api", tags=["Health"])
 app.include_router(survey.router, prefix="/api", tags=["Survey"])
 app.include_router(requirements.router, prefix="/api", tags=["Requirements"])
+app.include_router(admin.router, prefix="/api", tags=["Admin"])
+app.include_router(analytics.router, prefix="/api", tags=["Analytics"])
+app.include_router(report.router, prefix="/api", tags=["Report"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on application startup"""
-    print("🚀 Starting Business Licensing AI API...")
+    logger.info("Starting Business Licensing AI API")
     
     # Initialize database loader
-    print("📄 Loading requirements database...")
     app_state['database_loader'] = DatabaseLoader()
     db_result = await app_state['database_loader'].load_requirements_database()
     
     if db_result:
         info = app_state['database_loader'].get_requirements_info()
-        print(f"✅ Database loaded: {info['total_requirements']} requirements")
+        logger.info("Database loaded", extra={'requirements': info['total_requirements']})
     else:
-        print("⚠️ Database loading failed")
+        logger.warning("Database loading failed")
     
     # Initialize AI processor
-    print("🤖 Initializing AI processor...")
     try:
         app_state['ai_processor'] = ComprehensiveDocumentProcessor()
-        print("✅ AI processor initialized")
+        logger.info("AI processor initialized")
     except Exception as e:
-        print(f"⚠️ AI processor initialization failed: {e}")
+        logger.warning("AI processor initialization failed", extra={'error': str(e)})
         app_state['ai_processor'] = None
     
-    health.set_dependencies(app_state['database_loader'], app_state['ai_processor'])
-    survey.set_dependencies(app_state['database_loader'], app_state['ai_processor'])
+    # Survey profile cache (matched requirements + personalized report)
+    app_state['result_cache'] = SurveyResultCache(
+        max_entries=int(os.getenv("SURVEY_CACHE_MAX_ENTRIES", "256")),
+        ttl_seconds=float(os.getenv("SURVEY_CACHE_TTL_SECONDS", "3600"))
+    )
+    
+    # Results of older database versions can never be hit again
+    app_state['database_loader'].add_reload_listener(lambda snapshot: app_state['result_cache'].clear())
+    
+    # Append-only analytics log, written by a background task
+    app_state['response_log'] = SurveyResponseLog(
+        log_dir=os.getenv("RESPONSE_LOG_DIR", os.path.join(BACKEND_DIR, "data", "responses")),
+        max_batch=int(os.getenv("RESPONSE_LOG_BATCH_SIZE", "100")),
+        flush_interval=float(os.getenv("RESPONSE_LOG_FLUSH_SECONDS", "2")),
+        max_file_bytes=int(float(os.getenv("RESPONSE_LOG_MAX_MB", "50")) * 1024 * 1024)
+    )
+    
+    # SQLite analytics store, fed from the response log's background writer
+    try:
+        app_state['analytics_store'] = AnalyticsStore(
+            os.getenv("ANALYTICS_DB_PATH", os.path.join(BACKEND_DIR, "data", "analytics.sqlite3"))
+        )
+        app_state['response_log'].add_sink(app_state['analytics_store'].insert_records)
+    except Exception as e:
+        logger.warning("Analytics store initialization failed", extra={'error': str(e)})
+        app_state['analytics_store'] = None
+    app_state['response_log'].start()
+    
+    # Generated reports (by content hash) for PDF/DOCX export, shared by all server
+    # processes through one SQLite file; rendered in worker processes
+    app_state['report_store'] = ReportStore(
+        os.getenv("REPORT_STORE_PATH", os.path.join(BACKEND_DIR, "data", "reports.sqlite3")),
+        max_entries=int(os.getenv("REPORT_STORE_MAX_ENTRIES", "1000")),
+        ttl_seconds=float(os.getenv("REPORT_STORE_TTL_SECONDS", "86400"))
+    )
+    render_workers = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+    app_state['report_renderer'] = ReportRenderer(
+        max_workers=render_workers,
+        max_concurrent=int(os.getenv("REPORT_RENDER_MAX_CONCURRENT", str(render_workers))),
+        cache_entries=int(os.getenv("REPORT_RENDER_CACHE_ENTRIES", "64"))
+    )
+    
+    health.set_dependencies(
+        app_state['database_loader'], app_state['ai_processor'],
+        app_state['result_cache'], app_state['response_log'], app_state['report_renderer']
+    )
+    survey.set_dependencies(
+        app_state['database_loader'], app_state['ai_processor'],
+        app_state['result_cache'], app_state['response_log'], app_state['report_store']
+    )
     requirements.set_dependencies(app_state['database_loader'], app_state['ai_processor'])
+    admin.set_dependencies(app_state['database_loader'], app_state['ai_processor'])
+    analytics.set_dependencies(app_state['database_loader'], app_state['ai_processor'], app_state['analytics_store'])
+    report.set_dependencies(app_state['database_loader'], app_state['ai_processor'], app_state['report_store'], app_state['report_renderer'])
+    
+    # Optional hot reload when requirements.json changes on disk
+    watch_interval = float(os.getenv("DB_WATCH_INTERVAL_SECONDS", "0"))
+    if watch_interval > 0:
+        app_state['database_watcher'] = asyncio.create_task(app_state['database_loader'].watch(watch_interval))
+        logger.info("Watching requirements database for changes", extra={'interval_seconds': watch_interval})
 
-    print("✅ API startup complete")
-    print("📖 API Documentation available at: http://localhost:8000/docs")
+    logger.info("API startup complete", extra={'docs': "http://localhost:8000/docs", 'metrics': "http://localhost:8000/metrics"})
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on application shutdown"""
-    print("🛑 Shutting down Business Licensing AI API...")
+    logger.info("Shutting down Business Licensing AI API")
     
-    # Print final usage statistics if AI processor exists
+    watcher = app_state.get('database_watcher')
+    if watcher:
+        watcher.cancel()
+    
+    # Write out analytics records still buffered
+    response_log = app_state.get('response_log')
+    if response_log:
+        await response_log.stop()
+    
+    analytics_store = app_state.get('analytics_store')
+    if analytics_store:
+        analytics_store.close()
+    
+    report_store = app_state.get('report_store')
+    if report_store:
+        report_store.close()
+    
+    report_renderer = app_state.get('report_renderer')
+    if report_renderer:
+        report_renderer.shutdown()
+    
+    # Log final usage statistics if AI processor exists
     ai_processor = app_state.get('ai_processor')
     if ai_processor and hasattr(ai_processor, 'usage_tracker'):
         usage = ai_processor.usage_tracker
-        print(f"📊 Final API Usage:")
-        print(f"   • Total Calls: {usage.get('total_calls', 0)}")
-        print(f"   • Total Cost: ${usage.get('total_cost', 0):.4f}")
+        logger.info("Final API usage", extra={
+            'total_calls': usage.get('total_calls', 0),
+            'total_cost': round(usage.get('total_cost', 0), 4)
+        })
     
-    print("✅ Shutdown complete")
+    if ai_processor:
+        await ai_processor.aclose()
+    
+    logger.info("Shutdown complete")
 
 # Root endpoint
 @app.get("/")
@@ -118,7 +217,12 @@ async def root():
         "endpoints": {
             "health": "/api/health",
             "survey_submit": "/api/survey/submit",
+            "survey_batch": "/api/survey/batch",
             "requirements_info": "/api/requirements",
+            "reload_database": "/api/admin/reload",
+            "analytics": "/api/analytics/summary",
+            "report_export": "/api/report/{report_id}/pdf",
+            "metrics": "/metrics",
             "documentation": "/docs"
         }
     }
@@ -126,9 +230,10 @@ async def root():
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return {
+    return JSONResponse(status_code=404, content={
         "error": "Endpoint not found",
         "message": "The requested endpoint does not exist",
+        "detail": getattr(exc, 'detail', None),
         "available_endpoints": {
             "root": "/",
             "health": "/api/health",
@@ -136,15 +241,16 @@ async def not_found_handler(request, exc):
             "requirements": "/api/requirements",
             "docs": "/docs"
         }
-    }
+    })
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return {
+    return JSONResponse(status_code=500, content={
         "error": "Internal server error",
         "message": "An unexpected error occurred",
+        "detail": getattr(exc, 'detail', None),
         "support": "Check server logs for details"
-    }
+    })
 
 # Run server
 if __name__ == "__main__":
@@ -3,9 +3,19 @@ Pydantic models for Business Licensing AI API
 """
 
 from pydantic import BaseModel, Field, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 
+# Business type of single-document databases and of surveys that do not name one
+DEFAULT_BUSINESS_TYPE = "food"
+
+# Display names of known business types; others are named after their document
+BUSINESS_TYPE_NAMES = {DEFAULT_BUSINESS_TYPE: "עסק מזון"}
+
+def business_type_name(business_type: str, document_name: Optional[str] = None) -> str:
+    """Display name of a business type for reports and AI prompts"""
+    return BUSINESS_TYPE_NAMES.get(business_type) or document_name or business_type.replace('_', ' ')
+
 class SurveyRequest(BaseModel):
     """User survey data model"""
     size: float = Field(..., ge=10, le=10000, description="Business size in square meters")
@@ -15,6 +25,7 @@ class SurveyRequest(BaseModel):
     serves_meat: bool = Field(..., description="Serves meat dishes")
     business_name: Optional[str] = Field(None, description="Business name (optional)")
     location: Optional[str] = Field(None, description="Business location (optional)")
+    business_type: str = Field(DEFAULT_BUSINESS_TYPE, min_length=1, max_length=64, description="Business type (licensing specification), e.g. food")
     
     @validator('size')
     def validate_size(cls, v):
@@ -27,9 +38,13 @@ class SurveyRequest(BaseModel):
         if v <= 0:
             raise ValueError("Capacity must be positive")
         return v
+    
+    @validator('business_type')
+    def normalize_business_type(cls, v):
+        return v.strip().lower()
 
-class RequirementResponse(BaseModel):
-    """Single requirement response model"""
+class RequirementBody(BaseModel):
+    """Requirement fields shared by every business it applies to"""
     id: str
     name: str
     category: str
@@ -39,6 +54,9 @@ class RequirementResponse(BaseModel):
     estimated_cost: Optional[str] = None
     priority: Optional[str] = "medium"
     source_location: Optional[str] = None
+
+class RequirementResponse(RequirementBody):
+    """Single requirement response model"""
     why_relevant: str  # Why this requirement applies to the user's business
 
 class SurveyResponse(BaseModel):
@@ -50,6 +68,45 @@ class SurveyResponse(BaseModel):
     requirements_count: int
     estimated_total_cost: Optional[str] = None
     estimated_total_time: Optional[str] = None
+    report_mode: Optional[str] = None  # fast, ai or hybrid
+    report_id: Optional[str] = None  # For /api/report/{report_id}/pdf and /docx
+    timestamp: datetime
+
+MAX_BATCH_SURVEYS = 1000
+
+class BatchSurveyRequest(BaseModel):
+    """Batch of business profiles to evaluate at once"""
+    surveys: List[SurveyRequest] = Field(..., min_length=1, max_length=MAX_BATCH_SURVEYS, description="Business profiles")
+    include_reports: bool = Field(False, description="Generate one report per profile class")
+    report_mode: Optional[str] = Field(None, description="fast, ai or hybrid (default: server setting)")
+
+class BatchSurveyResult(BaseModel):
+    """Matching result for one survey in a batch"""
+    index: int  # Position of the survey in the request
+    business_name: Optional[str] = None
+    profile_id: str  # Surveys with the same profile_id match the same requirements
+    requirement_ids: List[str]
+    requirements_count: int
+
+class BatchProfile(BaseModel):
+    """Result shared by every survey in one profile equivalence class"""
+    profile_id: str
+    survey_indexes: List[int]
+    requirement_ids: List[str]
+    estimated_total_cost: Optional[str] = None
+    estimated_total_time: Optional[str] = None
+    personalized_report: Optional[str] = None
+    report_id: Optional[str] = None
+
+class BatchSurveyResponse(BaseModel):
+    """Batch evaluation response - requirement bodies are returned once"""
+    success: bool
+    database_version: str
+    survey_count: int
+    profile_count: int
+    results: List[BatchSurveyResult]
+    profiles: List[BatchProfile]
+    requirements: Dict[str, RequirementBody]
     timestamp: datetime
 
 class HealthCheck(BaseModel):
@@ -66,6 +123,9 @@ class RequirementsInfo(BaseModel):
     categories: dict
     regulatory_authorities: List[str]
     last_processed: str
+    business_types: List[str] = []  # Partitions of a corpus database
+    business_type: Optional[str] = None  # Set when the figures above cover one business type
+    partitions: Dict[str, dict] = {}  # Business type -> total_requirements, categories, regulatory_authorities
 
 class ErrorResponse(BaseModel):
     """Error response model"""
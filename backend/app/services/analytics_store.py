@@ -0,0 +1,356 @@
+"""
+Analytics store - survey history in an embedded SQLite database
+"""
+
+import glob
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+from app.models import RequirementResponse, DEFAULT_BUSINESS_TYPE
+from app.services.report_generator import ReportGenerator
+from app.services.response_log import serialize_record
+from app.utils.estimates import parse_cost, parse_timeline
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS surveys (
+    id INTEGER PRIMARY KEY,
+    record_hash TEXT NOT NULL UNIQUE,
+    submitted_at TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    batch_id TEXT,
+    database_version TEXT,
+    business_type TEXT,
+    size REAL NOT NULL,
+    max_people INTEGER NOT NULL,
+    uses_gas INTEGER NOT NULL,
+    has_delivery INTEGER NOT NULL,
+    serves_meat INTEGER NOT NULL,
+    business_name TEXT,
+    location TEXT,
+    requirements_count INTEGER NOT NULL,
+    estimated_cost REAL,
+    estimated_weeks INTEGER,
+    cached INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_surveys_submitted_at ON surveys (submitted_at);
+CREATE INDEX IF NOT EXISTS idx_surveys_size ON surveys (size);
+CREATE INDEX IF NOT EXISTS idx_surveys_max_people ON surveys (max_people);
+CREATE INDEX IF NOT EXISTS idx_surveys_flags ON surveys (serves_meat, uses_gas, has_delivery);
+CREATE INDEX IF NOT EXISTS idx_surveys_business_type ON surveys (business_type);
+
+CREATE TABLE IF NOT EXISTS survey_requirements (
+    survey_id INTEGER NOT NULL REFERENCES surveys (id),
+    requirement_id TEXT NOT NULL,
+    PRIMARY KEY (survey_id, requirement_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_survey_requirements_requirement ON survey_requirements (requirement_id);
+"""
+
+# Columns added after the first release: name -> (definition, value for existing rows)
+ADDED_COLUMNS = {
+    # Surveys stored before business types were all food surveys
+    'business_type': ("TEXT", DEFAULT_BUSINESS_TYPE),
+}
+
+# Filters accepted by every aggregate: name -> SQL condition
+FILTER_CONDITIONS = {
+    'since': "submitted_at >= :since",
+    'until': "submitted_at < :until",
+    'min_size': "size >= :min_size",
+    'max_size': "size <= :max_size",
+    'min_people': "max_people >= :min_people",
+    'max_people': "max_people <= :max_people",
+    'uses_gas': "uses_gas = :uses_gas",
+    'has_delivery': "has_delivery = :has_delivery",
+    'serves_meat': "serves_meat = :serves_meat",
+    'kind': "kind = :kind",
+    'database_version': "database_version = :database_version",
+    'business_type': "business_type = :business_type",
+}
+
+# strftime formats for the submissions-over-time aggregate
+TIME_INTERVALS = {
+    'hour': '%Y-%m-%dT%H:00',
+    'day': '%Y-%m-%d',
+    'week': '%Y-W%W',
+    'month': '%Y-%m',
+}
+
+
+def _parse_total_cost(text: Optional[str]) -> Optional[float]:
+    """Midpoint of a total cost string such as "12,500 ₪ (אומדן)" or "1,000-1,600 ₪ (אומדן)" """
+    cost = parse_cost(text)
+    if not cost or cost['max_ils'] is None:
+        return None
+    return (cost['min_ils'] + cost['max_ils']) / 2
+
+
+def _parse_total_weeks(text: Optional[str]) -> Optional[int]:
+    """Weeks of a total time string such as "8 שבועות (משוער)" or "10 ימים (משוער)" """
+    timeline = parse_timeline(text)
+    if not timeline or timeline['max_days'] is None:
+        return None
+    return -(-timeline['max_days'] // 7)
+
+
+def _number_batch_records(records: List[Dict]):
+    """
+    Add batch_index to batch records logged without one
+
+    A batch's records are written consecutively and in order, so the
+    position is the record's rank among its batch_id's records.
+    """
+    positions: Dict[str, int] = {}
+    for record in records:
+        if record.get('kind') != 'batch' or 'batch_index' in record:
+            continue
+        batch_id = record.get('batch_id')
+        record['batch_index'] = positions.get(batch_id, 0)
+        positions[batch_id] = record['batch_index'] + 1
+
+
+class AnalyticsStore:
+    """
+    SQLite store of survey submissions for aggregate queries.
+
+    One row per survey with indexed profile columns, plus a
+    survey_requirements table of matched requirement IDs. Each record is
+    keyed by a hash of its serialized form, so re-importing a log or
+    legacy file never duplicates rows. Batch records carry their position
+    in the batch, so identical surveys of one batch are distinct records.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Used from worker threads (asyncio.to_thread), serialized by the lock
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._add_columns()
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _add_columns(self):
+        """Add columns missing from a database created by an earlier version"""
+        columns = {row['name'] for row in self._conn.execute("PRAGMA table_info(surveys)")}
+        if not columns:
+            return
+        with self._conn:
+            for name, (definition, existing_value) in ADDED_COLUMNS.items():
+                if name not in columns:
+                    self._conn.execute(f"ALTER TABLE surveys ADD COLUMN {name} {definition}")
+                    self._conn.execute(f"UPDATE surveys SET {name} = ?", (existing_value,))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def insert_records(self, records: Iterable[Dict]) -> int:
+        """Insert response log records, skipping ones already stored; returns rows added"""
+        added = 0
+        with self._lock, self._conn:
+            for record in records:
+                record_hash = hashlib.sha1(serialize_record(record).encode('utf-8')).hexdigest()
+                added += self._insert(record, record_hash)
+        return added
+
+    def _insert(self, record: Dict, record_hash: str) -> int:
+        survey = record.get('survey_data') or {}
+        requirement_ids = record.get('requirement_ids') or []
+
+        cursor = self._conn.execute(
+            """
+            INSERT OR IGNORE INTO surveys (
+                record_hash, submitted_at, kind, batch_id, database_version, business_type,
+                size, max_people, uses_gas, has_delivery, serves_meat,
+                business_name, location, requirements_count,
+                estimated_cost, estimated_weeks, cached
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                record_hash,
+                record.get('timestamp'),
+                record.get('kind', 'survey'),
+                record.get('batch_id'),
+                record.get('database_version'),
+                survey.get('business_type') or DEFAULT_BUSINESS_TYPE,
+                survey.get('size'),
+                survey.get('max_people'),
+                int(bool(survey.get('uses_gas'))),
+                int(bool(survey.get('has_delivery'))),
+                int(bool(survey.get('serves_meat'))),
+                survey.get('business_name'),
+                survey.get('location'),
+                len(requirement_ids),
+                _parse_total_cost(record.get('estimated_total_cost')),
+                _parse_total_weeks(record.get('estimated_total_time')),
+                None if record.get('cached') is None else int(bool(record.get('cached')))
+            )
+        )
+        if cursor.rowcount == 0:
+            return 0
+
+        self._conn.executemany(
+            "INSERT OR IGNORE INTO survey_requirements (survey_id, requirement_id) VALUES (?, ?)",
+            [(cursor.lastrowid, requirement_id) for requirement_id in requirement_ids]
+        )
+        return 1
+
+    def import_directory(self, responses_dir: str) -> Dict[str, int]:
+        """
+        One-time import of existing survey history: legacy survey_*.json
+        files and responses*.jsonl logs. Safe to run repeatedly.
+        """
+        counts = {'files': 0, 'records': 0, 'added': 0, 'errors': 0}
+        estimator = ReportGenerator()
+
+        for path in sorted(glob.glob(os.path.join(responses_dir, "survey_*.json"))):
+            counts['files'] += 1
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    legacy = json.load(f)
+                requirements = [RequirementResponse(**req) for req in legacy.get('requirements', [])]
+                record = {
+                    'timestamp': legacy.get('timestamp'),
+                    'kind': 'survey',
+                    'survey_data': legacy.get('survey_data'),
+                    'requirement_ids': [req.id for req in requirements],
+                    'estimated_total_cost': estimator.calculate_total_cost_estimate(requirements),
+                    'estimated_total_time': estimator.calculate_total_time_estimate(requirements),
+                    'source_file': os.path.basename(path)
+                }
+                counts['records'] += 1
+                counts['added'] += self.insert_records([record])
+            except Exception as e:
+                counts['errors'] += 1
+                logger.warning("Skipping unreadable survey response", extra={'file': os.path.basename(path), 'error': str(e)})
+
+        for path in sorted(glob.glob(os.path.join(responses_dir, "responses*.jsonl"))):
+            counts['files'] += 1
+            records = []
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        counts['errors'] += 1
+            _number_batch_records(records)
+            counts['records'] += len(records)
+            counts['added'] += self.insert_records(records)
+
+        return counts
+
+    # ------------------------------------------------------------------
+    # Aggregates
+    # ------------------------------------------------------------------
+
+    def _where(self, filters: Dict) -> Tuple[str, Dict]:
+        params = {}
+        conditions = []
+        for name, value in filters.items():
+            if value is None or name not in FILTER_CONDITIONS:
+                continue
+            conditions.append(FILTER_CONDITIONS[name])
+            params[name] = int(value) if isinstance(value, bool) else value
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        return where, params
+
+    def _query(self, sql: str, params: Dict) -> List[Dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def summary(self, **filters) -> Dict:
+        """Totals and averages over the filtered surveys"""
+        where, params = self._where(filters)
+        row = self._query(f"""
+            SELECT COUNT(*) AS surveys,
+                   SUM(kind = 'batch') AS batch_surveys,
+                   COUNT(DISTINCT database_version) AS database_versions,
+                   COUNT(DISTINCT business_type) AS business_types,
+                   MIN(submitted_at) AS first_submitted_at,
+                   MAX(submitted_at) AS last_submitted_at,
+                   ROUND(AVG(size), 1) AS avg_size,
+                   ROUND(AVG(max_people), 1) AS avg_max_people,
+                   ROUND(AVG(requirements_count), 1) AS avg_requirements,
+                   SUM(uses_gas) AS uses_gas,
+                   SUM(has_delivery) AS has_delivery,
+                   SUM(serves_meat) AS serves_meat,
+                   SUM(cached) AS cached
+            FROM surveys {where}
+        """, params)[0]
+        return row
+
+    def profile_counts(self, size_step: float = 50, people_step: int = 25, **filters) -> List[Dict]:
+        """Survey counts per size bucket x capacity bucket x feature flags"""
+        where, params = self._where(filters)
+        params.update(size_step=size_step, people_step=people_step)
+        return self._query(f"""
+            SELECT CAST(size / :size_step AS INTEGER) * :size_step AS size_from,
+                   CAST(max_people / :people_step AS INTEGER) * :people_step AS people_from,
+                   uses_gas, has_delivery, serves_meat,
+                   COUNT(*) AS surveys
+            FROM surveys {where}
+            GROUP BY size_from, people_from, uses_gas, has_delivery, serves_meat
+            ORDER BY surveys DESC, size_from, people_from
+        """, params)
+
+    def top_requirements(self, limit: int = 20, **filters) -> List[Dict]:
+        """Most frequently matched requirement IDs"""
+        where, params = self._where(filters)
+        params['limit'] = limit
+        return self._query(f"""
+            SELECT sr.requirement_id, COUNT(*) AS matches
+            FROM survey_requirements sr
+            JOIN surveys ON surveys.id = sr.survey_id
+            {where}
+            GROUP BY sr.requirement_id
+            ORDER BY matches DESC, sr.requirement_id
+            LIMIT :limit
+        """, params)
+
+    def cost_distribution(self, bucket: float = 5000, **filters) -> Dict:
+        """Histogram and range of the estimated total cost (₪)"""
+        where, params = self._where(filters)
+        cost_where = f"{where} AND estimated_cost IS NOT NULL" if where else "WHERE estimated_cost IS NOT NULL"
+        params['bucket'] = bucket
+        stats = self._query(f"""
+            SELECT COUNT(*) AS surveys, MIN(estimated_cost) AS min_cost,
+                   MAX(estimated_cost) AS max_cost, ROUND(AVG(estimated_cost)) AS avg_cost,
+                   MAX(estimated_weeks) AS max_weeks, ROUND(AVG(estimated_weeks), 1) AS avg_weeks
+            FROM surveys {cost_where}
+        """, params)[0]
+        histogram = self._query(f"""
+            SELECT CAST(estimated_cost / :bucket AS INTEGER) * :bucket AS cost_from,
+                   COUNT(*) AS surveys
+            FROM surveys {cost_where}
+            GROUP BY cost_from
+            ORDER BY cost_from
+        """, params)
+        return {**stats, 'bucket': bucket, 'histogram': histogram}
+
+    def submissions_over_time(self, interval: str = 'day', **filters) -> List[Dict]:
+        """Survey counts per time period"""
+        where, params = self._where(filters)
+        params['format'] = TIME_INTERVALS[interval]
+        return self._query(f"""
+            SELECT strftime(:format, submitted_at) AS period, COUNT(*) AS surveys
+            FROM surveys {where}
+            GROUP BY period
+            ORDER BY period
+        """, params)
@@ -0,0 +1,293 @@
+"""
+Compact memory-mappable snapshot of the requirements database
+
+Layout (little-endian, sections 8-byte aligned):
+    header      magic, format version, counts, section offsets, source version
+    strings     u32 offset table (count + 1 entries) followed by one UTF-8 blob;
+                every distinct string is stored once and referenced by index
+    records     fixed-size requirement records: section code + string indexes
+                of the text fields
+    conditions  columnar numeric arrays: f64 min/max size and capacity
+                (NaN = no bound), i8 gas/delivery/meat flags (-1 = any)
+    meta        UTF-8 JSON with the non-requirement parts of the database
+
+Opening a snapshot is a single mmap; requirement fields are decoded from the
+mapped pages only when accessed, so worker processes share one page-cache copy.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Dict, List
+
+MAGIC = b'BLRQSNP1'
+FORMAT_VERSION = 1
+
+# magic, format version, requirements, strings, strings/records/conditions/meta offsets, meta length, source version
+HEADER = struct.Struct('<8sIIIQQQQQ16s')
+
+SECTIONS = (
+    ('general_requirements', None),
+    ('size_specific_requirements', 'size_notes'),
+    ('capacity_specific_requirements', 'capacity_notes'),
+    ('feature_specific_requirements', 'feature_notes'),
+)
+
+TEXT_FIELDS = (
+    'id', 'name', 'category', 'authority', 'description', 'applies_to',
+    'timeline', 'estimated_cost', 'priority', 'source_location', 'additional_notes',
+    'condition_notes'
+)
+
+# section code, padding, one u32 string index per text field
+RECORD = struct.Struct('<B3x' + 'I' * len(TEXT_FIELDS))
+
+NUMERIC_CONDITIONS = ('min_size_sqm', 'max_size_sqm', 'min_capacity', 'max_capacity')
+FLAG_CONDITIONS = ('requires_gas', 'has_delivery', 'serves_meat')
+
+# Conditions that belong to each section, as stored in the JSON database
+SECTION_CONDITIONS = {
+    'size_specific_requirements': ('min_size_sqm', 'max_size_sqm'),
+    'capacity_specific_requirements': ('min_capacity', 'max_capacity'),
+    'feature_specific_requirements': FLAG_CONDITIONS,
+}
+
+# String index meaning "field absent"
+MISSING = 0xFFFFFFFF
+
+
+def _align(offset: int) -> int:
+    return (offset + 7) & ~7
+
+
+def write_snapshot(data: Dict, path: str, source_version: str = '') -> None:
+    """
+    Serialize a requirements database to a binary snapshot
+
+    The file is written to a temporary path and renamed into place, so
+    processes that still map the previous snapshot are never affected.
+    """
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(value) -> int:
+        if value is None:
+            return MISSING
+        value = str(value)
+        if value not in string_ids:
+            string_ids[value] = len(strings)
+            strings.append(value)
+        return string_ids[value]
+
+    records = []
+    numeric = [[] for _ in NUMERIC_CONDITIONS]
+    flags = [[] for _ in FLAG_CONDITIONS]
+    extras = {}
+
+    for code, (section, notes_key) in enumerate(SECTIONS):
+        for req in data.get(section, []):
+            conditions = req.get('conditions') or {}
+            fields = dict(req)
+            fields['condition_notes'] = conditions.get(notes_key) if notes_key else None
+            records.append(RECORD.pack(code, *[intern(fields.get(name)) for name in TEXT_FIELDS]))
+
+            for column, key in zip(numeric, NUMERIC_CONDITIONS):
+                value = conditions.get(key)
+                column.append(math.nan if value is None else float(value))
+            for column, key in zip(flags, FLAG_CONDITIONS):
+                value = conditions.get(key)
+                column.append(-1 if value is None else int(bool(value)))
+
+            # Anything the fixed layout does not cover is kept in the meta JSON
+            known = set(TEXT_FIELDS) | {'conditions'}
+            known_conditions = set(SECTION_CONDITIONS.get(section, ())) | {notes_key}
+            extra = {key: value for key, value in req.items() if key not in known}
+            extra_conditions = {key: value for key, value in conditions.items() if key not in known_conditions}
+            if extra_conditions:
+                extra['conditions'] = extra_conditions
+            if extra:
+                extras[str(len(records) - 1)] = extra
+
+    meta = {key: value for key, value in data.items() if key not in dict(SECTIONS)}
+    meta['_requirement_extras'] = extras
+    meta_bytes = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    encoded = [value.encode('utf-8') for value in strings]
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+
+    count = len(records)
+    strings_pos = _align(HEADER.size)
+    string_table = struct.pack(f'<{len(offsets)}I', *offsets) + b''.join(encoded)
+    records_pos = _align(strings_pos + len(string_table))
+    conditions_pos = _align(records_pos + RECORD.size * count)
+    conditions = b''.join(struct.pack(f'<{count}d', *column) for column in numeric)
+    conditions += b''.join(struct.pack(f'<{count}b', *column) for column in flags)
+    meta_pos = _align(conditions_pos + len(conditions))
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, count, len(strings),
+        strings_pos, records_pos, conditions_pos, meta_pos, len(meta_bytes),
+        source_version.encode('ascii')[:16]
+    )
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        for position, chunk in (
+            (0, header), (strings_pos, string_table), (records_pos, b''.join(records)),
+            (conditions_pos, conditions), (meta_pos, meta_bytes)
+        ):
+            f.write(b'\0' * (position - f.tell()))
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class SnapshotRequirement(Mapping):
+    """Read-only requirement dict backed by a mapped snapshot record"""
+
+    __slots__ = ('_snapshot', '_position', '_keys')
+
+    def __init__(self, snapshot: 'BinarySnapshot', position: int):
+        self._snapshot = snapshot
+        self._position = position
+        self._keys = None
+
+    def __getitem__(self, key):
+        return self._snapshot.requirement_field(self._position, key)
+
+    def __iter__(self):
+        if self._keys is None:
+            self._keys = self._snapshot.requirement_keys(self._position)
+        return iter(self._keys)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"SnapshotRequirement({dict(self)!r})"
+
+
+class BinarySnapshot:
+    """Memory-mapped requirements snapshot"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mmap)
+
+        (magic, format_version, self.count, self.string_count,
+         strings_pos, self._records_pos, conditions_pos, meta_pos, meta_len,
+         source_version) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or format_version != FORMAT_VERSION:
+            raise ValueError(f"Not a requirements snapshot (format {format_version}): {path}")
+
+        self.source_version = source_version.rstrip(b'\0').decode('ascii')
+
+        # Zero-copy views over the mapped file
+        self._string_offsets = self._view[strings_pos:strings_pos + 4 * (self.string_count + 1)].cast('I')
+        self._string_data_pos = strings_pos + 4 * (self.string_count + 1)
+        self.numeric = {}
+        position = conditions_pos
+        for key in NUMERIC_CONDITIONS:
+            self.numeric[key] = self._view[position:position + 8 * self.count].cast('d')
+            position += 8 * self.count
+        self.flags = {}
+        for key in FLAG_CONDITIONS:
+            self.flags[key] = self._view[position:position + self.count].cast('b')
+            position += self.count
+
+        meta = json.loads(bytes(self._view[meta_pos:meta_pos + meta_len]).decode('utf-8'))
+        self._extras = meta.pop('_requirement_extras', {})
+        self.meta = meta
+
+        # Decoded strings are interned per process on first access
+        self._strings: Dict[int, str] = {}
+
+    def string(self, index: int):
+        """Decode a string from the shared table"""
+        if index == MISSING:
+            return None
+        value = self._strings.get(index)
+        if value is None:
+            start = self._string_offsets[index]
+            end = self._string_offsets[index + 1]
+            value = bytes(self._view[self._string_data_pos + start:self._string_data_pos + end]).decode('utf-8')
+            self._strings[index] = value
+        return value
+
+    def _record(self, position: int):
+        return RECORD.unpack_from(self._mmap, self._records_pos + RECORD.size * position)
+
+    def section_code(self, position: int) -> int:
+        return self._mmap[self._records_pos + RECORD.size * position]
+
+    def conditions(self, position: int) -> Dict:
+        """Numeric and flag conditions of a requirement, read straight from the columns"""
+        conditions = {}
+        for name, column in self.numeric.items():
+            value = column[position]
+            if not math.isnan(value):
+                conditions[name] = value
+        for name, column in self.flags.items():
+            flag = column[position]
+            if flag >= 0:
+                conditions[name] = bool(flag)
+        return conditions
+
+    def requirement_keys(self, position: int) -> List[str]:
+        record = self._record(position)
+        keys = []
+        for name, index in zip(TEXT_FIELDS, record[1:]):
+            if index != MISSING and name != 'condition_notes':
+                keys.append(name)
+            # Same key order as the extraction schema
+            if name == 'description' and SECTIONS[record[0]][1]:
+                keys.append('conditions')
+        # General requirements keep any conditions in the extras
+        extra = self._extras.get(str(position), {})
+        keys.extend(key for key in extra if key not in keys)
+        return keys
+
+    def requirement_field(self, position: int, key: str):
+        record = self._record(position)
+        section, notes_key = SECTIONS[record[0]]
+
+        if key == 'conditions' and notes_key:
+            conditions = {}
+            for name in SECTION_CONDITIONS[section]:
+                if name in self.numeric:
+                    value = self.numeric[name][position]
+                    conditions[name] = None if math.isnan(value) else (int(value) if value.is_integer() else value)
+                else:
+                    flag = self.flags[name][position]
+                    conditions[name] = None if flag < 0 else bool(flag)
+            notes = self.string(record[1 + TEXT_FIELDS.index('condition_notes')])
+            if notes is not None:
+                conditions[notes_key] = notes
+            conditions.update(self._extras.get(str(position), {}).get('conditions', {}))
+            return conditions
+
+        if key in TEXT_FIELDS and key != 'condition_notes':
+            index = record[1 + TEXT_FIELDS.index(key)]
+            if index != MISSING:
+                return self.string(index)
+
+        extra = self._extras.get(str(position), {})
+        if key in extra:
+            return extra[key]
+        raise KeyError(key)
+
+    def to_database(self) -> Dict:
+        """Database dict with lazily decoded requirements"""
+        data = dict(self.meta)
+        for section, _ in SECTIONS:
+            data[section] = []
+        for position in range(self.count):
+            section = SECTIONS[self.section_code(position)][0]
+            data[section].append(SnapshotRequirement(self, position))
+        return data
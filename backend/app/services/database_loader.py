@@ -2,63 +2,353 @@
 Database loader service from requirements.json
 """
 
+import asyncio
+import hashlib
 import json
+import logging
 import os
-from typing import Dict, Optional
+import threading
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.models import DEFAULT_BUSINESS_TYPE, business_type_name
+from app.services.binary_snapshot import BinarySnapshot
+from app.services.requirements_index import RequirementsIndex, REQUIREMENT_SECTIONS
+from app.services.requirement_payloads import RequirementPayloads
+from app.services.search_index import SearchIndex
+from app.services.template_report import TemplateReportEngine
+
+logger = logging.getLogger(__name__)
+
+# backend/ directory, so the default path does not depend on the CWD
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_DB_PATH = os.path.join(BACKEND_DIR, "data", "processed", "requirements.json")
+
+class DatabaseSnapshot:
+    """
+    Immutable view of one loaded database version with its derived indexes.
+
+    Requests take a snapshot once and use it throughout, so a reload swapping
+    in a new snapshot never changes the data under an in-flight request.
+
+    A corpus database (one partition per business type) loads as one
+    snapshot per partition, sharing the version. The snapshot published by
+    the loader is the default business type's, so single-type callers are
+    unchanged, and partition() looks up any other type.
+    """
+
+    def __init__(
+        self,
+        version: str,
+        data: Dict,
+        index: RequirementsIndex,
+        search_index: Optional[SearchIndex],
+        report_engine: TemplateReportEngine,
+        payloads: RequirementPayloads,
+        path: str,
+        mtime: float,
+        business_type: str = DEFAULT_BUSINESS_TYPE
+    ):
+        self.version = version
+        self.data = data
+        self.index = index
+        self._search_index = search_index
+        self._search_index_lock = threading.Lock()
+        self.report_engine = report_engine
+        self.payloads = payloads
+        self.path = path
+        self.mtime = mtime
+        self.business_type = business_type
+        self.partitions: Dict[str, 'DatabaseSnapshot'] = {business_type: self}
+        self.authorities: List[Dict] = []
+        self.loaded_at = datetime.now()
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Full-text search index (binary snapshots build it on first use)"""
+        if self._search_index is None:
+            with self._search_index_lock:
+                if self._search_index is None:
+                    self._search_index = SearchIndex(self.index.requirements)
+        return self._search_index
+
+    def partition(self, business_type: str) -> Optional['DatabaseSnapshot']:
+        """Snapshot of one business type's requirements (None if the database has no such type)"""
+        return self.partitions.get(business_type)
+
+    def total_requirements(self) -> int:
+        """Requirements of every business type"""
+        return sum(len(partition.index.requirements) for partition in self.partitions.values())
+
+    def category_counts(self) -> Dict[str, int]:
+        """Requirements per section of this business type"""
+        return {
+            "general": len(self.data.get('general_requirements', [])),
+            "size_specific": len(self.data.get('size_specific_requirements', [])),
+            "capacity_specific": len(self.data.get('capacity_specific_requirements', [])),
+            "feature_specific": len(self.data.get('feature_specific_requirements', []))
+        }
+
+    def regulatory_authorities(self) -> List[str]:
+        """Authorities of this business type's document"""
+        return self.data.get('document_analysis', {}).get('regulatory_authorities', [])
 
 class DatabaseLoader:
-    def __init__(self):
-        self.requirements_db = None
-        
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or os.getenv("REQUIREMENTS_DB_PATH", DEFAULT_DB_PATH)
+        # Binary snapshot written next to the JSON by document_processor.py
+        self.binary_path = os.getenv("REQUIREMENTS_SNAPSHOT_PATH", os.path.splitext(self.db_path)[0] + ".snapshot")
+        self.use_binary = os.getenv("USE_BINARY_SNAPSHOT", "true").lower() != "false"
+        self.snapshot: Optional[DatabaseSnapshot] = None
+        self._reload_lock = asyncio.Lock()
+        self._reload_listeners: List[Callable[[DatabaseSnapshot], None]] = []
+
     async def load_requirements_database(self):
         """Load the processed requirements JSON file"""
-        db_path = os.path.join("data", "processed", "requirements.json")
-        
         try:
-            if os.path.exists(db_path):
-                with open(db_path, 'r', encoding='utf-8') as f:
-                    self.requirements_db = json.load(f)
-                
-                total_reqs = self.requirements_db.get('summary', {}).get('total_requirements', 0)
-                print(f"✅ Requirements database loaded: {total_reqs} requirements")
-                return self.requirements_db
+            source_path = self._resolve_source()
+            if os.path.exists(source_path):
+                # Parsing and index building run off the event loop
+                snapshot = await asyncio.to_thread(self._build_snapshot, source_path)
+                self._swap(snapshot)
+
+                logger.info("Requirements database loaded", extra={
+                    'requirements': snapshot.total_requirements(),
+                    'business_types': len(snapshot.partitions),
+                    'version': snapshot.version,
+                    'source': os.path.basename(source_path)
+                })
+                return snapshot.data
             else:
-                print(f"❌ Requirements database not found at: {db_path}")
-                print("Please run document_processor.py first to create the database")
+                logger.error("Requirements database not found - run document_processor.py first to create it", extra={'path': self.db_path})
                 return None
-                
+
         except Exception as e:
-            print(f"❌ Error loading requirements database: {e}")
+            logger.exception("Error loading requirements database")
             return None
-    
+
+    async def reload(self):
+        """
+        Reload the database file and atomically swap in the new snapshot
+
+        The current snapshot stays active if the new file is missing or
+        invalid; the error is raised to the caller.
+
+        Returns:
+            Dict: previous and new version information
+        """
+        async with self._reload_lock:
+            previous = self.snapshot
+            snapshot = await asyncio.to_thread(self._build_snapshot, self._resolve_source())
+
+            changed = previous is None or previous.version != snapshot.version
+            if changed:
+                self._swap(snapshot)
+                logger.info("Requirements database reloaded", extra={'version': snapshot.version})
+
+            current = self.snapshot
+            return {
+                "reloaded": changed,
+                "previous_version": previous.version if previous else None,
+                "version": current.version,
+                "total_requirements": current.total_requirements(),
+                "business_types": {
+                    business_type: len(partition.index.requirements)
+                    for business_type, partition in sorted(current.partitions.items())
+                },
+                "loaded_at": current.loaded_at.isoformat()
+            }
+
+    async def watch(self, interval_seconds: float):
+        """
+        Poll the database file and reload when its modification time changes
+
+        Each (path, mtime) is handled once: a file touched without a content
+        change reloads to the same version and is not rebuilt again on the
+        next poll, and a failed reload is retried only once the file changes.
+        """
+        seen = (self.snapshot.path, self.snapshot.mtime) if self.snapshot else None
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                source_path = self._resolve_source()
+                source = (source_path, os.stat(source_path).st_mtime)
+                if source == seen:
+                    continue
+                seen = source
+                await self.reload()
+            except FileNotFoundError:
+                continue
+            except Exception as e:
+                logger.warning("Requirements database reload failed, keeping current version", extra={'error': str(e)})
+
+    def add_reload_listener(self, listener: Callable[[DatabaseSnapshot], None]):
+        """Register a callback run after a new snapshot is swapped in"""
+        self._reload_listeners.append(listener)
+
+    def _swap(self, snapshot: DatabaseSnapshot):
+        """Publish a new snapshot (a single reference assignment)"""
+        self.snapshot = snapshot
+        for listener in self._reload_listeners:
+            listener(snapshot)
+
+    def _resolve_source(self):
+        """Use the binary snapshot when it is at least as new as the JSON file"""
+        if self.use_binary and os.path.exists(self.binary_path):
+            if not os.path.exists(self.db_path) or os.stat(self.binary_path).st_mtime >= os.stat(self.db_path).st_mtime:
+                return self.binary_path
+        return self.db_path
+
+    def _build_snapshot(self, db_path: str):
+        """Read, validate and index a database file"""
+        mtime = os.stat(db_path).st_mtime
+
+        if db_path == self.binary_path:
+            # Single mmap; requirement fields are decoded lazily from shared pages
+            binary = BinarySnapshot(db_path)
+            data = binary.to_database()
+            version = binary.source_version
+            conditions_source = binary.conditions
+        else:
+            with open(db_path, 'rb') as f:
+                raw = f.read()
+            data = json.loads(raw.decode('utf-8'))
+
+            # Content hash identifies this database in cache keys
+            version = hashlib.sha256(raw).hexdigest()[:12]
+            conditions_source = None
+
+            if 'business_types' in data:
+                return self._build_corpus_snapshot(data, version, db_path, mtime)
+
+            # The snapshot format fixes this structure when it is written
+            self._validate_database(data)
+
+        return self._build_partition(data, version, db_path, mtime, DEFAULT_BUSINESS_TYPE, conditions_source)
+
+    def _build_partition(self, data: Dict, version: str, db_path: str, mtime: float, business_type: str, conditions_source=None):
+        """
+        Compile the matching and search indexes, report fragments and response payloads once per load, not per request
+
+        A binary snapshot (conditions_source set) was validated when it was
+        written, so its report fragments and payloads are built per
+        requirement on first use, and its search index on the first search,
+        instead of decoding every record here.
+        """
+        lazy = conditions_source is not None
+        index = RequirementsIndex(data, conditions_source)
+        search_index = None if lazy else SearchIndex(index.requirements)
+        report_engine = TemplateReportEngine(
+            index.requirements, index.categories, business_type_name(business_type, data.get('business_type_name')), lazy=lazy
+        )
+        payloads = RequirementPayloads(index.requirements, lazy=lazy)
+        return DatabaseSnapshot(version, data, index, search_index, report_engine, payloads, db_path, mtime, business_type)
+
+    def _build_corpus_snapshot(self, data: Dict, version: str, db_path: str, mtime: float):
+        """One partition snapshot per business type; the default type's snapshot is published"""
+        business_types = data.get('business_types')
+        if not isinstance(business_types, Mapping) or not business_types:
+            raise ValueError("Corpus database must have at least one business type")
+
+        partitions = {}
+        for business_type, partition_data in business_types.items():
+            try:
+                self._validate_database(partition_data)
+            except ValueError as e:
+                raise ValueError(f"Business type '{business_type}': {e}")
+            partitions[business_type] = self._build_partition(partition_data, version, db_path, mtime, business_type)
+
+        default_type = data.get('default_business_type', DEFAULT_BUSINESS_TYPE)
+        snapshot = partitions.get(default_type) or partitions[min(partitions)]
+        authorities = data.get('authorities', [])
+        for partition in partitions.values():
+            partition.partitions = partitions
+            partition.authorities = authorities
+        return snapshot
+
+    def _validate_database(self, data: Dict):
+        """Check the structure the matcher and API rely on"""
+        if not isinstance(data, Mapping):
+            raise ValueError("Requirements database must be a JSON object")
+
+        for _, section in REQUIREMENT_SECTIONS:
+            requirements = data.get(section, [])
+            if not isinstance(requirements, list):
+                raise ValueError(f"Section '{section}' must be a list")
+            for req in requirements:
+                if not isinstance(req, Mapping) or not req.get('id'):
+                    raise ValueError(f"Section '{section}' contains a requirement without an id")
+                if not isinstance(req.get('conditions') or {}, Mapping):
+                    raise ValueError(f"Requirement '{req['id']}' has invalid conditions")
+
+    def get_snapshot(self):
+        """Get the current database snapshot"""
+        return self.snapshot
+
     def get_database(self):
         """Get the loaded database"""
-        return self.requirements_db
-    
+        return self.snapshot.data if self.snapshot else None
+
+    def get_index(self):
+        """Get the compiled requirements index"""
+        return self.snapshot.index if self.snapshot else None
+
+    def get_search_index(self):
+        """Get the full-text search index"""
+        return self.snapshot.search_index if self.snapshot else None
+
+    def get_report_engine(self):
+        """Get the template report engine"""
+        return self.snapshot.report_engine if self.snapshot else None
+
+    def get_version(self):
+        """Get the content version of the loaded database"""
+        return self.snapshot.version if self.snapshot else None
+
     def is_loaded(self):
         """Check if database is loaded"""
-        return self.requirements_db is not None
-    
+        return self.snapshot is not None
+
     def get_requirements_info(self):
-        """Get summary information about the requirements database"""
-        if not self.requirements_db:
+        """
+        Get summary information about the requirements database
+
+        Totals, categories and authorities cover every business type;
+        partitions has the same figures per business type.
+        """
+        snapshot = self.snapshot
+        if not snapshot:
             return {
                 "total_requirements": 0,
                 "categories": {},
                 "regulatory_authorities": [],
                 "last_processed": "unknown"
             }
-        
-        db = self.requirements_db
-        
+
+        partitions = {}
+        categories = {}
+        authorities = []
+        for business_type, partition in sorted(snapshot.partitions.items()):
+            partitions[business_type] = {
+                "total_requirements": len(partition.index.requirements),
+                "categories": partition.category_counts(),
+                "regulatory_authorities": partition.regulatory_authorities()
+            }
+            for category, count in partitions[business_type]["categories"].items():
+                categories[category] = categories.get(category, 0) + count
+            authorities.extend(name for name in partition.regulatory_authorities() if name not in authorities)
+        if snapshot.authorities:
+            # Corpus databases have a deduplicated shared table
+            authorities = [authority['name'] for authority in snapshot.authorities]
+
         return {
-            "total_requirements": db.get('summary', {}).get('total_requirements', 0),
-            "categories": {
-                "general": len(db.get('general_requirements', [])),
-                "size_specific": len(db.get('size_specific_requirements', [])),
-                "capacity_specific": len(db.get('capacity_specific_requirements', [])),
-                "feature_specific": len(db.get('feature_specific_requirements', []))
-            },
-            "regulatory_authorities": db.get('document_analysis', {}).get('regulatory_authorities', []),
-            "last_processed": db.get('processing_metadata', {}).get('processed_at', 'unknown')
-        }
\ No newline at end of file
+            "total_requirements": snapshot.total_requirements(),
+            "categories": categories,
+            "regulatory_authorities": authorities,
+            "last_processed": snapshot.data.get('processing_metadata', {}).get('processed_at', 'unknown'),
+            "business_type": snapshot.business_type,
+            "business_types": sorted(snapshot.partitions),
+            "partitions": partitions,
+            "version": snapshot.version,
+            "loaded_at": snapshot.loaded_at.isoformat()
+        }
@@ -0,0 +1,313 @@
+"""
+Markdown to DOCX conversion for reports - one markdown parse, emitted onto a prepared RTL template
+"""
+
+import io
+import os
+import re
+from typing import Dict, Optional
+from xml.etree.ElementTree import Element
+import markdown
+from lxml import etree
+from markdown.treeprocessors import Treeprocessor
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+
+# Optional styled template; python-docx's default template otherwise
+REPORT_DOCX_TEMPLATE = os.getenv("REPORT_DOCX_TEMPLATE")
+
+REPORT_TITLE = 'דוח רישוי עסקים'
+
+# Paragraph styles the converter emits, resolved to style ids once per template
+HEADING_STYLES = {f'h{level}': f'Heading {level}' for level in range(1, 7)}
+BULLET_STYLES = ('List Bullet', 'List Bullet 2', 'List Bullet 3')
+NUMBER_STYLES = ('List Number', 'List Number 2', 'List Number 3')
+CHECKLIST_STYLE = 'List Paragraph'
+QUOTE_STYLE = 'Quote'
+TABLE_STYLE = 'Table Grid'
+
+# Markdown checklist items ("- [ ] ...", "- [x] ...")
+CHECKBOX_PATTERN = re.compile(r'^\[( |x|X)\]\s+')
+CHECKBOXES = {' ': '☐ ', 'x': '☑ ', 'X': '☑ '}
+
+# Elements that follow w:bidi in a paragraph's properties (schema order)
+_PPR_AFTER_BIDI = (
+    'w:adjustRightInd', 'w:snapToGrid', 'w:spacing', 'w:ind', 'w:contextualSpacing',
+    'w:mirrorIndents', 'w:suppressOverlap', 'w:jc', 'w:textDirection', 'w:textAlignment',
+    'w:textboxTightWrap', 'w:outlineLvl', 'w:divId', 'w:cnfStyle', 'w:rPr', 'w:sectPr', 'w:pPrChange'
+)
+
+# Inline markdown elements, emitted as runs of their paragraph
+_INLINE_TAGS = {'strong', 'b', 'em', 'i', 'code', 'a', 'br', 'span', 'img'}
+
+# Body elements are built with plain lxml: the converter creates every
+# element in schema order, so python-docx's ordered insertion is not needed
+_P, _PPR, _PSTYLE, _R, _RPR, _T, _BR = (qn(tag) for tag in ('w:p', 'w:pPr', 'w:pStyle', 'w:r', 'w:rPr', 'w:t', 'w:br'))
+_B, _B_CS, _I, _I_CS = (qn(tag) for tag in ('w:b', 'w:bCs', 'w:i', 'w:iCs'))
+_NUMPR, _ILVL, _NUMID, _SECT_PR, _VAL = (qn(tag) for tag in ('w:numPr', 'w:ilvl', 'w:numId', 'w:sectPr', 'w:val'))
+_XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+
+# Raw HTML stashed by the markdown parser ("\x02wzxhzdk:0\x03")
+_STASH_PLACEHOLDER = re.compile('\x02wzxhzdk:(\\d+)\x03')
+_HTML_TAG = re.compile(r'<[^>]+>')
+
+
+class _TreeCapture(Treeprocessor):
+    """Keeps the parsed element tree, so a report is parsed once and never serialized to HTML"""
+
+    def run(self, root):
+        self.md.report_tree = root
+
+
+def _complex_script_formatting(rPr):
+    """Mirror bold/italic/size onto their complex-script (Hebrew) counterparts"""
+    if rPr.find(qn('w:b')) is not None and rPr.find(qn('w:bCs')) is None:
+        rPr.get_or_add_bCs().set(qn('w:val'), rPr.find(qn('w:b')).get(qn('w:val'), '1'))
+    if rPr.find(qn('w:i')) is not None and rPr.find(qn('w:iCs')) is None:
+        rPr.get_or_add_iCs().set(qn('w:val'), rPr.find(qn('w:i')).get(qn('w:val'), '1'))
+    size = rPr.find(qn('w:sz'))
+    if size is not None and rPr.find(qn('w:szCs')) is None:
+        size_cs = OxmlElement('w:szCs')
+        size_cs.set(qn('w:val'), size.get(qn('w:val')))
+        size.addnext(size_cs)
+
+
+def _set_bidi(pPr):
+    if pPr.find(qn('w:bidi')) is None:
+        pPr.insert_element_before(OxmlElement('w:bidi'), *_PPR_AFTER_BIDI)
+
+
+class DocxReportConverter:
+    """
+    Converts report markdown to DOCX.
+
+    The template is prepared once: paragraphs default to right-to-left,
+    runs to RTL, and style formatting is mirrored onto the complex-script
+    properties Word applies to Hebrew text. Each conversion loads the
+    prepared template from memory, parses the markdown once into an
+    element tree and appends WordprocessingML directly, with style ids
+    resolved up front instead of per paragraph.
+    """
+
+    def __init__(self, template_path: Optional[str] = REPORT_DOCX_TEMPLATE):
+        self._markdown = markdown.Markdown(extensions=['tables', 'nl2br'])
+        self._markdown.treeprocessors.register(_TreeCapture(self._markdown), 'report_tree', -10)
+
+        document = Document(template_path) if template_path else Document()
+        self._prepare_template(document)
+        self.style_ids = {
+            style.name: style.style_id
+            for style in document.styles
+        }
+        self._list_abstract_ids = self._list_numbering(document)
+
+        buffer = io.BytesIO()
+        document.save(buffer)
+        self._template = buffer.getvalue()
+
+    @staticmethod
+    def _prepare_template(document):
+        styles = document.styles.element
+        defaults = styles.find(qn('w:docDefaults'))
+        if defaults is None:
+            defaults = OxmlElement('w:docDefaults')
+            styles.insert(0, defaults)
+
+        # Every paragraph right-to-left and every run RTL, unless a style says otherwise
+        rPr_default = defaults.find(qn('w:rPrDefault'))
+        if rPr_default is None:
+            rPr_default = OxmlElement('w:rPrDefault')
+            defaults.insert(0, rPr_default)
+        rPr = rPr_default.find(qn('w:rPr'))
+        if rPr is None:
+            rPr = OxmlElement('w:rPr')
+            rPr_default.append(rPr)
+        rPr.get_or_add_rtl()
+
+        pPr_default = defaults.find(qn('w:pPrDefault'))
+        if pPr_default is None:
+            pPr_default = OxmlElement('w:pPrDefault')
+            defaults.append(pPr_default)
+        pPr = pPr_default.find(qn('w:pPr'))
+        if pPr is None:
+            pPr = OxmlElement('w:pPr')
+            pPr_default.append(pPr)
+        _set_bidi(pPr)
+
+        for style_rPr in styles.iter(qn('w:rPr')):
+            _complex_script_formatting(style_rPr)
+
+    def _list_numbering(self, document) -> Dict[str, str]:
+        """Abstract numbering of each numbered list style, used to restart numbering per list"""
+        numbering = document.part.numbering_part.element
+        abstract_ids = {}
+        for name in NUMBER_STYLES:
+            style_id = self.style_ids.get(name)
+            if style_id is None:
+                continue
+            num_id = document.styles.element.xpath(
+                f'w:style[@w:styleId="{style_id}"]/w:pPr/w:numPr/w:numId/@w:val'
+            )
+            if not num_id:
+                continue
+            abstract_id = numbering.xpath(f'w:num[@w:numId="{num_id[0]}"]/w:abstractNumId/@w:val')
+            if abstract_id:
+                abstract_ids[name] = abstract_id[0]
+        return abstract_ids
+
+    def convert(self, markdown_text: str, generated_at: str) -> bytes:
+        """Render a markdown report to DOCX bytes"""
+        self._markdown.reset().convert(markdown_text)
+        tree = self._markdown.report_tree
+
+        document = Document(io.BytesIO(self._template))
+        context = _Emitter(self, document)
+        context.paragraph(self.style_ids.get('Title'), REPORT_TITLE)
+        context.paragraph(None, f'נוצר ב-{generated_at}')
+        context.blocks(tree, depth=0)
+
+        buffer = io.BytesIO()
+        document.save(buffer)
+        return buffer.getvalue()
+
+
+class _Emitter:
+    """Appends the blocks of one parsed report to one document"""
+
+    def __init__(self, converter: DocxReportConverter, document):
+        self.converter = converter
+        self.style_ids = converter.style_ids
+        self.document = document
+        self.raw_html = converter._markdown.htmlStash.rawHtmlBlocks
+        # Body paragraphs go before the final section properties
+        body = document.element.body
+        self._section = body.find(_SECT_PR)
+        self._body = body
+
+    def paragraph(self, style_id: Optional[str], text: Optional[str] = None, num_id: Optional[int] = None):
+        p = etree.Element(_P)
+        if self._section is not None:
+            self._section.addprevious(p)
+        else:
+            self._body.append(p)
+        if style_id or num_id is not None:
+            pPr = etree.SubElement(p, _PPR)
+            if style_id:
+                etree.SubElement(pPr, _PSTYLE).set(_VAL, style_id)
+            if num_id is not None:
+                num_pr = etree.SubElement(pPr, _NUMPR)
+                etree.SubElement(num_pr, _ILVL).set(_VAL, '0')
+                etree.SubElement(num_pr, _NUMID).set(_VAL, str(num_id))
+        if text:
+            self.run(p, text, False, False)
+        return p
+
+    def blocks(self, parent: Element, depth: int, style_id: Optional[str] = None):
+        for element in parent:
+            tag = element.tag
+            if tag in HEADING_STYLES:
+                self.inline(self.paragraph(self.style_ids.get(HEADING_STYLES[tag])), element)
+            elif tag == 'p':
+                self.inline(self.paragraph(style_id), element)
+            elif tag in ('ul', 'ol'):
+                self.list(element, depth)
+            elif tag == 'table':
+                self.table(element)
+            elif tag == 'blockquote':
+                self.blocks(element, depth, self.style_ids.get(QUOTE_STYLE))
+            elif tag == 'pre':
+                for line in ''.join(element.itertext()).rstrip('\n').split('\n'):
+                    self.paragraph(style_id, line)
+            elif tag == 'hr':
+                self.paragraph(style_id)
+            elif tag not in _INLINE_TAGS:
+                self.blocks(element, depth, style_id)
+
+    def list(self, element: Element, depth: int):
+        level = min(depth, 2)
+        numbered = element.tag == 'ol'
+        style_name = NUMBER_STYLES[level] if numbered else BULLET_STYLES[level]
+        style_id = self.style_ids.get(style_name)
+
+        num_id = None
+        abstract_id = self.converter._list_abstract_ids.get(style_name) if numbered else None
+        if abstract_id is not None:
+            # Each list starts again at 1 instead of continuing the previous one
+            num = self.document.part.numbering_part.element.add_num(int(abstract_id))
+            num.add_lvlOverride(ilvl=0).add_startOverride(1)
+            num_id = num.numId
+
+        for item in element:
+            if item.tag != 'li':
+                continue
+            # Loose list items wrap their text in <p>; tight ones hold it directly
+            content = item[0] if len(item) and item[0].tag == 'p' else item
+            checkbox = CHECKBOX_PATTERN.match(content.text or '')
+
+            if checkbox:
+                p = self.paragraph(self.style_ids.get(CHECKLIST_STYLE), CHECKBOXES[checkbox.group(1)])
+                content.text = content.text[checkbox.end():]
+            else:
+                p = self.paragraph(style_id, num_id=num_id)
+
+            self.inline(p, content, stop_at_blocks=content is item)
+            self.blocks(item[1:] if content is not item else item, depth + 1)
+
+    def table(self, element: Element):
+        rows = [row for row in element.iter('tr')]
+        columns = max((len(row) for row in rows), default=0)
+        if not columns:
+            return
+
+        table = self.document.add_table(rows=len(rows), cols=columns)
+        style_id = self.style_ids.get(TABLE_STYLE)
+        tbl = table._tbl
+        if style_id:
+            tbl.tblPr.style = style_id
+        # Columns run right to left
+        tbl.tblPr.get_or_add_bidiVisual()
+
+        for row, tr in zip(rows, tbl.tr_lst):
+            for cell, tc in zip(row, tr.tc_lst):
+                self.inline(tc.p_lst[0], cell, bold=cell.tag == 'th')
+
+    def inline(self, p, element: Element, bold: bool = False, italic: bool = False, stop_at_blocks: bool = False):
+        """Append the text and inline formatting of element to paragraph p"""
+        if element.text:
+            self.run(p, element.text, bold, italic)
+        for child in element:
+            tag = child.tag
+            if stop_at_blocks and tag not in _INLINE_TAGS:
+                # Nested blocks of a list item are emitted after it; their tails are whitespace
+                continue
+            if tag == 'br':
+                etree.SubElement(etree.SubElement(p, _R), _BR)
+            else:
+                self.inline(p, child, bold or tag in ('strong', 'b'), italic or tag in ('em', 'i'))
+            if child.tail:
+                self.run(p, child.tail, bold, italic)
+
+    def run(self, p, text: str, bold: bool, italic: bool):
+        # nl2br leaves the newline after each <br>; raw HTML keeps only its text
+        text = text.replace('\n', '')
+        if '\x02' in text:
+            text = _STASH_PLACEHOLDER.sub(
+                lambda match: _HTML_TAG.sub('', self.raw_html[int(match.group(1))]), text
+            )
+        if not text:
+            return
+
+        r = etree.SubElement(p, _R)
+        if bold or italic:
+            rPr = etree.SubElement(r, _RPR)
+            if bold:
+                etree.SubElement(rPr, _B)
+                etree.SubElement(rPr, _B_CS)
+            if italic:
+                etree.SubElement(rPr, _I)
+                etree.SubElement(rPr, _I_CS)
+        t = etree.SubElement(r, _T)
+        t.text = text
+        if text[0] == ' ' or text[-1] == ' ':
+            t.set(_XML_SPACE, 'preserve')
@@ -0,0 +1,288 @@
+"""
+Request and hot-path metrics, exposed in the Prometheus text format
+"""
+
+import bisect
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets in seconds: sub-millisecond matching up to minute-long AI reports
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+TOKEN_BUCKETS = (100, 250, 500, 1000, 2000, 4000, 8000, 16000, 32000, 64000)
+
+# Requests slower than this are logged with their timing
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_MS", "2000")) / 1000
+
+# Labels of the request being handled (endpoint route and report mode), for hot-path timers
+_request_context: contextvars.ContextVar[Optional[Dict]] = contextvars.ContextVar("request_context", default=None)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def _label_text(self, key: Tuple[str, ...], extra: str = "") -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing value per label set"""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = list(self._values.items())
+        return [f"{self.name}{self._label_text(key)} {_format_value(value)}" for key, value in values]
+
+
+class Gauge(Counter):
+    """Value that goes up and down per label set"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    """Bucketed observations (with sum and count) per label set"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # key -> [per-bucket counts (last is +Inf), sum, count]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][position] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block, in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            values = [(key, list(series[0]), series[1], series[2]) for key, series in self._values.items()]
+
+        lines = []
+        for key, counts, total, count in values:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{self._label_text(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._label_text(key)} {total!r}")
+            lines.append(f"{self.name}_count{self._label_text(key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Metrics of this process, rendered for GET /metrics"""
+
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LABELS = ('endpoint', 'report_mode')
+
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency, until the last body byte is sent",
+    ('method', 'endpoint', 'status')
+))
+HTTP_REQUESTS_IN_FLIGHT = REGISTRY.register(Gauge(
+    "http_requests_in_flight", "HTTP requests being handled"
+))
+MATCH_SECONDS = REGISTRY.register(Histogram(
+    "survey_match_duration_seconds", "Requirement matching time per survey", REQUEST_LABELS
+))
+REPORT_SECONDS = REGISTRY.register(Histogram(
+    "report_generation_duration_seconds", "Personalized report generation time, cache hits included",
+    REQUEST_LABELS
+))
+LLM_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "llm_request_duration_seconds", "Anthropic API call latency (streamed calls until the last token)",
+    REQUEST_LABELS + ('task', 'outcome')
+))
+LLM_COALESCED = REGISTRY.register(Counter(
+    "llm_coalesced_requests_total", "AI requests that shared an identical call already in flight",
+    REQUEST_LABELS + ('task',)
+))
+LLM_QUEUE_SECONDS = REGISTRY.register(Histogram(
+    "llm_queue_wait_duration_seconds", "Wait for a slot under the AI concurrency limit", REQUEST_LABELS + ('task',)
+))
+LLM_TOKENS = REGISTRY.register(Histogram(
+    "llm_tokens", "Tokens per Anthropic API call", REQUEST_LABELS + ('task', 'kind'), TOKEN_BUCKETS
+))
+LLM_COST_DOLLARS = REGISTRY.register(Counter(
+    "llm_cost_dollars_total", "Estimated Anthropic API cost", ('task',)
+))
+PERSIST_SECONDS = REGISTRY.register(Histogram(
+    "persistence_duration_seconds", "Time to persist a batch of survey response records", ('target', 'outcome')
+))
+PERSIST_RECORDS = REGISTRY.register(Counter(
+    "persisted_records_total", "Survey response records persisted", ('target',)
+))
+DOCUMENT_RENDER_SECONDS = REGISTRY.register(Histogram(
+    "document_render_duration_seconds", "PDF/DOCX render time in the worker pool", ('format', 'outcome')
+))
+DOCUMENT_RENDER_RESULTS = REGISTRY.register(Counter(
+    "document_render_requests_total", "Document render requests by how they were served", ('format', 'result')
+))
+
+
+def set_report_mode(report_mode: str):
+    """Label the current request's hot-path metrics with its report mode"""
+    context = _request_context.get()
+    if context is not None:
+        context['report_mode'] = report_mode
+
+
+def request_labels() -> Dict[str, str]:
+    """Endpoint route and report mode of the current request (empty outside requests)"""
+    context = _request_context.get()
+    if context is None:
+        return {'endpoint': '', 'report_mode': ''}
+    return {'endpoint': context['route'](), 'report_mode': context['report_mode']}
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labeled by route template (/api/report/{report_id}, not
+    the concrete path) to keep label cardinality bounded; unrouted paths
+    share the "unmatched" label. The timing covers the whole response, so
+    streamed reports are measured until their last event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict] = None
+
+    def _route_of(self, scope) -> str:
+        endpoint = scope.get('endpoint')
+        if endpoint is None:
+            return 'unmatched'
+        if self._route_paths is None or endpoint not in self._route_paths:
+            # Routes are fixed once the app serves requests
+            self._route_paths = {
+                getattr(route, 'endpoint', None): route.path
+                for route in scope['app'].routes
+            }
+        return self._route_paths.get(endpoint, 'unmatched')
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status = {'code': 500}
+
+        async def send_with_status(message):
+            if message['type'] == 'http.response.start':
+                status['code'] = message['status']
+            await send(message)
+
+        context = {'report_mode': '', 'route': lambda: self._route_of(scope)}
+        token = _request_context.set(context)
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            _request_context.reset(token)
+            endpoint = self._route_of(scope)
+            HTTP_REQUEST_SECONDS.observe(elapsed, method=scope['method'], endpoint=endpoint, status=status['code'])
+            if elapsed >= SLOW_REQUEST_SECONDS:
+                logger.warning("Slow request", extra={
+                    'method': scope['method'],
+                    'endpoint': endpoint,
+                    'report_mode': context['report_mode'],
+                    'status': status['code'],
+                    'duration_ms': round(elapsed * 1000, 1)
+                })
@@ -2,147 +2,192 @@
 PDF and DOCX generation service for reports
 """
 
+import glob
+import logging
 import markdown
-from weasyprint import HTML, CSS
-from docx import Document
-from docx.shared import Inches
 import os
 import tempfile
+from datetime import datetime
 from typing import Optional
+from urllib.parse import unquote, urlparse
+from app.services.docx_converter import DocxReportConverter
+
+logger = logging.getLogger(__name__)
+
+# Media types of the rendered formats
+DOCUMENT_MEDIA_TYPES = {
+    'pdf': 'application/pdf',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Hebrew-capable fonts shipped with the backend (see assets/fonts/README.md)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+REPORT_FONTS_DIR = os.getenv("REPORT_FONTS_DIR", os.path.join(BACKEND_DIR, "assets", "fonts"))
+REPORT_FONT_FAMILY = "Report Hebrew"
+
+# Hebrew RTL report styling, compiled once per process into a WeasyPrint CSS object
+REPORT_CSS = """
+body {
+    font-family: '%(font_family)s', 'Arial', 'Helvetica', sans-serif;
+    direction: rtl;
+    text-align: right;
+    line-height: 1.6;
+    margin: 20px;
+    color: #333;
+}
+h1, h2, h3 {
+    color: #2c3e50;
+    border-bottom: 2px solid #3498db;
+    padding-bottom: 10px;
+}
+h1 { font-size: 28px; }
+h2 { font-size: 22px; }
+h3 { font-size: 18px; }
+strong { color: #e74c3c; }
+ul, ol { padding-right: 20px; }
+li { margin-bottom: 5px; }
+.report-header {
+    background: #3498db;
+    color: white;
+    padding: 15px;
+    border-radius: 5px;
+    margin-bottom: 20px;
+    text-align: center;
+}
+"""
+
+REPORT_HTML = """<!DOCTYPE html>
+<html dir="rtl" lang="he">
+<head><meta charset="UTF-8"></head>
+<body>
+    <div class="report-header">
+        <h1>דוח רישוי עסקים</h1>
+        <p>נוצר ב-{generated_at}</p>
+    </div>
+    {html_content}
+</body>
+</html>
+"""
+
+def font_face_rules(fonts_dir: str = REPORT_FONTS_DIR) -> str:
+    """@font-face rules for the bundled fonts (bold when the file name says so)"""
+    rules = []
+    for path in sorted(glob.glob(os.path.join(fonts_dir, "*.ttf")) + glob.glob(os.path.join(fonts_dir, "*.otf"))):
+        weight = "bold" if "bold" in os.path.basename(path).lower() else "normal"
+        rules.append(
+            f"@font-face {{ font-family: '{REPORT_FONT_FAMILY}'; "
+            f"src: url('file://{os.path.abspath(path)}'); font-weight: {weight}; }}"
+        )
+    return "\n".join(rules)
+
+def is_bundled_font(url: str, fonts_dir: str = REPORT_FONTS_DIR) -> bool:
+    """Whether a URL names a file in the bundled fonts directory"""
+    parsed = urlparse(url)
+    if parsed.scheme != 'file' or parsed.netloc not in ('', 'localhost'):
+        return False
+    path = os.path.realpath(unquote(parsed.path))
+    return os.path.dirname(path) == os.path.realpath(fonts_dir)
+
+def report_url_fetcher(url: str, *args, **kwargs):
+    """
+    WeasyPrint URL fetcher for reports: only the bundled fonts are read
+
+    Reports contain user-supplied text (business name, location, AI output),
+    so any other URL - a file:// path, an attachment link, a remote image -
+    is refused instead of being fetched into the PDF.
+    """
+    if not is_bundled_font(url):
+        raise ValueError(f"Report resource not allowed: {url}")
+    from weasyprint import default_url_fetcher
+    return default_url_fetcher(url, *args, **kwargs)
+
+def report_markdown() -> markdown.Markdown:
+    """Markdown parser for reports; raw HTML in the text is kept as text, not passed through"""
+    md = markdown.Markdown(extensions=['tables', 'nl2br'])
+    md.preprocessors.deregister('html_block')
+    md.inlinePatterns.deregister('html')
+    return md
 
 class DocumentGenerator:
     def __init__(self):
         self.temp_dir = tempfile.gettempdir()
+        self._markdown = report_markdown()
+        # WeasyPrint stylesheet and font configuration, built on the first PDF render
+        self._stylesheet = None
+        self._font_config = None
+        self._docx_converter = None
+    
+    def _pdf_resources(self):
+        """Compile the report stylesheet and its fonts once per process"""
+        if self._stylesheet is None:
+            # Imported on first use, so only processes that render PDFs load WeasyPrint
+            from weasyprint import CSS
+            from weasyprint.text.fonts import FontConfiguration
+            
+            self._font_config = FontConfiguration()
+            css = font_face_rules() + REPORT_CSS % {'font_family': REPORT_FONT_FAMILY}
+            self._stylesheet = CSS(string=css, font_config=self._font_config, url_fetcher=report_url_fetcher)
+        return self._stylesheet, self._font_config
+    
+    def _docx_resources(self) -> DocxReportConverter:
+        """Prepare the RTL DOCX template once per process"""
+        if self._docx_converter is None:
+            self._docx_converter = DocxReportConverter()
+        return self._docx_converter
+    
+    def render_pdf(self, markdown_text: str, generated_at: Optional[str] = None) -> bytes:
+        """Render a markdown report to PDF bytes"""
+        from weasyprint import HTML
+        
+        stylesheet, font_config = self._pdf_resources()
+        generated_at = generated_at or datetime.now().strftime('%d/%m/%Y %H:%M')
+        
+        # Convert markdown to HTML (the parser and its extensions are reused)
+        html_content = self._markdown.reset().convert(markdown_text)
+        html = REPORT_HTML.format(generated_at=generated_at, html_content=html_content)
+        
+        # Generate PDF in memory with the precompiled stylesheet
+        return HTML(string=html, url_fetcher=report_url_fetcher).write_pdf(stylesheets=[stylesheet], font_config=font_config)
+    
+    def render_docx(self, markdown_text: str, generated_at: Optional[str] = None) -> bytes:
+        """Render a markdown report to DOCX bytes"""
+        generated_at = generated_at or datetime.now().strftime('%d/%m/%Y %H:%M')
+        return self._docx_resources().convert(markdown_text, generated_at)
     
     def markdown_to_pdf(self, markdown_text: str, filename: str = None) -> str:
-        """Convert markdown report to PDF"""
+        """Convert markdown report to a PDF file in the temp directory"""
         try:
-            # Convert markdown to HTML
-            html_content = markdown.markdown(markdown_text, extensions=['tables', 'nl2br'])
-            
-            # Add Hebrew RTL CSS styling
-            html_with_style = f"""
-            <!DOCTYPE html>
-            <html dir="rtl" lang="he">
-            <head>
-                <meta charset="UTF-8">
-                <style>
-                    body {{
-                        font-family: 'Arial', 'Helvetica', sans-serif;
-                        direction: rtl;
-                        text-align: right;
-                        line-height: 1.6;
-                        margin: 20px;
-                        color: #333;
-                    }}
-                    h1, h2, h3 {{
-                        color: #2c3e50;
-                        border-bottom: 2px solid #3498db;
-                        padding-bottom: 10px;
-                    }}
-                    h1 {{ font-size: 28px; }}
-                    h2 {{ font-size: 22px; }}
-                    h3 {{ font-size: 18px; }}
-                    strong {{ color: #e74c3c; }}
-                    ul, ol {{ padding-right: 20px; }}
-                    li {{ margin-bottom: 5px; }}
-                    .report-header {{
-                        background: #3498db;
-                        color: white;
-                        padding: 15px;
-                        border-radius: 5px;
-                        margin-bottom: 20px;
-                        text-align: center;
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="report-header">
-                    <h1>דוח רישוי עסקים</h1>
-                    <p>נוצר ב-{datetime.now().strftime('%d/%m/%Y %H:%M')}</p>
-                </div>
-                {html_content}
-            </body>
-            </html>
-            """
-            
             # Generate filename if not provided
             if not filename:
-                from datetime import datetime
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"business_report_{timestamp}.pdf"
             
-            # Generate PDF
             pdf_path = os.path.join(self.temp_dir, filename)
-            HTML(string=html_with_style).write_pdf(pdf_path)
+            with open(pdf_path, 'wb') as f:
+                f.write(self.render_pdf(markdown_text))
             
             return pdf_path
             
         except Exception as e:
-            print(f"❌ PDF generation error: {e}")
+            logger.error("PDF generation error", extra={'error': str(e)})
             return None
     
     def markdown_to_docx(self, markdown_text: str, filename: str = None) -> str:
-        """Convert markdown report to DOCX"""
+        """Convert markdown report to a DOCX file in the temp directory"""
         try:
-            # Create new document
-            doc = Document()
-            
-            # title
-            title = doc.add_heading('דוח רישוי עסקים', 0)
-            title.alignment = 2  # Right align for Hebrew
-            
-            # Add creation date
-            from datetime import datetime
-            date_para = doc.add_paragraph(f'נוצר ב-{datetime.now().strftime("%d/%m/%Y %H:%M")}')
-            date_para.alignment = 2
-            
-            # Process markdown content line by line
-            lines = markdown_text.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if not line:
-                    continue
-                
-                # Headers
-                if line.startswith('# '):
-                    heading = doc.add_heading(line[2:], 1)
-                    heading.alignment = 2
-                elif line.startswith('## '):
-                    heading = doc.add_heading(line[3:], 2)
-                    heading.alignment = 2
-                elif line.startswith('### '):
-                    heading = doc.add_heading(line[4:], 3)
-                    heading.alignment = 2
-                # Lists
-                elif line.startswith('- '):
-                    para = doc.add_paragraph(line[2:], style='List Bullet')
-                    para.alignment = 2
-                # Bold text
-                elif line.startswith('**') and line.endswith('**'):
-                    para = doc.add_paragraph()
-                    para.alignment = 2
-                    run = para.add_run(line[2:-2])
-                    run.bold = True
-                # Regular text
-                else:
-                    para = doc.add_paragraph(line)
-                    para.alignment = 2
-            
             # Generate filename if not provided
             if not filename:
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 filename = f"business_report_{timestamp}.docx"
             
-            # Save document
             docx_path = os.path.join(self.temp_dir, filename)
-            doc.save(docx_path)
+            with open(docx_path, 'wb') as f:
+                f.write(self.render_docx(markdown_text))
             
             return docx_path
             
         except Exception as e:
-            print(f"❌ DOCX generation error: {e}")
+            logger.error("DOCX generation error", extra={'error': str(e)})
             return None
     
     def clean_temp_files(self, file_path: str):
@@ -151,4 +196,30 @@ class DocumentGenerator:
             if os.path.exists(file_path):
                 os.remove(file_path)
         except Exception as e:
-            print(f"⚠️ Error cleaning temp file: {e}")
\ No newline at end of file
+            logger.warning("Error cleaning temp file", extra={'path': file_path, 'error': str(e)})
+
+# Generator of the current render worker process
+_worker_generator = None
+
+def init_render_worker():
+    """Process pool initializer: build the generator, its DOCX template and PDF stylesheet up front"""
+    global _worker_generator
+    _worker_generator = DocumentGenerator()
+    _worker_generator._docx_resources()
+    try:
+        _worker_generator._pdf_resources()
+    except Exception as e:
+        # Reported again, per request, when a PDF is actually rendered
+        logger.warning("PDF renderer unavailable in worker", extra={'error': str(e)})
+
+def render_document(document_format: str, markdown_text: str, generated_at: str) -> bytes:
+    """Render a report in a worker process (module-level so the process pool can pickle it)"""
+    global _worker_generator
+    if _worker_generator is None:
+        _worker_generator = DocumentGenerator()
+    
+    if document_format == 'pdf':
+        return _worker_generator.render_pdf(markdown_text, generated_at)
+    if document_format == 'docx':
+        return _worker_generator.render_docx(markdown_text, generated_at)
+    raise ValueError(f"Unsupported document format: {document_format}")
@@ -2,71 +2,27 @@
 AI-powered report generation service
 """
 
+import hashlib
 import json
-import re
-from typing import List
-from app.models import SurveyRequest, RequirementResponse
+import logging
+import os
+import time
+import weakref
+from string import Template
+from typing import Dict, List, Optional
+from app.models import SurveyRequest, RequirementResponse, DEFAULT_BUSINESS_TYPE, business_type_name
+from app.services.requirements_matcher import format_bounds, relevance_reasons
+from app.services.template_report import TemplateReportEngine
+from app.services.metrics import LLM_COALESCED, LLM_QUEUE_SECONDS, LLM_REQUEST_SECONDS, request_labels
+from app.services.single_flight import SingleFlight
+from app.utils.estimates import parse_cost, parse_timeline, total_cost, critical_path, format_total_cost, format_total_time
 
-class ReportGenerator:
-    def __init__(self, ai_processor=None):
-        self.ai_processor = ai_processor
-    
-    async def generate_personalized_report(self, survey: SurveyRequest, requirements: List[RequirementResponse]):
-        """Generate AI-powered personalized report"""
-        
-        if not self.ai_processor:
-            # Fallback: Generate basic report without AI
-            return self._generate_basic_report(survey, requirements)
-        
-        try:
-            # Prepare data for AI
-            requirements_summary = []
-            for req in requirements:
-                requirements_summary.append({
-                    'name': req.name,
-                    'authority': req.authority,
-                    'timeline': req.timeline,
-                    'cost': req.estimated_cost,
-                    'description': req.description,
-                    'why_relevant': req.why_relevant
-                })
-            
-            prompt = self._build_ai_prompt(survey, requirements_summary)
-            
-            # Generate report with AI
-            response = self.ai_processor.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=6000,
-                system="Generate clear, practical business guidance in Hebrew.",
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            # Track usage
-            self.ai_processor._update_usage_tracker(response.usage)
-            
-            return response.content[0].text
-            
-        except Exception as e:
-            print(f"❌ AI report generation failed: {e}")
-            return self._generate_basic_report(survey, requirements)
-    
-    def _build_ai_prompt(self, survey: SurveyRequest, requirements_summary: List[dict]):
-        """Build AI prompt for report generation"""
-        return f"""
-אתה יועץ עסקי מקצועי המתמחה ברישוי עסקים בישראל. צור דוח מותאם אישית בעברית עבור:
+logger = logging.getLogger(__name__)
 
-## נתוני העסק:
-- **סוג עסק**: עסק מזון
-- **גודל**: {survey.size} מ"ר
-- **תפוסה מקסימלית**: {survey.max_people} מקומות ישיבה
-- **שימוש בגז**: {'כן' if survey.uses_gas else 'לא'}
-- **שירות משלוחים**: {'כן' if survey.has_delivery else 'לא'}
-- **הגשת בשר**: {'כן' if survey.serves_meat else 'לא'}
+# Static part of the report prompt (per business type), sent as a cached system block
+REPORT_INSTRUCTIONS = Template("""Generate clear, practical business guidance in Hebrew.
 
-## דרישות רגולטוריות רלוונטיות:
-{json.dumps(requirements_summary, ensure_ascii=False, indent=2)}
-
----
+אתה יועץ עסקי מקצועי המתמחה ברישוי עסקים בישראל. בכל פנייה תקבל נתוני $business_type ואת רשימת הדרישות הרגולטוריות הרלוונטיות אליו, ותכתוב עבורו דוח מותאם אישית.
 
 צור דוח מקצועי ומפורט הכולל את הסעיפים הבאים:
 
@@ -123,95 +79,310 @@ class ReportGenerator:
 - הסבר למה כל דרישה חלה על העסק הספציפי הזה
 - ציין מסגרות זמן ברורות
 - כלול טיפים מעשיים וטעויות להימנע מהן
-        """
+""")
+
+# Static part of the hybrid-mode prompt: only the narrative, the template renders the rest
+NARRATIVE_INSTRUCTIONS = Template("""Write short, practical business guidance in Hebrew.
+
+אתה יועץ עסקי מקצועי המתמחה ברישוי עסקים בישראל. בכל פנייה תקבל נתוני $business_type ואת רשימת הדרישות הרגולטוריות הרלוונטיות אליו.
+פירוט הרישיונות, לוח הזמנים, העלויות והצ'קליסט כבר מופיעים בדוח - אל תחזור עליהם.
+
+כתוב 2-4 פסקאות קצרות בלבד, ללא כותרות:
+- המלצה עיקרית ונקודת פתיחה לעסק הספציפי הזה
+- אילו דרישות אפשר לקדם במקביל ועל מה חשוב להקפיד במיוחד
+- טעויות נפוצות שכדאי להימנע מהן
+
+**הנחיות לכתיבה:**
+- השתמש בשפה עסקית ברורה ופשוטה, לא "שפת חוק"
+- כתוב בגוף שני ("אתה צריך", "עליך לעשות")
+- לא להמציא מידע, רק על סמך הנתונים
+""")
+
+# Larger databases send matched requirement details inline instead of a catalog
+REPORT_CATALOG_MAX_CHARS = int(os.getenv("REPORT_CATALOG_MAX_CHARS", "100000"))
+
+# Catalog text per loaded database snapshot
+_catalogs = weakref.WeakKeyDictionary()
+
+def get_requirements_catalog(snapshot) -> Optional[str]:
+    """
+    Requirements catalog of a database snapshot, for the cached prompt prefix
     
-    def _generate_basic_report(self, survey: SurveyRequest, requirements: List[RequirementResponse]):
-        """Generate basic report without AI (fallback)"""        
-        report = f"""
-# דוח רישוי עסקים
+    Built once per snapshot so the text is byte-identical across requests,
+    which is what lets the API serve it from the prompt cache. Returns None
+    when the catalog would exceed REPORT_CATALOG_MAX_CHARS.
+    """
+    if snapshot in _catalogs:
+        return _catalogs[snapshot]
+    
+    entries = [
+        {
+            'id': req.get('id'),
+            'name': req.get('name'),
+            'authority': req.get('authority'),
+            'timeline': req.get('timeline'),
+            'cost': req.get('estimated_cost'),
+            'description': req.get('description')
+        }
+        for req in snapshot.index.requirements
+    ]
+    catalog = "## קטלוג הדרישות הרגולטוריות (הדרישות הרלוונטיות לכל עסק מופיעות לפי id):\n" + json.dumps(entries, ensure_ascii=False)
+    if len(catalog) > REPORT_CATALOG_MAX_CHARS:
+        catalog = None
+    
+    _catalogs[snapshot] = catalog
+    return catalog
 
-## פרטי העסק
-- **גודל**: {survey.size} מ"ר
-- **תפוסה**: {survey.max_people} אנשים
-- **שימוש בגז**: {'כן' if survey.uses_gas else 'לא'}
-- **משלוחים**: {'כן' if survey.has_delivery else 'לא'}
-- **הגשת בשר**: {'כן' if survey.serves_meat else 'לא'}
+# AI report/narrative calls and report streams in flight in this process, keyed by request hash
+ai_calls = SingleFlight()
 
-## רישיונות ואישורים נדרשים ({len(requirements)})
+def _request_key(request: dict) -> str:
+    return hashlib.sha256(json.dumps(request, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
 
-"""
+class ReportGenerator:
+    def __init__(
+        self,
+        ai_processor=None,
+        catalog: Optional[str] = None,
+        report_engine: Optional[TemplateReportEngine] = None,
+        profile_bounds: Optional[Dict] = None
+    ):
+        self.ai_processor = ai_processor
+        # Requirements catalog for the cached prompt prefix (see get_requirements_catalog)
+        self.catalog = catalog
+        # Snapshot's template engine, used for the non-AI fallback report
+        self.report_engine = report_engine
+        # Business type named in the prompts and the fallback report
+        self.business_type = report_engine.business_type if report_engine else business_type_name(DEFAULT_BUSINESS_TYPE)
+        # Size/capacity ranges of the survey's profile class (RequirementsIndex.profile_bounds);
+        # AI output is cached per class, so the prompt describes the class, not the survey
+        self.profile_bounds = profile_bounds
+        # Set when the last report came from the non-AI fallback
+        self.used_fallback = False
+    
+    async def generate_personalized_report(self, survey: SurveyRequest, requirements: List[RequirementResponse]):
+        """Generate AI-powered personalized report"""
         
-        for i, req in enumerate(requirements, 1):
-            report += f"""
-### {i}. {req.name}
-- **גוף מוסמך**: {req.authority}
-- **זמן טיפול**: {req.timeline or 'לא מוגדר'}
-- **עלות משוערת**: {req.estimated_cost or 'לא מוגדר'}
-- **סיבה**: {req.why_relevant}
-- **תיאור**: {req.description}
-
-"""
+        self.used_fallback = False
         
-        total_cost = self.calculate_total_cost_estimate(requirements)
-        total_time = self.calculate_total_time_estimate(requirements)
+        if not self.ai_processor:
+            # Fallback: Generate basic report without AI
+            self.used_fallback = True
+            return self._generate_basic_report(survey, requirements)
         
-        report += f"""
-## סיכום
-- **סך הכל רישיונות**: {len(requirements)}
-- **עלות משוערת**: {total_cost}
-- **זמן משוער**: {total_time}
-
-**המלצה**: התחל בדרישות הכלליות ולאחר מכן עבור לדרישות הספציפיות.
+        try:
+            request = self._build_ai_request(survey, requirements)
+            
+            # Generate report with AI without blocking the event loop
+            response = await self._create_message(request, "report")
+            return response.content[0].text
+            
+        except Exception as e:
+            logger.error("AI report generation failed, using the template report", extra={'error': str(e)})
+            self.used_fallback = True
+            return self._generate_basic_report(survey, requirements)
+    
+    async def stream_personalized_report(self, survey: SurveyRequest, requirements: List[RequirementResponse]):
+        """
+        Stream the personalized report as text chunks while the AI generates it
+        
+        Falls back to the basic report (as a single chunk) if the AI is not
+        available or fails before producing any text. Errors after the first
+        chunk are raised to the caller.
+        
+        Identical requests streaming at the same time share one upstream
+        stream; a client that joins late first receives the text so far.
+        """
+        self.used_fallback = False
+        
+        if not self.ai_processor:
+            self.used_fallback = True
+            yield self._generate_basic_report(survey, requirements)
+            return
+        
+        started = False
+        try:
+            request = self._build_ai_request(survey, requirements)
+            
+            key = ("stream", _request_key(request))
+            if ai_calls.is_in_flight(key):
+                LLM_COALESCED.inc(task="report_stream", **request_labels())
+            async for text in ai_calls.stream(key, lambda: self._stream_message(request, "report_stream")):
+                started = True
+                yield text
+            
+        except Exception as e:
+            if started:
+                raise
+            logger.error("AI report streaming failed, using the template report", extra={'error': str(e)})
+            self.used_fallback = True
+            yield self._generate_basic_report(survey, requirements)
+    
+    async def generate_narrative(self, survey: SurveyRequest, requirements: List[RequirementResponse]) -> Optional[str]:
+        """
+        Generate only the narrative recommendations for a template report
+        
+        Returns None (and sets used_fallback) when the AI is not available or
+        fails; the template report is complete without it.
+        """
+        self.used_fallback = False
+        
+        if not self.ai_processor:
+            self.used_fallback = True
+            return None
+        
+        try:
+            request = self._build_ai_request(
+                survey, requirements,
+                instructions=NARRATIVE_INSTRUCTIONS,
+                max_tokens=1200,
+                task="כתוב המלצות מותאמות אישית בעברית עבור:"
+            )
+            
+            response = await self._create_message(request, "narrative")
+            return response.content[0].text
+            
+        except Exception as e:
+            logger.error("AI narrative generation failed, sending the template report alone", extra={'error': str(e)})
+            self.used_fallback = True
+            return None
+    
+    async def _create_message(self, request: dict, task: str):
+        """
+        Send an AI request, sharing the response of an identical request already in flight
+        
+        Bursts of identical surveys build byte-identical requests; only the
+        first one reaches the API and the others await its response.
+        """
+        key = _request_key(request)
+        if ai_calls.is_in_flight(key):
+            LLM_COALESCED.inc(task=task, **request_labels())
+        return await ai_calls.run(key, lambda: self._send_message(request, task))
+    
+    async def _send_message(self, request: dict, task: str):
+        """Send one AI request under the shared concurrency limit, recording wait, latency and usage"""
+        labels = request_labels()
+        queued = time.perf_counter()
+        async with self.ai_processor.ai_semaphore:
+            sent = time.perf_counter()
+            LLM_QUEUE_SECONDS.observe(sent - queued, task=task, **labels)
+            try:
+                response = await self.ai_processor.async_client.messages.create(**request)
+            except Exception:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - sent, task=task, outcome="error", **labels)
+                raise
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - sent, task=task, outcome="ok", **labels)
+        
+        # Track usage
+        self.ai_processor._update_usage_tracker(response.usage, task=task)
+        return response
+    
+    async def _stream_message(self, request: dict, task: str):
+        """Stream one AI request's text under the shared concurrency limit, recording wait, latency and usage"""
+        labels = request_labels()
+        queued = time.perf_counter()
+        async with self.ai_processor.ai_semaphore:
+            sent = time.perf_counter()
+            LLM_QUEUE_SECONDS.observe(sent - queued, task=task, **labels)
+            try:
+                async with self.ai_processor.async_client.messages.stream(**request) as stream:
+                    async for text in stream.text_stream:
+                        yield text
+                    final_message = await stream.get_final_message()
+            except Exception:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - sent, task=task, outcome="error", **labels)
+                raise
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - sent, task=task, outcome="ok", **labels)
+        
+        # Track usage
+        self.ai_processor._update_usage_tracker(final_message.usage, task=task)
+    
+    def _build_ai_request(
+        self,
+        survey: SurveyRequest,
+        requirements: List[RequirementResponse],
+        instructions: Template = REPORT_INSTRUCTIONS,
+        max_tokens: int = 6000,
+        task: str = "צור דוח מותאם אישית בעברית עבור:"
+    ):
+        """
+        Build the Messages API request for a personalized report
+        
+        The system prompt (instructions + requirements catalog) is identical
+        for every survey of a database version and is marked for prompt
+        caching; only the short user message varies per survey.
         """
+        system = [{"type": "text", "text": instructions.substitute(business_type=self.business_type)}]
+        if self.catalog:
+            system.append({"type": "text", "text": self.catalog})
+        system[-1] = {**system[-1], "cache_control": {"type": "ephemeral"}}
+        
+        return {
+            'model': "claude-sonnet-4-20250514",
+            'max_tokens': max_tokens,
+            'system': system,
+            'messages': [{"role": "user", "content": self._build_ai_prompt(survey, requirements, task)}]
+        }
+    
+    def _build_ai_prompt(self, survey: SurveyRequest, requirements: List[RequirementResponse], task: str = "צור דוח מותאם אישית בעברית עבור:"):
+        """Build the per-survey part of the report prompt"""
+        if self.profile_bounds is None:
+            size = f'{survey.size} מ"ר'
+            capacity = f'{survey.max_people} מקומות ישיבה'
+            why_relevant = {}
+        else:
+            size = f'{format_bounds(self.profile_bounds["size"], "כל גודל")} מ"ר'
+            capacity = f'{format_bounds(self.profile_bounds["capacity"], "כל תפוסה")} מקומות ישיבה'
+            # Reasons naming the survey's exact size/capacity are replaced by the class's ranges
+            exact = relevance_reasons(survey)
+            ranged = relevance_reasons(survey, self.profile_bounds)
+            why_relevant = {exact[section]: ranged[section] for section in exact}
+        
+        if self.catalog:
+            # Full requirement details are in the cached catalog
+            requirements_summary = [
+                {'id': req.id, 'why_relevant': why_relevant.get(req.why_relevant, req.why_relevant)}
+                for req in requirements
+            ]
+        else:
+            requirements_summary = [
+                {
+                    'name': req.name,
+                    'authority': req.authority,
+                    'timeline': req.timeline,
+                    'cost': req.estimated_cost,
+                    'description': req.description,
+                    'why_relevant': why_relevant.get(req.why_relevant, req.why_relevant)
+                }
+                for req in requirements
+            ]
         
-        return report
+        return f"""
+{task}
+
+## נתוני העסק:
+- **סוג עסק**: {self.business_type}
+- **גודל**: {size}
+- **תפוסה מקסימלית**: {capacity}
+- **שימוש בגז**: {'כן' if survey.uses_gas else 'לא'}
+- **שירות משלוחים**: {'כן' if survey.has_delivery else 'לא'}
+- **הגשת בשר**: {'כן' if survey.serves_meat else 'לא'}
+
+## דרישות רגולטוריות רלוונטיות:
+{json.dumps(requirements_summary, ensure_ascii=False, indent=2)}
+
+התייחס רק לדרישות הרלוונטיות שלמעלה.
+        """
+    
+    def _generate_basic_report(self, survey: SurveyRequest, requirements: List[RequirementResponse]):
+        """Generate basic report without AI (fallback)"""
+        engine = self.report_engine or TemplateReportEngine([req.dict() for req in requirements], business_type=self.business_type)
+        return engine.render(survey, requirements)
     
     def calculate_total_cost_estimate(self, requirements: List[RequirementResponse]):
         """Calculate estimated total cost from requirements"""
-        costs = []
-        
-        for req in requirements:
-            cost_str = req.estimated_cost
-            if cost_str and cost_str != "לא מוגדר" and "₪" in cost_str:
-                try:
-                    # Extract numbers from strings like "500-800 ₪"
-                    numbers = re.findall(r'\d+', cost_str)
-                    if numbers:
-                        if len(numbers) >= 2:
-                            # Take average if range given
-                            avg_cost = (int(numbers[0]) + int(numbers[1])) / 2
-                        else:
-                            # Use single number
-                            avg_cost = int(numbers[0])
-                        costs.append(avg_cost)
-                except:
-                    continue
-        
-        if costs:
-            total = sum(costs)
-            return f"{int(total):,} ₪ (אומדן)"
-        
-        return "לא מוגדר"
-
+        return format_total_cost(total_cost(parse_cost(req.estimated_cost) for req in requirements))
+    
     def calculate_total_time_estimate(self, requirements: List[RequirementResponse]):
         """Calculate estimated total time from requirements"""
-        times = []
-        
-        for req in requirements:
-            timeline = req.timeline
-            if timeline and "שבוע" in timeline:
-                try:
-                    # Extract weeks from strings like "4-6 שבועות"
-                    weeks = re.findall(r'\d+', timeline)
-                    if weeks:
-                        # Take maximum weeks if range given
-                        max_weeks = max([int(w) for w in weeks])
-                        times.append(max_weeks)
-                except:
-                    continue
-        
-        if times:
-            max_time = max(times)
-            return f"{max_time} שבועות (משוער)"
-        
-        return "לא מוגדר"
\ No newline at end of file
+        return format_total_time(critical_path((req.authority, parse_timeline(req.timeline)) for req in requirements))
@@ -0,0 +1,128 @@
+"""
+Report document rendering - PDF/DOCX in a process pool with a byte cache
+"""
+
+import asyncio
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Optional, Tuple
+from app.services.pdf_generator import init_render_worker, render_document, DOCUMENT_MEDIA_TYPES
+from app.services.metrics import DOCUMENT_RENDER_SECONDS, DOCUMENT_RENDER_RESULTS
+from app.services.result_cache import SurveyResultCache
+from app.services.single_flight import SingleFlight
+
+class ReportRenderer:
+    """
+    Renders report documents off the event loop.
+
+    WeasyPrint layout is CPU-bound, so documents are rendered in worker
+    processes, with at most max_concurrent renders submitted at a time.
+    Rendered bytes are cached by a hash of the format, header date and
+    report markdown; concurrent requests for the same document share one
+    render, which runs to completion (and is cached) even if its callers
+    disconnect.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_concurrent: Optional[int] = None,
+        cache_entries: int = 64,
+        cache_ttl_seconds: float = 3600
+    ):
+        self.max_workers = max_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._semaphore = asyncio.Semaphore(max_concurrent or max_workers)
+        self.cache = SurveyResultCache(max_entries=cache_entries, ttl_seconds=cache_ttl_seconds)
+        self._flight = SingleFlight()
+        self.stats = {
+            'renders': 0,
+            'cache_hits': 0,
+            'coalesced': 0,
+            'errors': 0,
+            'render_seconds': 0.0
+        }
+
+    @staticmethod
+    def content_hash(document_format: str, markdown_text: str, generated_at: str) -> str:
+        """Cache key and ETag of a rendered document"""
+        content = f"{document_format}\0{generated_at}\0{markdown_text}"
+        return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+    async def render(self, document_format: str, markdown_text: str, generated_at: str) -> Tuple[bytes, str]:
+        """
+        Render a report document
+
+        Returns:
+            Tuple: (document bytes, content hash)
+        """
+        if document_format not in DOCUMENT_MEDIA_TYPES:
+            raise ValueError(f"Unsupported document format: {document_format}")
+
+        key = self.content_hash(document_format, markdown_text, generated_at)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.stats['cache_hits'] += 1
+            DOCUMENT_RENDER_RESULTS.inc(format=document_format, result="cache_hit")
+            return cached, key
+
+        if self._flight.is_in_flight(key):
+            self.stats['coalesced'] += 1
+            DOCUMENT_RENDER_RESULTS.inc(format=document_format, result="coalesced")
+        else:
+            DOCUMENT_RENDER_RESULTS.inc(format=document_format, result="rendered")
+
+        content = await self._flight.run(key, lambda: self._render_and_cache(key, document_format, markdown_text, generated_at))
+        return content, key
+
+    async def _render_and_cache(self, key: str, document_format: str, markdown_text: str, generated_at: str) -> bytes:
+        content = await self._render_in_pool(document_format, markdown_text, generated_at)
+        self.cache.put(key, content)
+        return content
+
+    async def _render_in_pool(self, document_format: str, markdown_text: str, generated_at: str) -> bytes:
+        async with self._semaphore:
+            if self._executor is None:
+                # Workers compile the stylesheet and load fonts once, not per render
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, initializer=init_render_worker)
+
+            started = time.perf_counter()
+            try:
+                content = await asyncio.get_running_loop().run_in_executor(
+                    self._executor, render_document, document_format, markdown_text, generated_at
+                )
+            except BrokenProcessPool:
+                # A crashed worker breaks the whole pool; start a fresh one next time
+                self._executor = None
+                self.stats['errors'] += 1
+                DOCUMENT_RENDER_SECONDS.observe(time.perf_counter() - started, format=document_format, outcome="error")
+                raise
+            except Exception:
+                self.stats['errors'] += 1
+                DOCUMENT_RENDER_SECONDS.observe(time.perf_counter() - started, format=document_format, outcome="error")
+                raise
+
+            elapsed = time.perf_counter() - started
+            self.stats['renders'] += 1
+            self.stats['render_seconds'] += elapsed
+            DOCUMENT_RENDER_SECONDS.observe(elapsed, format=document_format, outcome="ok")
+            return content
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> Dict:
+        """Get render counters and byte cache statistics"""
+        renders = self.stats['renders']
+        return {
+            **self.stats,
+            'avg_render_ms': round(self.stats['render_seconds'] / renders * 1000, 1) if renders else None,
+            'in_flight': self._flight.get_stats()['in_flight'],
+            'max_workers': self.max_workers,
+            'cache': self.cache.get_stats()
+        }
@@ -0,0 +1,133 @@
+"""
+Report store - generated reports for PDF/DOCX export, shared by all server processes
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id TEXT PRIMARY KEY,
+    business_name TEXT,
+    personalized_report TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_reports_expires_at ON reports (expires_at);
+"""
+
+
+def report_id(business_name: Optional[str], personalized_report: str) -> str:
+    """Content hash of a report: the same report always gets the same ID"""
+    content = f"{business_name or ''}\0{personalized_report}".encode('utf-8')
+    return hashlib.sha256(content).hexdigest()[:32]
+
+
+class ReportStore:
+    """
+    SQLite store of generated reports, keyed by content hash.
+
+    Every uvicorn worker opens the same database file, so a report saved
+    by the worker that generated it can be downloaded through any other.
+    Saving a report again refreshes its expiry. Expired reports are never
+    returned; at most every trim_interval_seconds a save also deletes them
+    and, when the store is over max_entries, the reports closest to expiring.
+
+    Calls block on SQLite, so request handlers run them in a thread.
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_entries: int = 1000,
+        ttl_seconds: float = 86400,
+        trim_interval_seconds: float = 60
+    ):
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.trim_interval_seconds = trim_interval_seconds
+        self._last_trim = 0.0
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+
+        # Used from request handlers and worker threads, serialized by the lock
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0
+        }
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def put(self, business_name: Optional[str], personalized_report: str) -> str:
+        """Store a report and return its ID"""
+        key = report_id(business_name, personalized_report)
+        now = time.time()
+        with self._lock, self._conn:
+            # A report already stored keeps its creation time
+            self._conn.execute(
+                """
+                INSERT INTO reports (report_id, business_name, personalized_report, created_at, expires_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (report_id) DO UPDATE SET expires_at = excluded.expires_at
+                """,
+                (key, business_name, personalized_report, datetime.now().isoformat(), now + self.ttl_seconds)
+            )
+            if now - self._last_trim >= self.trim_interval_seconds:
+                self._trim(now)
+        return key
+
+    def _trim(self, now: float):
+        """Delete expired reports and the ones over max_entries (caller holds the lock)"""
+        self._last_trim = now
+        self._conn.execute("DELETE FROM reports WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            """
+            DELETE FROM reports WHERE report_id IN (
+                SELECT report_id FROM reports ORDER BY expires_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (self.max_entries,)
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the stored report, or None if unknown or expired"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT business_name, personalized_report, created_at FROM reports WHERE report_id = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+
+        return {
+            'business_name': row['business_name'],
+            'personalized_report': row['personalized_report'],
+            'created_at': datetime.fromisoformat(row['created_at'])
+        }
+
+    def get_stats(self) -> Dict:
+        """Get lookup counters (this process) and store sizing (all processes)"""
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM reports WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        return {
+            **self.stats,
+            'size': size,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds
+        }
@@ -0,0 +1,104 @@
+"""
+Pre-serialized requirement payloads - JSON built once per database snapshot
+
+Most of a survey response is requirement bodies. Each requirement is
+validated and serialized to a JSON fragment at load time, ending just
+before its why_relevant value, so a response only joins the fragments of
+the matched requirements with the survey's relevance reasons (one per
+section) and splices the result into the response object.
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence
+import orjson
+from fastapi.responses import ORJSONResponse
+from pydantic import ValidationError
+from app.models import RequirementBody, RequirementResponse
+
+# Values used when a requirement omits a field (None counts as omitted for required text)
+REQUIREMENT_DEFAULTS = {
+    'id': 'unknown',
+    'name': 'unknown',
+    'category': 'unknown',
+    'authority': 'unknown',
+    'description': '',
+    'timeline': None,
+    'estimated_cost': None,
+    'priority': 'medium',
+    'source_location': None,
+}
+
+
+class RequirementPayloads:
+    """
+    Validated fields and JSON fragments of every requirement, by index position
+
+    By default every requirement is validated and serialized up front. With
+    lazy=True (binary snapshots, validated when written) a requirement is
+    only decoded the first time a response includes it, so loading does not
+    touch every record.
+    """
+
+    def __init__(self, requirements: Sequence, lazy: bool = False):
+        self.requirements = requirements
+        self.fields: List[Optional[Dict]] = [None] * len(requirements)
+        self.fragments: List[Optional[bytes]] = [None] * len(requirements)
+
+        if not lazy:
+            for position in range(len(requirements)):
+                self._build(position)
+
+    def _build(self, position: int) -> bytes:
+        req = self.requirements[position]
+        values = {}
+        for key, default in REQUIREMENT_DEFAULTS.items():
+            value = req.get(key, default)
+            values[key] = default if value is None else value
+        try:
+            fields = RequirementBody(**values).dict()
+        except ValidationError as e:
+            raise ValueError(f"Requirement '{values['id']}' has invalid fields: {e}")
+
+        self.fields[position] = fields
+        self.fragments[position] = fragment = orjson.dumps(fields)[:-1] + b',"why_relevant":'
+        return fragment
+
+    def fragment(self, position: int) -> bytes:
+        """JSON fragment of a requirement, up to its why_relevant value"""
+        return self.fragments[position] or self._build(position)
+
+    def requirement(self, position: int, why_relevant: str) -> RequirementResponse:
+        if self.fields[position] is None:
+            self._build(position)
+        return RequirementResponse(**self.fields[position], why_relevant=why_relevant)
+
+    def requirements_json(self, positions: Iterable[int], categories: Sequence[str], reasons: Dict[str, str]) -> bytes:
+        """JSON array of RequirementResponse objects for the matched positions"""
+        # Each section's reason is serialized once, not once per requirement
+        tails = {category: orjson.dumps(reason) + b'}' for category, reason in reasons.items()}
+        fragments = self.fragments
+        return b'[' + b','.join([
+            (fragments[position] or self._build(position)) + tails[categories[position]] for position in positions
+        ]) + b']'
+
+
+def splice_json(fields: Dict) -> bytes:
+    """JSON object of fields, in order; bytes values are already serialized JSON and are spliced in as is"""
+    members = []
+    for key, value in fields.items():
+        members.append(orjson.dumps(key) + b':' + (value if isinstance(value, bytes) else orjson.dumps(value)))
+    return b'{' + b','.join(members) + b'}'
+
+
+class SplicedJSONResponse(ORJSONResponse):
+    """
+    orjson response that sends already serialized JSON bytes unchanged
+
+    Returning a response object also skips FastAPI's response_model
+    validation and serialization; the endpoint's response_model still
+    documents the body.
+    """
+
+    def render(self, content) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return super().render(content)
@@ -0,0 +1,231 @@
+"""
+Compiled requirements index - resolves a survey to matching requirements
+without scanning the requirement lists on every request
+"""
+
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Database sections in the order requirements are reported to the user
+REQUIREMENT_SECTIONS = (
+    ('general', 'general_requirements'),
+    ('size', 'size_specific_requirements'),
+    ('capacity', 'capacity_specific_requirements'),
+    ('feature', 'feature_specific_requirements'),
+)
+
+# Survey flag -> condition key used by feature requirements
+FEATURE_FLAGS = (
+    ('uses_gas', 'requires_gas'),
+    ('has_delivery', 'has_delivery'),
+    ('serves_meat', 'serves_meat'),
+)
+
+
+class _IntervalIndex:
+    """
+    Inclusive [min, max] interval conditions compiled into two sorted
+    boundary arrays with prefix/suffix bitmasks.
+
+    A value v matches requirement r when min_r <= v and v <= max_r, so the
+    match set is (requirements with min <= v) AND (requirements with max >= v).
+    Each half is a single bisect into a precomputed cumulative mask.
+    """
+
+    def __init__(self, intervals: List[Tuple[int, object, object]]):
+        unbounded_min = 0
+        unbounded_max = 0
+        mins = []
+        maxs = []
+
+        for position, low, high in intervals:
+            if low is None:
+                unbounded_min |= 1 << position
+            else:
+                mins.append((float(low), position))
+            if high is None:
+                unbounded_max |= 1 << position
+            else:
+                maxs.append((float(high), position))
+
+        mins.sort()
+        maxs.sort()
+        self.min_values = [value for value, _ in mins]
+        self.max_values = [value for value, _ in maxs]
+
+        # min_masks[k] = requirements whose lower bound is among the k smallest
+        self.min_masks = [unbounded_min]
+        for _, position in mins:
+            self.min_masks.append(self.min_masks[-1] | (1 << position))
+
+        # max_masks[k] = requirements whose upper bound is among maxs[k:]
+        self.max_masks = [unbounded_max] * (len(maxs) + 1)
+        for k in range(len(maxs) - 1, -1, -1):
+            self.max_masks[k] = self.max_masks[k + 1] | (1 << maxs[k][1])
+
+    def bucket(self, value: float) -> Tuple[int, int]:
+        """Return the elementary interval the value falls into"""
+        return bisect_right(self.min_values, value), bisect_left(self.max_values, value)
+
+    def mask_for_bucket(self, bucket: Tuple[int, int]) -> int:
+        """Bitmask of requirements matching every value in the bucket"""
+        low, high = bucket
+        return self.min_masks[low] & self.max_masks[high]
+
+    def bucket_bounds(self, bucket: Tuple[int, int]) -> Tuple[Optional[Tuple[float, bool]], Optional[Tuple[float, bool]]]:
+        """
+        Values covered by a bucket, as (lower, upper) bounds
+
+        Each bound is (value, inclusive), or None when the bucket is open on
+        that side. A value is in the bucket when it is at or above the k-th
+        smallest lower bound and above the max values below it, and below
+        the next lower bound and at or under the next max value.
+        """
+        low, high = bucket
+        lower = []
+        if low > 0:
+            lower.append((self.min_values[low - 1], True))
+        if high > 0:
+            lower.append((self.max_values[high - 1], False))
+        upper = []
+        if low < len(self.min_values):
+            upper.append((self.min_values[low], False))
+        if high < len(self.max_values):
+            upper.append((self.max_values[high], True))
+
+        # The tightest bound wins; at equal values the exclusive one is tighter
+        return (
+            max(lower, key=lambda bound: (bound[0], not bound[1])) if lower else None,
+            min(upper, key=lambda bound: (bound[0], bound[1])) if upper else None
+        )
+
+
+class RequirementsIndex:
+    """
+    Requirements database compiled for fast survey matching.
+
+    Every requirement gets a position in a flat list; match results are
+    Python ints used as bitsets over those positions:
+    - general requirements are a constant mask
+    - size and capacity conditions are interval indexes
+    - feature conditions are a precomputed mask per gas/delivery/meat combination
+    """
+
+    def __init__(self, requirements_db: Dict, conditions_source: Optional[Callable[[int], Dict]] = None):
+        """
+        Args:
+            requirements_db: database dict with the requirement sections
+            conditions_source: optional position -> conditions lookup used
+                instead of each requirement's 'conditions' (binary snapshots
+                read them from their numeric columns)
+        """
+        self.requirements: List[Dict] = []
+        self.categories: List[str] = []
+        self.section_masks: Dict[str, int] = {}
+
+        size_intervals = []
+        capacity_intervals = []
+        feature_conditions = []
+
+        for category, section in REQUIREMENT_SECTIONS:
+            section_mask = 0
+            for req in requirements_db.get(section, []):
+                position = len(self.requirements)
+                self.requirements.append(req)
+                self.categories.append(category)
+                section_mask |= 1 << position
+
+                if category == 'general':
+                    continue
+                if conditions_source is not None:
+                    conditions = conditions_source(position)
+                else:
+                    conditions = req.get('conditions') or {}
+                if category == 'size':
+                    size_intervals.append((position, conditions.get('min_size_sqm'), conditions.get('max_size_sqm')))
+                elif category == 'capacity':
+                    capacity_intervals.append((position, conditions.get('min_capacity'), conditions.get('max_capacity')))
+                elif category == 'feature':
+                    feature_conditions.append((position, conditions))
+            self.section_masks[category] = section_mask
+
+        self.general_mask = self.section_masks['general']
+        self.size_index = _IntervalIndex(size_intervals)
+        self.capacity_index = _IntervalIndex(capacity_intervals)
+        self.feature_masks = self._compile_feature_masks(feature_conditions)
+
+    def _compile_feature_masks(self, feature_conditions: List[Tuple[int, Dict]]) -> List[int]:
+        """Precompute the matching feature mask for all 8 flag combinations"""
+        # excluded[flag_bit][flag_value] = requirements ruled out by that flag value
+        excluded = [[0, 0] for _ in FEATURE_FLAGS]
+        for position, conditions in feature_conditions:
+            for bit, (_, condition_key) in enumerate(FEATURE_FLAGS):
+                required = conditions.get(condition_key)
+                if required is True:
+                    excluded[bit][0] |= 1 << position
+                elif required is False:
+                    excluded[bit][1] |= 1 << position
+
+        masks = []
+        for combination in range(1 << len(FEATURE_FLAGS)):
+            mask = self.section_masks['feature']
+            for bit in range(len(FEATURE_FLAGS)):
+                mask &= ~excluded[bit][(combination >> bit) & 1]
+            masks.append(mask)
+        return masks
+
+    @staticmethod
+    def feature_combination(survey) -> int:
+        """Encode the survey's boolean flags as a 3-bit integer"""
+        combination = 0
+        for bit, (survey_field, _) in enumerate(FEATURE_FLAGS):
+            if getattr(survey, survey_field):
+                combination |= 1 << bit
+        return combination
+
+    def profile_key(self, survey) -> Tuple:
+        """
+        Equivalence class of the survey: surveys with the same key match
+        exactly the same requirements
+        """
+        return (
+            self.size_index.bucket(survey.size),
+            self.capacity_index.bucket(survey.max_people),
+            self.feature_combination(survey),
+        )
+
+    def profile_bounds(self, profile_key: Tuple) -> Dict[str, Tuple]:
+        """Size and capacity ranges shared by every survey with this profile key"""
+        size_bucket, capacity_bucket, _ = profile_key
+        return {
+            'size': self.size_index.bucket_bounds(size_bucket),
+            'capacity': self.capacity_index.bucket_bounds(capacity_bucket),
+        }
+
+    def match_profile(self, profile_key: Tuple) -> int:
+        """Return the bitmask of requirements relevant to a profile key"""
+        size_bucket, capacity_bucket, combination = profile_key
+        return (
+            self.general_mask
+            | self.size_index.mask_for_bucket(size_bucket)
+            | self.capacity_index.mask_for_bucket(capacity_bucket)
+            | self.feature_masks[combination]
+        )
+
+    def match(self, survey) -> int:
+        """Return the bitmask of requirements relevant to the survey"""
+        return self.match_profile(self.profile_key(survey))
+
+    def iter_positions(self, mask: int) -> Iterator[int]:
+        """Yield requirement positions set in the mask, in database order"""
+        while mask:
+            lowest = mask & -mask
+            yield lowest.bit_length() - 1
+            mask ^= lowest
+
+    def match_ids(self, survey) -> List[str]:
+        """Return the IDs of requirements relevant to the survey"""
+        return [
+            self.requirements[position].get('id', 'unknown')
+            for position in self.iter_positions(self.match(survey))
+        ]
@@ -2,120 +2,84 @@
 Requirements matching service - matches user survey to relevant requirements
 """
 
-from typing import List, Dict
-from app.models import SurveyRequest, RequirementResponse
+from typing import List, Dict, Optional, Tuple
+from app.models import SurveyRequest
+from app.services.requirements_index import RequirementsIndex
+from app.services.requirement_payloads import RequirementPayloads
 
 class RequirementsMatcher:
-    def __init__(self, requirements_db: Dict):
+    def __init__(self, requirements_db: Dict, index: Optional[RequirementsIndex] = None, payloads: Optional[RequirementPayloads] = None):
         self.db = requirements_db
-    
+        # Reuse the index and requirement payloads built at database load time when available
+        self.index = index if index is not None else RequirementsIndex(requirements_db)
+        self.payloads = payloads if payloads is not None else RequirementPayloads(self.index.requirements)
+
     def filter_requirements_for_business(self, survey: SurveyRequest):
         """Filter requirements based on business characteristics"""
-        relevant_requirements = []
-        
-        # Get all requirement categories
-        all_requirements = (
-            self.db.get('general_requirements', []) +
-            self.db.get('size_specific_requirements', []) +
-            self.db.get('capacity_specific_requirements', []) +
-            self.db.get('feature_specific_requirements', [])
+        return self.requirements_for_mask(self.index.match(survey), survey)
+
+    def requirements_for_mask(self, mask: int, survey: SurveyRequest):
+        """Build requirement responses for an index match mask"""
+        reasons = self._build_relevance_reasons(survey)
+        categories = self.index.categories
+
+        # Fields were read and validated at load time
+        return [
+            self.payloads.requirement(position, reasons[categories[position]])
+            for position in self.index.iter_positions(mask)
+        ]
+
+    def requirements_json(self, mask: int, survey: SurveyRequest) -> bytes:
+        """The same requirement responses as a JSON array, spliced from pre-serialized fragments"""
+        return self.payloads.requirements_json(
+            self.index.iter_positions(mask), self.index.categories, self._build_relevance_reasons(survey)
         )
-        
-        for req in all_requirements:
-            relevance_result = self._check_requirement_relevance(req, survey)
-            
-            if relevance_result['is_relevant']:
-                relevant_requirements.append(RequirementResponse(
-                    id=req.get('id', 'unknown'),
-                    name=req.get('name', 'unknown'),
-                    category=req.get('category', 'unknown'),
-                    authority=req.get('authority', 'unknown'),
-                    description=req.get('description', ''),
-                    timeline=req.get('timeline'),
-                    estimated_cost=req.get('estimated_cost'),
-                    priority=req.get('priority', 'medium'),
-                    source_location=req.get('source_location'),
-                    why_relevant=relevance_result['reason']
-                ))
-        
-        return relevant_requirements
-    
-    def _check_requirement_relevance(self, req: Dict, survey: SurveyRequest):
-        """Check if a requirement is relevant to the business and return reason"""
-        
-        # Check general requirements (usually apply to all)
-        if req in self.db.get('general_requirements', []):
-            return {
-                'is_relevant': True,
-                'reason': 'חובה על כל העסקים'
-            }
-        
-        # Check size-specific requirements
-        elif req in self.db.get('size_specific_requirements', []):
-            conditions = req.get('conditions', {})
-            min_size = conditions.get('min_size_sqm')
-            max_size = conditions.get('max_size_sqm')
-            
-            # Check size constraints
-            if min_size is not None and survey.size < min_size:
-                return {'is_relevant': False, 'reason': ''}
-            if max_size is not None and survey.size > max_size:
-                return {'is_relevant': False, 'reason': ''}
-                
-            return {
-                'is_relevant': True,
-                'reason': f'חל על עסקים בגודל {survey.size} מ"ר'
-            }
-        
-        # Check capacity-specific requirements
-        elif req in self.db.get('capacity_specific_requirements', []):
-            conditions = req.get('conditions', {})
-            min_capacity = conditions.get('min_capacity')
-            max_capacity = conditions.get('max_capacity')
-            
-            # Check capacity constraints
-            if min_capacity is not None and survey.max_people < min_capacity:
-                return {'is_relevant': False, 'reason': ''}
-            if max_capacity is not None and survey.max_people > max_capacity:
-                return {'is_relevant': False, 'reason': ''}
-                
-            return {
-                'is_relevant': True,
-                'reason': f'חל על עסקים עם תפוסה של {survey.max_people} אנשים'
-            }
-        
-        # Check feature-specific requirements
-        elif req in self.db.get('feature_specific_requirements', []):
-            conditions = req.get('conditions', {})
-            
-            # Check gas requirement
-            if conditions.get('requires_gas') is True and not survey.uses_gas:
-                return {'is_relevant': False, 'reason': ''}
-            if conditions.get('requires_gas') is False and survey.uses_gas:
-                return {'is_relevant': False, 'reason': ''}
-                
-            # Check delivery requirement
-            if conditions.get('has_delivery') is True and not survey.has_delivery:
-                return {'is_relevant': False, 'reason': ''}
-            if conditions.get('has_delivery') is False and survey.has_delivery:
-                return {'is_relevant': False, 'reason': ''}
-                
-            # Check meat serving requirement
-            if conditions.get('serves_meat') is True and not survey.serves_meat:
-                return {'is_relevant': False, 'reason': ''}
-            if conditions.get('serves_meat') is False and survey.serves_meat:
-                return {'is_relevant': False, 'reason': ''}
-            
-            # If we get here, it's relevant - build reason from features
-            features = []
-            if survey.uses_gas: features.append("שימוש בגז")
-            if survey.has_delivery: features.append("משלוחים")
-            if survey.serves_meat: features.append("הגשת בשר")
-            
-            return {
-                'is_relevant': True,
-                'reason': f'רלוונטי למאפיינים: {", ".join(features)}' if features else 'רלוונטי למאפיינים מיוחדים'
-            }
-        
-        # Default: not relevant
-        return {'is_relevant': False, 'reason': ''}
\ No newline at end of file
+
+    def _build_relevance_reasons(self, survey: SurveyRequest):
+        """Build the 'why relevant' explanation for each requirement section"""
+        return relevance_reasons(survey)
+
+
+def format_bounds(bounds: Tuple, unbounded: str) -> str:
+    """Text of a profile range from RequirementsIndex.profile_bounds, e.g. 'מעל 50 ועד 200'"""
+    lower, upper = bounds
+    if lower is not None and upper is not None and lower[0] == upper[0]:
+        return f"{lower[0]:g}"
+    parts = []
+    if lower is not None:
+        value, inclusive = lower
+        parts.append(f"{'מ-' if inclusive else 'מעל '}{value:g}")
+    if upper is not None:
+        value, inclusive = upper
+        parts.append(f"{'עד ' if inclusive else 'פחות מ-'}{value:g}")
+    return ' ו'.join(parts) if parts else unbounded
+
+
+def relevance_reasons(survey: SurveyRequest, profile_bounds: Optional[Dict] = None):
+    """
+    The 'why relevant' explanation for each requirement section
+
+    With profile_bounds, size and capacity are described by the ranges of
+    the survey's profile class instead of its exact values, so the text
+    holds for every survey in the class.
+    """
+
+    # Feature requirements are explained by the business's active features
+    features = []
+    if survey.uses_gas: features.append("שימוש בגז")
+    if survey.has_delivery: features.append("משלוחים")
+    if survey.serves_meat: features.append("הגשת בשר")
+
+    if profile_bounds is None:
+        size = survey.size
+        capacity = survey.max_people
+    else:
+        size = format_bounds(profile_bounds['size'], 'כל גודל')
+        capacity = format_bounds(profile_bounds['capacity'], 'כל תפוסה')
+
+    return {
+        'general': 'חובה על כל העסקים',
+        'size': f'חל על עסקים בגודל {size} מ"ר',
+        'capacity': f'חל על עסקים עם תפוסה של {capacity} אנשים',
+        'feature': f'רלוונטי למאפיינים: {", ".join(features)}' if features else 'רלוונטי למאפיינים מיוחדים'
+    }
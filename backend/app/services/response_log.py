@@ -0,0 +1,191 @@
+"""
+Survey response log - buffered, append-only JSONL written off the request path
+"""
+
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from app.services.metrics import PERSIST_SECONDS, PERSIST_RECORDS
+
+logger = logging.getLogger(__name__)
+
+
+def serialize_record(entry: Dict) -> str:
+    """Compact JSON form of a record, as written to the log"""
+    return json.dumps(entry, ensure_ascii=False, separators=(',', ':'))
+
+
+class SurveyResponseLog:
+    """
+    Background writer for survey analytics records.
+
+    Requests only enqueue a compact record (survey fields, requirement IDs
+    and the database version). A single task drains the queue and appends
+    the records to responses-<pid>.jsonl in batches, flushing when max_batch
+    records are pending or flush_interval seconds have passed. Each server
+    process writes (and rotates) its own file, so workers never interleave
+    appends or race on a rotation. The file is rotated to
+    responses-<pid>-<timestamp>.jsonl once it exceeds max_file_bytes. A batch
+    that cannot be written stays queued and is retried with the next flush.
+
+    Sinks registered with add_sink receive every flushed batch in the same
+    worker thread, e.g. to mirror records into the analytics store.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        max_batch: int = 100,
+        flush_interval: float = 2.0,
+        max_file_bytes: int = 50 * 1024 * 1024,
+        max_queue: int = 10000
+    ):
+        self.log_dir = log_dir
+        self.path = os.path.join(log_dir, f"responses-{os.getpid()}.jsonl")
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_file_bytes = max_file_bytes
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        # Records taken off the queue but not yet written
+        self._batch: List[Dict] = []
+        self._sinks: List[Callable[[List[Dict]], object]] = []
+        self.stats = {
+            'records_written': 0,
+            'records_dropped': 0,
+            'flushes': 0,
+            'rotations': 0,
+            'write_errors': 0,
+            'sink_errors': 0
+        }
+
+    def record(self, entry: Dict):
+        """Queue a record for writing; never blocks the caller"""
+        try:
+            self._queue.put_nowait(entry)
+        except asyncio.QueueFull:
+            # Analytics must not slow down or fail user requests
+            self.stats['records_dropped'] += 1
+
+    def add_sink(self, sink: Callable[[List[Dict]], object]):
+        """Register a callable that receives each flushed batch (runs off the event loop)"""
+        self._sinks.append(sink)
+
+    def start(self):
+        """Start the background writer task"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer and flush everything still queued"""
+        if self._task is not None:
+            # The flag covers a cancellation swallowed by wait_for racing a completed get()
+            self._stopping = True
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        pending, self._batch = self._batch, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        if pending:
+            await self._flush(pending)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping:
+            # A batch kept after a failed write is retried without waiting for new records
+            if not self._batch:
+                self._batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval
+
+            while len(self._batch) < self.max_batch and not self._stopping:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            batch, self._batch = self._batch, []
+            if not await self._flush(batch):
+                await asyncio.sleep(self.flush_interval)
+
+    async def _flush(self, batch: List[Dict]) -> bool:
+        lines = ''.join(serialize_record(entry) + '\n' for entry in batch)
+        try:
+            await asyncio.to_thread(self._append, lines, batch)
+            self.stats['records_written'] += len(batch)
+            self.stats['flushes'] += 1
+            return True
+        except Exception as e:
+            self.stats['write_errors'] += 1
+            logger.warning("Error writing survey response log", extra={'records': len(batch), 'error': str(e)})
+
+        # Keep the batch for the next flush, within the queue's bound
+        self._batch[:0] = batch
+        excess = len(self._batch) - self._queue.maxsize
+        if excess > 0:
+            del self._batch[:excess]
+            self.stats['records_dropped'] += excess
+        return False
+
+    def _append(self, lines: str, batch: List[Dict]):
+        started = time.perf_counter()
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            if os.path.exists(self.path) and os.path.getsize(self.path) >= self.max_file_bytes:
+                try:
+                    self._rotate()
+                except OSError as e:
+                    # Keep appending to the current file rather than lose the batch
+                    logger.warning("Error rotating survey response log", extra={'path': self.path, 'error': str(e)})
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+        except Exception:
+            PERSIST_SECONDS.observe(time.perf_counter() - started, target="jsonl", outcome="error")
+            raise
+        PERSIST_SECONDS.observe(time.perf_counter() - started, target="jsonl", outcome="ok")
+        PERSIST_RECORDS.inc(len(batch), target="jsonl")
+
+        # The log file is the source of truth; a failing sink only loses its copy
+        for sink in self._sinks:
+            target = getattr(sink, '__qualname__', 'sink')
+            started = time.perf_counter()
+            try:
+                sink(batch)
+            except Exception as e:
+                PERSIST_SECONDS.observe(time.perf_counter() - started, target=target, outcome="error")
+                self.stats['sink_errors'] += 1
+                logger.warning("Survey response log sink failed", extra={'sink': target, 'error': str(e)})
+                continue
+            PERSIST_SECONDS.observe(time.perf_counter() - started, target=target, outcome="ok")
+            PERSIST_RECORDS.inc(len(batch), target=target)
+
+    def _rotate(self):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = os.path.join(self.log_dir, f"responses-{os.getpid()}-{timestamp}")
+        rotated = f"{prefix}.jsonl"
+        suffix = 1
+        while os.path.exists(rotated):
+            rotated = f"{prefix}-{suffix}.jsonl"
+            suffix += 1
+        os.replace(self.path, rotated)
+        self.stats['rotations'] += 1
+
+    def get_stats(self) -> Dict:
+        """Get writer counters and queue depth"""
+        return {
+            **self.stats,
+            'pending': self._queue.qsize(),
+            'path': self.path
+        }
@@ -0,0 +1,178 @@
+"""
+Full-text search index over requirements - BM25 ranking with Hebrew normalization
+"""
+
+import heapq
+import math
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+from app.utils.hebrew_text import normalize_hebrew, tokenize, prefix_variants
+
+# Searched fields and their term-frequency weights
+SEARCH_FIELDS = (
+    ('name', 2.0),
+    ('description', 1.0),
+)
+
+# Fields filtered by substring (authority=..., category=...)
+FILTER_FIELDS = ('authority', 'category')
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Score multipliers for looser matches than the exact normalized token
+PREFIX_STRIPPED_WEIGHT = 0.8
+AUTOCOMPLETE_WEIGHT = 0.5
+MAX_AUTOCOMPLETE_TERMS = 50
+
+
+class SearchIndex:
+    """
+    Inverted index built once per database snapshot.
+
+    Each token is indexed under its normalized form and, separately, under
+    its prefix-stripped stems ("והרישיון" is found by "רישיון"). A query
+    token is looked up as typed, as a stem, with its own prefixes stripped,
+    and - for the last token - as a prefix of indexed words, so partially
+    typed queries still match. Per query token a document keeps its best
+    weighted BM25 score; the document score is the sum over query tokens.
+    """
+
+    def __init__(self, requirements: Sequence):
+        self.requirements = requirements
+        self.filter_values: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+
+        # term -> {position: weighted term frequency}, then BM25-saturated below
+        terms: Dict[str, Dict[int, float]] = {}
+        stems: Dict[str, Dict[int, float]] = {}
+        doc_lengths: List[float] = []
+        variants_cache: Dict[str, List[str]] = {}
+
+        for position, req in enumerate(requirements):
+            frequencies: Dict[str, float] = {}
+            for field, weight in SEARCH_FIELDS:
+                for token in tokenize(req.get(field) or ''):
+                    frequencies[token] = frequencies.get(token, 0.0) + weight
+            doc_lengths.append(sum(frequencies.values()))
+
+            for token, tf in frequencies.items():
+                terms.setdefault(token, {})[position] = tf
+                stripped = variants_cache.get(token)
+                if stripped is None:
+                    stripped = variants_cache[token] = prefix_variants(token)[1:]
+                for stem in stripped:
+                    postings = stems.setdefault(stem, {})
+                    postings[position] = postings.get(position, 0.0) + tf
+
+            for field in FILTER_FIELDS:
+                value = normalize_hebrew(req.get(field) or '')
+                self.filter_values[field].setdefault(value, []).append(position)
+
+        self.doc_count = len(requirements)
+        avg_length = (sum(doc_lengths) / self.doc_count) if self.doc_count else 0.0
+
+        # Length normalization is fixed per document, so each posting stores its
+        # final BM25 term weight and a query only multiplies by the IDF
+        norms = [BM25_K1 * (1 - BM25_B + BM25_B * length / avg_length) if avg_length else BM25_K1
+                 for length in doc_lengths]
+        for index in (terms, stems):
+            for postings in index.values():
+                for position, tf in postings.items():
+                    postings[position] = tf * (BM25_K1 + 1) / (tf + norms[position])
+
+        self.terms = terms
+        self.stems = stems
+        self.vocabulary = sorted(terms)
+
+    def _idf(self, postings: Dict[int, float]) -> float:
+        df = len(postings)
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def _score_postings(self, postings: Dict[int, float], weight: float, best: Dict[int, float]):
+        """Merge weighted BM25 scores of one posting list into best (max per document)"""
+        factor = self._idf(postings) * weight
+        if not best:
+            best.update({position: factor * term_weight for position, term_weight in postings.items()})
+            return
+        for position, term_weight in postings.items():
+            score = factor * term_weight
+            if score > best.get(position, 0.0):
+                best[position] = score
+
+    def _autocomplete(self, token: str) -> List[str]:
+        """Indexed terms that start with token (excluding token itself)"""
+        start = bisect_left(self.vocabulary, token)
+        completions = []
+        for term in self.vocabulary[start:start + MAX_AUTOCOMPLETE_TERMS + 1]:
+            if not term.startswith(token):
+                break
+            if term != token:
+                completions.append(term)
+        return completions[:MAX_AUTOCOMPLETE_TERMS]
+
+    def _score_query(self, query: str) -> Dict[int, float]:
+        tokens = tokenize(query)
+        scores: Dict[int, float] = {}
+
+        for i, token in enumerate(tokens):
+            best: Dict[int, float] = {}
+            if token in self.terms:
+                self._score_postings(self.terms[token], 1.0, best)
+            if token in self.stems:
+                self._score_postings(self.stems[token], PREFIX_STRIPPED_WEIGHT, best)
+            for stem in prefix_variants(token)[1:]:
+                for postings in (self.terms.get(stem), self.stems.get(stem)):
+                    if postings:
+                        self._score_postings(postings, PREFIX_STRIPPED_WEIGHT, best)
+            if i == len(tokens) - 1 and len(token) >= 2:
+                for term in self._autocomplete(token):
+                    self._score_postings(self.terms[term], AUTOCOMPLETE_WEIGHT, best)
+
+            if not scores:
+                scores = best
+                continue
+            for position, score in best.items():
+                scores[position] = scores.get(position, 0.0) + score
+
+        return scores
+
+    def _filter_positions(self, field: str, needle: str) -> set:
+        """Positions whose field contains the normalized needle"""
+        needle = normalize_hebrew(needle)
+        positions = set()
+        for value, value_positions in self.filter_values[field].items():
+            if needle in value:
+                positions.update(value_positions)
+        return positions
+
+    def search(
+        self,
+        query: Optional[str] = None,
+        authority: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[List[Tuple[int, Optional[float]]], int]:
+        """
+        Search requirements
+
+        Returns:
+            Tuple: ([(position, score)] for the requested page, total matches).
+            Without a query, results are in database order with a None score.
+        """
+        allowed = None
+        for field, needle in (('authority', authority), ('category', category)):
+            if needle:
+                positions = self._filter_positions(field, needle)
+                allowed = positions if allowed is None else allowed & positions
+
+        if query and query.strip():
+            scores = self._score_query(query)
+            if allowed is not None:
+                scores = {position: score for position, score in scores.items() if position in allowed}
+            # Only the requested page is ordered, not every match
+            top = heapq.nsmallest(offset + limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return top[offset:], len(scores)
+
+        positions = range(self.doc_count) if allowed is None else sorted(allowed)
+        return [(position, None) for position in positions[offset:offset + limit]], len(positions)
@@ -0,0 +1,130 @@
+"""
+Single-flight execution - concurrent calls with the same key share one in-flight result
+"""
+
+import asyncio
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, List, Optional
+
+
+class _SharedStream:
+    """Chunks produced so far by one upstream stream, and its outcome"""
+
+    def __init__(self):
+        self.chunks: List[Any] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task] = None
+        self._changed = asyncio.Event()
+
+    def notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        await self._changed.wait()
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent work by key.
+
+    The first caller for a key starts the work as a task; callers arriving
+    while it runs await the same task instead of starting their own. The
+    key is forgotten as soon as the task finishes, so this only merges
+    overlapping calls (results are not cached). Errors reach every waiter.
+
+    The task is shielded from its callers: a caller that disconnects
+    does not cancel the work the other waiters depend on.
+
+    Streams are shared the same way: one task consumes the upstream
+    iterator and every subscriber receives all of its chunks, including
+    the ones produced before it joined. The upstream is cancelled once
+    its last subscriber leaves, since nobody would receive the rest.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+        self._streams: Dict[Hashable, _SharedStream] = {}
+        self.stats = {
+            'calls': 0,
+            'coalesced': 0
+        }
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Any:
+        """Result of work(), shared with any concurrent call for the same key"""
+        task = self._in_flight.get(key)
+        if task is None:
+            self.stats['calls'] += 1
+            task = asyncio.ensure_future(work())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        else:
+            self.stats['coalesced'] += 1
+        return await asyncio.shield(task)
+
+    async def stream(self, key: Hashable, work: Callable[[], AsyncIterator[Any]]) -> AsyncIterator[Any]:
+        """Chunks of work(), shared with any concurrent stream for the same key"""
+        shared = self._streams.get(key)
+        if shared is None:
+            self.stats['calls'] += 1
+            shared = _SharedStream()
+            self._streams[key] = shared
+            shared.task = asyncio.ensure_future(self._produce(key, shared, work))
+        else:
+            self.stats['coalesced'] += 1
+
+        shared.subscribers += 1
+        try:
+            position = 0
+            while True:
+                if position < len(shared.chunks):
+                    position += 1
+                    yield shared.chunks[position - 1]
+                elif shared.done:
+                    if shared.error is not None:
+                        raise shared.error
+                    return
+                else:
+                    await shared.wait()
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.task.done():
+                # New callers start a fresh stream rather than join a cancelled one
+                self._forget_stream(key, shared)
+                shared.task.cancel()
+
+    async def _produce(self, key: Hashable, shared: _SharedStream, work: Callable[[], AsyncIterator[Any]]):
+        try:
+            async for chunk in work():
+                shared.chunks.append(chunk)
+                shared.notify()
+        except Exception as e:
+            shared.error = e
+        finally:
+            shared.done = True
+            shared.notify()
+            self._forget_stream(key, shared)
+
+    def _forget_stream(self, key: Hashable, shared: _SharedStream):
+        if self._streams.get(key) is shared:
+            del self._streams[key]
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        return key in self._in_flight or key in self._streams
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Waiters (if any) re-raise it; otherwise mark it retrieved
+        if not task.cancelled():
+            task.exception()
+
+    def get_stats(self) -> Dict:
+        calls = self.stats['calls']
+        coalesced = self.stats['coalesced']
+        return {
+            **self.stats,
+            'in_flight': len(self._in_flight) + len(self._streams),
+            'coalesced_rate': round(coalesced / (calls + coalesced), 3) if calls + coalesced else 0.0
+        }
@@ -0,0 +1,245 @@
+"""
+Template report engine - full sectioned reports without an LLM call
+"""
+
+from string import Template
+from typing import Dict, List, Optional, Sequence
+from app.models import SurveyRequest, RequirementResponse, DEFAULT_BUSINESS_TYPE, business_type_name
+from app.utils.estimates import (
+    requirement_estimates, total_cost, critical_path,
+    format_total_cost, format_total_time, format_duration
+)
+
+# fast: template only, ai: full LLM report, hybrid: template + LLM narrative
+REPORT_MODES = ('fast', 'ai', 'hybrid')
+
+NOT_DEFINED = 'לא מוגדר'
+
+# Requirement priorities as extracted (Hebrew) or defaulted by the matcher (English)
+PRIORITY_LEVELS = {
+    'גבוהה': 'high',
+    'high': 'high',
+    'בינונית': 'medium',
+    'medium': 'medium',
+    'נמוכה': 'low',
+    'low': 'low',
+}
+
+PHASE_TITLES = {
+    1: 'שלב 1 (התחלה)',
+    2: 'שלב 2 (במקביל)',
+    3: 'שלב 3 (סיום)',
+}
+
+# Parsed once at import; a report is filled with a single substitute() call
+REPORT_TEMPLATE = Template("""# 📋 דוח רישוי עסקים$business_title
+
+## פרטי העסק
+- **סוג עסק**: $business_type
+- **גודל**: $size מ"ר
+- **תפוסה מקסימלית**: $max_people מקומות ישיבה
+- **שימוש בגז**: $uses_gas
+- **שירות משלוחים**: $has_delivery
+- **הגשת בשר**: $serves_meat$location
+
+### 1. 📋 סיכום מנהלים
+- **סך הכל רישיונות ואישורים נדרשים**: $requirements_count
+- **זמן כולל משוער**: $total_time
+- **עלות כוללת משוערת**: $total_cost
+- **המלצה עיקרית**: $recommendation
+$narrative
+### 2. 📜 רישיונות ואישורים נדרשים
+$licenses
+### 3. ⏰ לוח זמנים מומלץ (סדר עדיפויות)
+$phases
+### 4. 💰 עלויות משוערות
+$costs
+### 5. ✅ רשימת מטלות לביצוע (צ'קליסט)
+$checklist
+### 6. ⚠️ הערות חשובות
+$notes""")
+
+NARRATIVE_TEMPLATE = Template("""
+#### 💡 המלצות מותאמות
+$text
+""")
+
+STATIC_NOTES = (
+    "- הדוח נבנה מהדרישות שחולצו מהמסמך הרגולטורי בלבד; יש לאמת את הפרטים מול כל גוף מוסמך.\n"
+    "- דרישות שזמן הטיפול או העלות שלהן 'לא מוגדר' דורשות בירור ישיר מול הגוף המוסמך.\n"
+    "- שינוי בגודל העסק, בתפוסה או במאפייני הפעילות עשוי לשנות את רשימת הדרישות.\n"
+)
+
+
+def _yes_no(value: bool) -> str:
+    return 'כן' if value else 'לא'
+
+
+def requirement_phase(category: str, priority: Optional[str]) -> int:
+    """
+    Recommended phase of a requirement
+
+    Lower-priority requirements close the process (phase 3). High-priority
+    general requirements apply to every business and open it (phase 1);
+    the remaining high-priority ones are handled in parallel (phase 2).
+    """
+    level = PRIORITY_LEVELS.get((priority or '').strip(), 'medium')
+    if level != 'high':
+        return 3
+    return 1 if category == 'general' else 2
+
+
+class RequirementFragments:
+    """Pre-rendered report text of one requirement"""
+
+    __slots__ = ('name', 'authority', 'phase', 'license_head', 'license_tail',
+                 'checklist_line', 'cost_line', 'cost_estimate', 'timeline_estimate')
+
+    def __init__(self, req, category: str):
+        self.name = req.get('name') or 'unknown'
+        self.authority = req.get('authority') or 'unknown'
+        self.phase = requirement_phase(category, req.get('priority'))
+
+        # The entry number and why_relevant vary per survey; the rest is fixed
+        self.license_head = (
+            f". {self.name}\n"
+            f"- **גוף מוסמך**: {self.authority}\n"
+            f"- **זמן טיפול**: {req.get('timeline') or NOT_DEFINED}\n"
+            f"- **עלות משוערת**: {req.get('estimated_cost') or NOT_DEFINED}\n"
+            f"- **למה זה חשוב**: "
+        )
+        self.license_tail = f"\n- **תיאור**: {req.get('description') or ''}\n"
+
+        self.checklist_line = f"- [ ] {self.name} - מול {self.authority}\n"
+        cost = req.get('estimated_cost')
+        self.cost_line = f"- **{self.name}**: {cost}\n" if cost and cost != NOT_DEFINED else None
+        # Parsed at ingestion; older databases are parsed here, once per load
+        self.cost_estimate, self.timeline_estimate = requirement_estimates(req)
+
+    def license(self, number: int, why_relevant: str) -> str:
+        return "\n#### " + str(number) + self.license_head + why_relevant + self.license_tail
+
+
+class TemplateReportEngine:
+    """
+    Deterministic report renderer built once per database snapshot.
+
+    Every requirement's license entry, checklist line, cost line, phase and
+    parsed estimates are prepared at load time, so rendering a report only
+    concatenates the fragments of the matched requirements, groups them into
+    phases by priority and authority, and fills the report template. With
+    lazy=True (binary snapshots) a requirement's fragments are prepared the
+    first time a report includes it.
+    """
+
+    def __init__(
+        self,
+        requirements: Sequence,
+        categories: Optional[Sequence[str]] = None,
+        business_type: Optional[str] = None,
+        lazy: bool = False
+    ):
+        # Display name of the snapshot's business type, for reports and AI prompts
+        self.business_type = business_type or business_type_name(DEFAULT_BUSINESS_TYPE)
+        self.requirements = requirements
+        self.categories = categories
+        self.fragments: List[Optional[RequirementFragments]] = [None] * len(requirements)
+        self.positions: Dict[str, int] = {}
+
+        for position, req in enumerate(requirements):
+            self.positions.setdefault(req.get('id'), position)
+            if not lazy:
+                self._build(position)
+
+    def _build(self, position: int) -> RequirementFragments:
+        req = self.requirements[position]
+        category = self.categories[position] if self.categories is not None else req.get('category', '')
+        self.fragments[position] = fragments = RequirementFragments(req, category)
+        return fragments
+
+    def _fragments_for(self, requirements: List[RequirementResponse]) -> List[RequirementFragments]:
+        fragments = []
+        for req in requirements:
+            position = self.positions.get(req.id)
+            if position is None:
+                # Not from this snapshot (e.g. a caller-built response); render it directly
+                fragments.append(RequirementFragments(req.dict(), req.category))
+            else:
+                fragments.append(self.fragments[position] or self._build(position))
+        return fragments
+
+    def estimate(self, requirements: List[RequirementResponse]):
+        """Total cost and time estimates, from the values parsed at load time"""
+        fragments = self._fragments_for(requirements)
+        return (
+            format_total_cost(total_cost(fragment.cost_estimate for fragment in fragments)),
+            format_total_time(critical_path((fragment.authority, fragment.timeline_estimate) for fragment in fragments))
+        )
+
+    def render(self, survey: SurveyRequest, requirements: List[RequirementResponse], narrative: Optional[str] = None) -> str:
+        """Render the full report for a survey and its matched requirements"""
+        fragments = self._fragments_for(requirements)
+
+        licenses = []
+        checklist = []
+        costs = []
+        cost_estimates = []
+        timelines = []
+        # phase -> authority -> requirement names, in first-appearance order
+        phases: Dict[int, Dict[str, List[str]]] = {}
+
+        for number, (fragment, req) in enumerate(zip(fragments, requirements), 1):
+            licenses.append(fragment.license(number, req.why_relevant))
+            checklist.append(fragment.checklist_line)
+            if fragment.cost_line:
+                costs.append(fragment.cost_line)
+            cost_estimates.append(fragment.cost_estimate)
+            timelines.append((fragment.authority, fragment.timeline_estimate))
+            phases.setdefault(fragment.phase, {}).setdefault(fragment.authority, []).append(fragment.name)
+
+        path = critical_path(timelines)
+        total_time = format_total_time(path)
+        total_cost_text = format_total_cost(total_cost(cost_estimates))
+
+        phase_lines = []
+        for phase in sorted(phases):
+            phase_lines.append(f"\n**{PHASE_TITLES[phase]}**\n")
+            for authority, names in phases[phase].items():
+                phase_lines.append(f"- {authority}: {', '.join(names)}\n")
+        if path and path['max_days']:
+            phase_lines.append(
+                f"\n**הנתיב הארוך ביותר**: {path['authority']} - {format_duration(path['max_days'])}"
+                " (דרישות של אותו גוף מטופלות ברצף, גופים שונים במקביל)\n"
+            )
+
+        if costs:
+            costs.append(f"\n**סך הכל משוער**: {total_cost_text}\n")
+        else:
+            costs.append("לא צוינו עלויות בדרישות הרלוונטיות; יש לברר אותן מול הגופים המוסמכים.\n")
+
+        first_phase = phases[min(phases)] if phases else {}
+        recommendation = (
+            f"התחל ב{PHASE_TITLES[min(phases)]} מול {', '.join(first_phase)}"
+            if first_phase else "אין דרישות רלוונטיות"
+        )
+
+        return REPORT_TEMPLATE.substitute(
+            business_title=f" - {survey.business_name}" if survey.business_name else "",
+            business_type=self.business_type,
+            size=survey.size,
+            max_people=survey.max_people,
+            uses_gas=_yes_no(survey.uses_gas),
+            has_delivery=_yes_no(survey.has_delivery),
+            serves_meat=_yes_no(survey.serves_meat),
+            location=f"\n- **מיקום**: {survey.location}" if survey.location else "",
+            requirements_count=len(requirements),
+            total_time=total_time,
+            total_cost=total_cost_text,
+            recommendation=recommendation,
+            narrative=NARRATIVE_TEMPLATE.substitute(text=narrative.strip()) if narrative else "",
+            licenses=''.join(licenses),
+            phases=''.join(phase_lines),
+            costs=''.join(costs),
+            checklist=''.join(checklist),
+            notes=STATIC_NOTES
+        )
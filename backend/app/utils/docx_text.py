@@ -0,0 +1,218 @@
+"""
+Streaming text extraction from Word (.docx) documents
+
+The main document part is read straight from the docx zip with an
+incremental XML parser, one body-level paragraph or table at a time, and
+each finished block is dropped from the tree. Memory stays flat and time
+is linear in the document size, unlike building the full python-docx
+object model.
+
+Lines are section-marked for the extraction pipeline:
+    === SECTION_HEADER: <text> ===   heading/title-styled paragraphs
+    --- SUBSECTION: <text> ---       paragraphs whose first run is bold
+    --- TABLE ---                    followed by one "| a | b |" line per row
+    --- END TABLE ---
+
+Table rows repeat the text of vertically merged cells, so each row reads
+on its own (e.g. an occupancy range next to every requirement it covers).
+"""
+
+import posixpath
+import zipfile
+from typing import Dict, Iterator, List, Optional
+from xml.etree import ElementTree
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+STYLES_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+
+TABLE_START = "--- TABLE ---"
+TABLE_END = "--- END TABLE ---"
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NS}}}{tag}"
+
+
+P, TBL, TR, TC, R = _w('p'), _w('tbl'), _w('tr'), _w('tc'), _w('r')
+T, TAB, BR, CR = _w('t'), _w('tab'), _w('br'), _w('cr')
+PPR, PSTYLE, RPR, B, VAL = _w('pPr'), _w('pStyle'), _w('rPr'), _w('b'), _w('val')
+TCPR, GRID_SPAN, V_MERGE = _w('tcPr'), _w('gridSpan'), _w('vMerge')
+BODY, SDT, SDT_CONTENT, CUSTOM_XML = _w('body'), _w('sdt'), _w('sdtContent'), _w('customXml')
+DOC_PART_GALLERY = f"{_w('sdtPr')}/{_w('docPartObj')}/{_w('docPartGallery')}"
+DEL, MOVE_FROM = _w('del'), _w('moveFrom')
+
+# Containers whose paragraphs and tables belong to the enclosing flow
+_BLOCK_WRAPPERS = {SDT, SDT_CONTENT, CUSTOM_XML}
+
+_FALSE_VALUES = {'0', 'false', 'off'}
+
+
+def _relationship_target(archive: zipfile.ZipFile, rels_path: str, rel_type: str, base_dir: str) -> Optional[str]:
+    try:
+        rels = ElementTree.fromstring(archive.read(rels_path))
+    except KeyError:
+        return None
+    for rel in rels.iter(f"{{{REL_NS}}}Relationship"):
+        if rel.get('Type') == rel_type:
+            target = rel.get('Target', '')
+            return target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(base_dir, target))
+    return None
+
+
+def _paragraph_style_names(archive: zipfile.ZipFile, styles_path: Optional[str]) -> Dict[Optional[str], str]:
+    """Lowercase paragraph style name per style id (None -> the default paragraph style)"""
+    names: Dict[Optional[str], str] = {}
+    if not styles_path:
+        return names
+    try:
+        styles = ElementTree.fromstring(archive.read(styles_path))
+    except KeyError:
+        return names
+    for style in styles.iter(_w('style')):
+        if style.get(_w('type')) != 'paragraph':
+            continue
+        name_element = style.find(_w('name'))
+        name = (name_element.get(VAL) if name_element is not None else style.get(_w('styleId'))) or ''
+        names[style.get(_w('styleId'))] = name.lower()
+        if style.get(_w('default')) in ('1', 'true', 'on'):
+            names[None] = name.lower()
+    return names
+
+
+def _text(element) -> str:
+    """Visible text of a paragraph (runs, hyperlinks, insertions; not deletions)"""
+    parts: List[str] = []
+
+    def collect(node):
+        for child in node:
+            tag = child.tag
+            if tag == T:
+                parts.append(child.text or '')
+            elif tag == TAB:
+                parts.append('\t')
+            elif tag in (BR, CR):
+                parts.append('\n')
+            elif tag in (DEL, MOVE_FROM, PPR):
+                continue
+            else:
+                collect(child)
+
+    collect(element)
+    return ''.join(parts)
+
+
+def _first_run_bold(paragraph) -> bool:
+    run = paragraph.find(R)
+    if run is None:
+        return False
+    bold = run.find(f"{RPR}/{B}")
+    return bold is not None and (bold.get(VAL) or 'true').lower() not in _FALSE_VALUES
+
+
+def _paragraph_line(paragraph, style_names: Dict[Optional[str], str]) -> Optional[str]:
+    text = _text(paragraph).strip()
+    if not text:
+        return None
+
+    style = paragraph.find(f"{PPR}/{PSTYLE}")
+    style_name = style_names.get(style.get(VAL) if style is not None else None, '')
+    if 'heading' in style_name or 'title' in style_name:
+        return f"=== SECTION_HEADER: {text} ==="
+    if _first_run_bold(paragraph):
+        return f"--- SUBSECTION: {text} ---"
+    return text
+
+
+def _cell_text(cell) -> str:
+    """All text of a cell, nested tables included, on one line"""
+    texts = []
+    for paragraph in cell.iter(P):
+        text = ' '.join(_text(paragraph).split())
+        if text:
+            texts.append(text)
+    return ' '.join(texts).replace('|', '/')
+
+
+def _table_lines(table) -> Iterator[str]:
+    yield TABLE_START
+    # Text of the vertical merge that started in each grid column
+    merged: Dict[int, str] = {}
+    for row in table.findall(TR):
+        cells = []
+        column = 0
+        for cell in row.findall(TC):
+            properties = cell.find(TCPR)
+            span = 1
+            v_merge = None
+            if properties is not None:
+                grid_span = properties.find(GRID_SPAN)
+                if grid_span is not None:
+                    span = int(grid_span.get(VAL) or 1)
+                v_merge = properties.find(V_MERGE)
+
+            if v_merge is not None and (v_merge.get(VAL) or 'continue') == 'continue':
+                text = merged.get(column, '')
+            else:
+                text = _cell_text(cell)
+                if v_merge is not None:
+                    merged[column] = text
+                else:
+                    merged.pop(column, None)
+            cells.append(text)
+            column += span
+        if any(cells):
+            yield "| " + " | ".join(cells) + " |"
+    yield TABLE_END
+
+
+def _block_lines(element, style_names: Dict[Optional[str], str]) -> Iterator[str]:
+    if element.tag == P:
+        line = _paragraph_line(element, style_names)
+        if line:
+            yield line
+    elif element.tag == TBL:
+        yield from _table_lines(element)
+    elif element.tag in _BLOCK_WRAPPERS:
+        # A generated table of contents repeats the headings with page numbers
+        gallery = element.find(DOC_PART_GALLERY)
+        if gallery is not None and 'contents' in (gallery.get(VAL) or '').lower():
+            return
+        for child in element:
+            yield from _block_lines(child, style_names)
+
+
+def iter_docx_lines(file_path: str) -> Iterator[str]:
+    """
+    Section-marked text lines of a .docx document, in document order
+
+    Args:
+        file_path: Path to the Word document
+
+    Raises:
+        zipfile.BadZipFile / KeyError / ElementTree.ParseError for files
+        that are not readable Word documents
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        document_path = _relationship_target(archive, '_rels/.rels', OFFICE_DOCUMENT_REL, '') or 'word/document.xml'
+        document_dir = posixpath.dirname(document_path)
+        rels_path = posixpath.join(document_dir, '_rels', posixpath.basename(document_path) + '.rels')
+        styles_path = _relationship_target(archive, rels_path, STYLES_REL, document_dir)
+        style_names = _paragraph_style_names(archive, styles_path)
+
+        with archive.open(document_path) as document:
+            body = None
+            depth = 0
+            for event, element in ElementTree.iterparse(document, events=('start', 'end')):
+                if event == 'start':
+                    depth += 1
+                    if element.tag == BODY:
+                        body = element
+                    continue
+
+                depth -= 1
+                # Blocks are complete at their end tag directly under w:body
+                if body is not None and depth == 2:
+                    yield from _block_lines(element, style_names)
+                    body.clear()
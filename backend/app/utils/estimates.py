@@ -0,0 +1,309 @@
+"""
+Cost and timeline estimates parsed from requirement text
+
+Requirements state cost and processing time as free Hebrew text
+("323 ₪ אגרת השגה", "4-6 שבועות", "שלושה חודשים", "מיידי"). The parsers
+turn them into numeric ranges once, at ingestion; per-request estimates
+are then plain sums and maxima over the parsed values.
+
+Parsed values are dicts:
+    cost:     {'min_ils', 'max_ils', 'confidence'}
+    timeline: {'min_days', 'max_days', 'confidence'}
+
+Confidence is 'high' for explicit values, 'medium' for approximate ones
+("כחודש", "לפחות") and 'low' when the text has no usable value or states
+something else (e.g. a notice period "מראש"). A cost is only an amount
+written next to a currency marker (₪, ש"ח, שקל); other numbers are
+clause numbers or counts, so such text is 'low'. Low-confidence values
+are kept in the database but left out of totals. Missing or "לא מוגדר"
+text parses to None.
+"""
+
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+NOT_DEFINED = "לא מוגדר"
+
+CONFIDENCE_ORDER = ('low', 'medium', 'high')
+
+NUMBER_WORDS = {
+    'אחד': 1, 'אחת': 1,
+    'שניים': 2, 'שתיים': 2, 'שני': 2, 'שתי': 2,
+    'שלושה': 3, 'שלוש': 3,
+    'ארבעה': 4, 'ארבע': 4,
+    'חמישה': 5, 'חמש': 5,
+    'שישה': 6, 'שש': 6,
+    'שבעה': 7, 'שבע': 7,
+    'שמונה': 8,
+    'תשעה': 9, 'תשע': 9,
+    'עשרה': 10, 'עשר': 10,
+    'חצי': 0.5,
+}
+
+THOUSANDS_WORDS = {'אלף', 'אלפים'}
+
+# Duration words in days; dual forms imply their quantity
+TIME_UNITS = {
+    'יום': 1, 'ימים': 1, 'ימי': 1,
+    'שבוע': 7, 'שבועות': 7,
+    'חודש': 30, 'חודשים': 30,
+    'שנה': 365, 'שנים': 365,
+}
+DUAL_TIME_UNITS = {'יומיים': 2, 'שבועיים': 14, 'חודשיים': 60, 'שנתיים': 730}
+
+INSTANT_WORDS = {'מיידי', 'מיידית', 'מידי', 'מיד'}
+FREE_WORDS = {'חינם'}
+NO_COST_WORDS = {'עלות', 'תשלום', 'אגרה'}
+APPROXIMATE_WORDS = {'בערך', 'לפחות', 'משוער', 'משוערת', 'כ'}
+# Lead times ("שלושה חודשים מראש") are not processing times
+LEAD_TIME_WORDS = {'מראש'}
+
+# One-letter prefixes attached to Hebrew words (כחודש, ושלושה, בתוך)
+_PREFIXES = 'וכבלהמש'
+
+_TOKENS = re.compile(r'\d+(?:,\d{3})*(?:\.\d+)?|[^\W\d_]+')
+_CURRENCY_MARKER = r'(?:₪|ש["״”]ח|שקל|\bNIS\b|\bILS\b)'
+_CURRENCY_AFTER = re.compile(r'\s*' + _CURRENCY_MARKER, re.IGNORECASE)
+_CURRENCY_BEFORE = re.compile(_CURRENCY_MARKER + r'\s*$', re.IGNORECASE)
+# Text between the two amounts of a range ("500-800", "500 עד 800", "בין 500 ל-800")
+_RANGE_GAP = re.compile(r'\s*(?:[-–—]|עד|ל-?)\s*')
+
+
+def _is_defined(text: Optional[str]) -> bool:
+    return bool(text and text.strip() and text.strip() != NOT_DEFINED)
+
+
+def _lookup(token: str, table) -> Tuple[Optional[str], bool]:
+    """Find token (or token without a one-letter prefix) in table; returns (key, prefix_stripped)"""
+    if token in table:
+        return token, False
+    if len(token) > 2 and token[0] in _PREFIXES and token[1:] in table:
+        return token[1:], True
+    return None, False
+
+
+def _quantity(token: str) -> Tuple[Optional[float], bool]:
+    """Numeric value of a digit or number-word token; second item is True for a "כ" prefix"""
+    if token[0].isdigit():
+        return float(token.replace(',', '')), False
+    word, stripped = _lookup(token, NUMBER_WORDS)
+    if word is None:
+        return None, False
+    return NUMBER_WORDS[word], stripped and token[0] == 'כ'
+
+
+def _approximate(tokens: List[str]) -> bool:
+    return any(token in APPROXIMATE_WORDS for token in tokens)
+
+
+def _amounts(text: str) -> List[Tuple[float, int, int, bool]]:
+    """(value, start, end, "כ" prefix) of each amount in text, thousands words applied"""
+    amounts = []
+    for match in _TOKENS.finditer(text):
+        token = match.group()
+        if token in THOUSANDS_WORDS:
+            # "5 אלף" multiplies the amount right before it, a bare "אלף" is 1000
+            if amounts and not text[amounts[-1][2]:match.start()].strip():
+                value, start, _, prefixed = amounts[-1]
+                amounts[-1] = (value * 1000, start, match.end(), prefixed)
+            else:
+                amounts.append((1000.0, match.start(), match.end(), False))
+            continue
+        value, prefixed = _quantity(token)
+        if value is not None:
+            amounts.append((value, match.start(), match.end(), prefixed))
+    return amounts
+
+
+def _priced_amounts(text: str, amounts: List[Tuple[float, int, int, bool]]) -> Optional[List[Tuple[float, int, int, bool]]]:
+    """
+    First amount, or range of amounts ("500-800 ₪"), written next to a
+    currency marker. Other numbers (clause and section numbers, counts)
+    are not prices.
+    """
+    groups = []
+    for amount in amounts:
+        if groups and _RANGE_GAP.fullmatch(text[groups[-1][-1][2]:amount[1]]):
+            groups[-1].append(amount)
+        else:
+            groups.append([amount])
+
+    for group in groups:
+        if _CURRENCY_AFTER.match(text, group[-1][2]) or _CURRENCY_BEFORE.search(text, 0, group[0][1]):
+            return group
+    return None
+
+
+def parse_cost(text: Optional[str]) -> Optional[Dict]:
+    """Parse an estimated_cost text into an ILS range"""
+    if not _is_defined(text):
+        return None
+
+    tokens = _TOKENS.findall(text)
+    amounts = _amounts(text)
+
+    if not amounts:
+        no_cost = any(token in FREE_WORDS for token in tokens) or (
+            'ללא' in tokens and any(token in NO_COST_WORDS for token in tokens)
+        )
+        if no_cost:
+            return {'min_ils': 0.0, 'max_ils': 0.0, 'confidence': 'high'}
+        return {'min_ils': None, 'max_ils': None, 'confidence': 'low'}
+
+    priced = _priced_amounts(text, amounts)
+    if priced is None:
+        # "אגרה לפי סעיף 12 בתקנות", "עלות שני שלטים": numbers, but no price
+        return {'min_ils': None, 'max_ils': None, 'confidence': 'low'}
+
+    # A range is given by its first two amounts
+    bounds = [value for value, _, _, _ in priced[:2]]
+    approximate = _approximate(tokens) or any(prefixed for _, _, _, prefixed in priced)
+    return {'min_ils': min(bounds), 'max_ils': max(bounds), 'confidence': 'medium' if approximate else 'high'}
+
+
+def parse_timeline(text: Optional[str]) -> Optional[Dict]:
+    """Parse a timeline text into a range of days"""
+    if not _is_defined(text):
+        return None
+
+    tokens = _TOKENS.findall(text)
+    durations = []
+    pending = []  # quantities waiting for their unit ("4-6 שבועות")
+    approximate = _approximate(tokens)
+    bounded_above = False
+
+    for token in tokens:
+        if token == 'עד' and not durations:
+            bounded_above = True
+            continue
+
+        value, prefixed = _quantity(token)
+        if value is not None:
+            pending.append(value)
+            approximate = approximate or prefixed
+            continue
+
+        dual, _ = _lookup(token, DUAL_TIME_UNITS)
+        if dual is not None:
+            durations.append(float(DUAL_TIME_UNITS[dual]))
+            pending = []
+            continue
+
+        unit, prefixed = _lookup(token, TIME_UNITS)
+        if unit is not None:
+            days = TIME_UNITS[unit]
+            approximate = approximate or (prefixed and token[0] == 'כ')
+            # A bare unit is one of it ("תוך שבוע")
+            durations.extend(quantity * days for quantity in (pending or [1]))
+            pending = []
+
+    if not durations:
+        if any(_lookup(token, INSTANT_WORDS)[0] for token in tokens):
+            return {'min_days': 0, 'max_days': 0, 'confidence': 'high'}
+        return {'min_days': None, 'max_days': None, 'confidence': 'low'}
+
+    min_days = 0 if bounded_above and len(durations) == 1 else min(durations)
+    if any(token in LEAD_TIME_WORDS for token in tokens):
+        confidence = 'low'
+    else:
+        confidence = 'medium' if approximate else 'high'
+    return {
+        'min_days': int(math.ceil(min_days)),
+        'max_days': int(math.ceil(max(durations))),
+        'confidence': confidence
+    }
+
+
+def requirement_estimates(req) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """Stored (cost, timeline) estimates of a requirement, parsed from its text when absent"""
+    cost = req.get('cost_estimate')
+    if cost is None:
+        cost = parse_cost(req.get('estimated_cost'))
+    timeline = req.get('timeline_estimate')
+    if timeline is None:
+        timeline = parse_timeline(req.get('timeline'))
+    return cost, timeline
+
+
+def _usable(estimate: Optional[Dict], key: str) -> bool:
+    return bool(estimate) and estimate['confidence'] != 'low' and estimate.get(key) is not None
+
+
+def _lowest_confidence(estimates: Iterable[Dict]) -> str:
+    return min((estimate['confidence'] for estimate in estimates), key=CONFIDENCE_ORDER.index)
+
+
+def total_cost(costs: Iterable[Optional[Dict]]) -> Optional[Dict]:
+    """Sum of cost ranges; None when no requirement has a usable cost"""
+    costs = list(costs)
+    known = [cost for cost in costs if _usable(cost, 'max_ils')]
+    if not known:
+        return None
+    return {
+        'min_ils': sum(cost['min_ils'] for cost in known),
+        'max_ils': sum(cost['max_ils'] for cost in known),
+        'confidence': _lowest_confidence(known),
+        'unknown': len(costs) - len(known)
+    }
+
+
+def critical_path(entries: Iterable[Tuple[str, Optional[Dict]]]) -> Optional[Dict]:
+    """
+    Longest licensing timeline over (authority, timeline estimate) pairs
+
+    Requirements of one authority are handled one after another, while
+    different authorities work in parallel, so the overall time is the
+    longest per-authority sum.
+    """
+    by_authority: Dict[str, Dict] = {}
+    known = []
+    unknown = 0
+    for authority, timeline in entries:
+        if not _usable(timeline, 'max_days'):
+            unknown += 1
+            continue
+        known.append(timeline)
+        path = by_authority.setdefault(authority, {'min_days': 0, 'max_days': 0})
+        path['min_days'] += timeline['min_days']
+        path['max_days'] += timeline['max_days']
+
+    if not by_authority:
+        return None
+
+    authority = max(by_authority, key=lambda name: by_authority[name]['max_days'])
+    return {
+        'authority': authority,
+        'min_days': by_authority[authority]['min_days'],
+        'max_days': by_authority[authority]['max_days'],
+        'confidence': _lowest_confidence(known),
+        'unknown': unknown,
+        'by_authority': by_authority
+    }
+
+
+def format_duration(days: int) -> str:
+    """Human-readable duration in days or weeks"""
+    if days == 0:
+        return "מיידי"
+    if days < 14:
+        return f"{days} ימים"
+    return f"{math.ceil(days / 7)} שבועות"
+
+
+def format_total_cost(total: Optional[Dict]) -> str:
+    """Format a total_cost() result"""
+    # Zero from "ללא עלות" items says nothing when other costs are unknown
+    if not total or (total['max_ils'] == 0 and total['unknown']):
+        return NOT_DEFINED
+    low, high = int(total['min_ils']), int(total['max_ils'])
+    if low == high:
+        return f"{high:,} ₪ (אומדן)"
+    return f"{low:,}-{high:,} ₪ (אומדן)"
+
+
+def format_total_time(path: Optional[Dict]) -> str:
+    """Format a critical_path() result"""
+    if not path or (path['max_days'] == 0 and path['unknown']):
+        return NOT_DEFINED
+    return f"{format_duration(path['max_days'])} (משוער)"
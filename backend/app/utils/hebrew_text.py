@@ -0,0 +1,59 @@
+"""
+Hebrew text normalization and tokenization for requirement search
+"""
+
+import re
+from typing import List
+
+# Niqqud and cantillation marks (the maqaf U+05BE is a word separator, not a mark)
+_MARKS = re.compile('[\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7]')
+
+# Geresh/gershayim and ASCII quotes inside acronyms (ק"ג, מע"מ) are dropped
+_ACRONYM_QUOTES = re.compile('(?<=\\w)[\'"\u05F3\u05F4](?=\\w)')
+
+_FINAL_LETTERS = (
+    ('\u05DA', '\u05DB'),  # ך -> כ
+    ('\u05DD', '\u05DE'),  # ם -> מ
+    ('\u05DF', '\u05E0'),  # ן -> נ
+    ('\u05E3', '\u05E4'),  # ף -> פ
+    ('\u05E5', '\u05E6'),  # ץ -> צ
+)
+
+_TOKEN = re.compile(r'\w+')
+
+# Single-letter prefixes: ו ה ב ל מ ש כ (stacked, e.g. "ולכשה")
+HEBREW_PREFIXES = frozenset('והבלמשכ')
+MAX_PREFIX_LETTERS = 3
+MIN_STEM_LENGTH = 2
+
+
+def normalize_hebrew(text: str) -> str:
+    """Casefold, drop niqqud and acronym quotes, and map final letters to their regular form"""
+    if not text:
+        return ''
+    text = _MARKS.sub('', text)
+    text = _ACRONYM_QUOTES.sub('', text)
+    # Chained replace is much faster than str.translate for non-ASCII text
+    for final, regular in _FINAL_LETTERS:
+        text = text.replace(final, regular)
+    return text.casefold()
+
+
+def tokenize(text: str) -> List[str]:
+    """Split normalized text into word tokens"""
+    return _TOKEN.findall(normalize_hebrew(text))
+
+
+def prefix_variants(token: str) -> List[str]:
+    """
+    The token and its forms with 1..3 leading prefix letters removed, e.g.
+    "והרישיונ" -> ["והרישיונ", "הרישיונ", "רישיונ"]
+
+    Stems shorter than MIN_STEM_LENGTH letters are not produced.
+    """
+    variants = [token]
+    for count in range(1, MAX_PREFIX_LETTERS + 1):
+        if len(token) - count < MIN_STEM_LENGTH or token[count - 1] not in HEBREW_PREFIXES:
+            break
+        variants.append(token[count:])
+    return variants
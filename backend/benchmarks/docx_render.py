@@ -0,0 +1,116 @@
+"""
+DOCX render benchmark - report throughput of the line-by-line writer and the AST converter
+
+Usage (from backend/):
+    python benchmarks/docx_render.py --reports 20 --scale 5
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from docx import Document
+from app.services.docx_converter import DocxReportConverter
+from benchmarks.pdf_render import build_reports
+
+# Sections an AI report adds on top of the template report
+AI_SECTIONS = """
+### 7. 📊 השוואת עלויות
+| דרישה | גוף מוסמך | עלות | זמן |
+|---|---|---|---|
+| רישיון עסק | רשות הרישוי | **323 ₪** | 4-6 שבועות |
+| אישור כבאות | כבאות והצלה | 500-800 ₪ | כחודש |
+| אישור משרד הבריאות | משרד הבריאות | לא מוגדר | שלושה חודשים |
+
+### 8. 🗂️ סדר פעולות
+1. הכנת **תכנית עסק** ותרשים סביבה
+2. הגשת הבקשה *ברשות המקומית*
+3. תיאום ביקורת מול כבאות והצלה
+    - הכנת מטפים ושילוט
+    - בדיקת מערכת הגז
+4. קבלת הרישיון והצגתו בעסק
+"""
+
+def legacy_render_docx(markdown_text: str, generated_at: str) -> bytes:
+    """The previous writer: a fresh Document() and startswith checks per line"""
+    doc = Document()
+    title = doc.add_heading('דוח רישוי עסקים', 0)
+    title.alignment = 2
+    date_para = doc.add_paragraph(f'נוצר ב-{generated_at}')
+    date_para.alignment = 2
+    
+    for line in markdown_text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('# '):
+            heading = doc.add_heading(line[2:], 1)
+            heading.alignment = 2
+        elif line.startswith('## '):
+            heading = doc.add_heading(line[3:], 2)
+            heading.alignment = 2
+        elif line.startswith('### '):
+            heading = doc.add_heading(line[4:], 3)
+            heading.alignment = 2
+        elif line.startswith('- '):
+            para = doc.add_paragraph(line[2:], style='List Bullet')
+            para.alignment = 2
+        elif line.startswith('**') and line.endswith('**'):
+            para = doc.add_paragraph()
+            para.alignment = 2
+            run = para.add_run(line[2:-2])
+            run.bold = True
+        else:
+            para = doc.add_paragraph(line)
+            para.alignment = 2
+    
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+def time_renders(render, reports, generated_at):
+    timings = []
+    for report in reports:
+        started = time.perf_counter()
+        render(report, generated_at)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def summarize(name: str, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    throughput = len(timings) / (sum(timings) / 1000)
+    print(f"{name:<22} mean {statistics.mean(timings):7.1f} ms   p95 {p95:7.1f} ms   {throughput:6.1f} reports/s")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark DOCX rendering of personalized reports")
+    parser.add_argument("--reports", type=int, default=20, help="Number of distinct reports to render")
+    parser.add_argument("--scale", type=int, default=5, help="Copies of the report body per document, for large reports")
+    args = parser.parse_args()
+    
+    generated_at = "01/01/2025 09:00"
+    reports = [
+        "\n".join([report + AI_SECTIONS] * args.scale)
+        for report in asyncio.run(build_reports(args.reports))
+    ]
+    print(f"📄 {len(reports)} reports, {statistics.mean(len(r) for r in reports) / 1024:.0f} KB of markdown on average")
+    
+    started = time.perf_counter()
+    converter = DocxReportConverter()
+    print(f"🎨 Template prepared once in {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    # Warm up both paths
+    legacy_render_docx(reports[0], generated_at)
+    converter.convert(reports[0], generated_at)
+    
+    summarize("before (line writer)", time_renders(legacy_render_docx, reports, generated_at))
+    summarize("after (AST converter)", time_renders(converter.convert, reports, generated_at))
+
+if __name__ == "__main__":
+    main()
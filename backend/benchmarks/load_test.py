@@ -0,0 +1,164 @@
+"""
+Concurrent load generator for the survey endpoints - latency percentiles and requests/s
+
+By default the FastAPI app runs in this process (httpx ASGI transport, no
+network), with response logs and analytics written to a temporary
+directory. --stub serves the stub Anthropic API from a background thread
+and points the AI processor at it, so ai/hybrid report modes are measured
+without API credits. --url targets a running server instead (start it with
+ANTHROPIC_BASE_URL pointing at benchmarks/stub_anthropic.py).
+
+Usage (from backend/):
+    python benchmarks/load_test.py --requests 2000 --concurrency 50 --report-mode fast
+    python benchmarks/load_test.py --stub --latency-ms 800 --report-mode ai --profiles 100
+    python benchmarks/load_test.py --requirements 10000 --report-mode fast
+    python benchmarks/load_test.py --url http://localhost:8000 --endpoint stream --report-mode ai
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from benchmarks.stub_anthropic import add_config_arguments, config_from_args, start_in_thread
+from benchmarks.synthetic import build_database, sample_surveys, write_database
+from benchmarks.timing import latency_summary
+
+ENDPOINTS = {
+    'submit': "/api/survey/submit",
+    'stream': "/api/survey/submit/stream"
+}
+
+def build_requests(args):
+    """(path, params, body) per request; --profiles bounds the distinct surveys and so the cache hit rate"""
+    profiles = [survey.dict() for survey in sample_surveys(args.profiles, args.seed)]
+    rng = random.Random(args.seed)
+    params = {'report_mode': args.report_mode} if args.report_mode else {}
+    return [(ENDPOINTS[args.endpoint], params, rng.choice(profiles)) for _ in range(args.requests)]
+
+async def send(client: httpx.AsyncClient, path: str, params: dict, body: dict, stream: bool):
+    """Status and milliseconds until the whole response (every SSE event) was received"""
+    started = time.perf_counter()
+    try:
+        if stream:
+            async with client.stream("POST", path, params=params, json=body) as response:
+                async for _ in response.aiter_raw():
+                    pass
+        else:
+            response = await client.post(path, params=params, json=body)
+        status = response.status_code
+    except httpx.HTTPError as e:
+        status = type(e).__name__
+    return status, (time.perf_counter() - started) * 1000
+
+async def run_load(client: httpx.AsyncClient, requests, concurrency: int, stream: bool):
+    """Send all requests from concurrency workers; returns (results, elapsed seconds)"""
+    results = []
+    position = 0
+    
+    async def worker():
+        nonlocal position
+        while position < len(requests):
+            path, params, body = requests[position]
+            position += 1
+            results.append(await send(client, path, params, body, stream))
+    
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results, time.perf_counter() - started
+
+def report(results, elapsed: float, concurrency: int):
+    statuses = Counter(status for status, _ in results)
+    ok = [ms for status, ms in results if status == 200]
+    summary = latency_summary(ok)
+    print(f"\n📈 {len(results)} requests in {elapsed:.2f} s at concurrency {concurrency}")
+    print(f"   throughput  {len(results) / elapsed:8.1f} requests/s")
+    print(f"   statuses    {dict(statuses)}")
+    if ok:
+        print(
+            f"   latency     mean {summary['mean']:.1f} ms   p50 {summary['p50']:.1f} ms   "
+            f"p95 {summary['p95']:.1f} ms   p99 {summary['p99']:.1f} ms   max {summary['max']:.1f} ms"
+        )
+
+async def run_in_process(args, requests):
+    from app.main import app, startup_event, shutdown_event
+    
+    await startup_event()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=args.timeout) as client:
+            await run_load(client, requests[:args.warmup], min(args.concurrency, args.warmup or 1), args.endpoint == 'stream')
+            results, elapsed = await run_load(client, requests, args.concurrency, args.endpoint == 'stream')
+            metrics = (await client.get("/metrics")).text
+    finally:
+        await shutdown_event()
+    return results, elapsed, metrics
+
+async def run_remote(args, requests):
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, timeout=args.timeout, limits=limits) as client:
+        await run_load(client, requests[:args.warmup], min(args.concurrency, args.warmup or 1), args.endpoint == 'stream')
+        return await run_load(client, requests, args.concurrency, args.endpoint == 'stream')
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the survey endpoints")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default='submit', help="Survey endpoint to call")
+    parser.add_argument("--report-mode", choices=['fast', 'ai', 'hybrid'], help="report_mode query parameter")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests to send")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=20, help="Untimed requests sent first")
+    parser.add_argument("--profiles", type=int, default=1000, help="Distinct survey profiles to draw from")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for profiles and request order")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--requirements", type=int, help="In-process: serve a synthetic database of this size")
+    parser.add_argument("--stub", action="store_true", help="In-process: answer AI calls from the stub Anthropic API")
+    parser.add_argument("--stub-port", type=int, default=8765, help="Port of the in-process stub")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    
+    requests = build_requests(args)
+    if args.url:
+        results, elapsed = asyncio.run(run_remote(args, requests))
+        report(results, elapsed, args.concurrency)
+        return
+    
+    with tempfile.TemporaryDirectory(prefix="bench_load_") as directory:
+        # Keep benchmark traffic out of the real response log, analytics and report databases
+        os.environ.setdefault("RESPONSE_LOG_DIR", os.path.join(directory, "responses"))
+        os.environ.setdefault("ANALYTICS_DB_PATH", os.path.join(directory, "analytics.sqlite3"))
+        os.environ.setdefault("REPORT_STORE_PATH", os.path.join(directory, "reports.sqlite3"))
+        os.environ.setdefault("LOG_LEVEL", "WARNING")
+        if args.requirements:
+            db_path = os.path.join(directory, "requirements.json")
+            write_database(build_database(args.requirements, args.seed), db_path)
+            os.environ["REQUIREMENTS_DB_PATH"] = db_path
+            print(f"📚 Serving a synthetic database of {args.requirements} requirements")
+        if args.stub:
+            os.environ["ANTHROPIC_BASE_URL"] = start_in_thread(config_from_args(args), port=args.stub_port)
+            os.environ.setdefault("ANTHROPIC_API_KEY", "stub")
+            print(f"🧪 AI calls go to the stub at {os.environ['ANTHROPIC_BASE_URL']} "
+                  f"({args.latency_ms:.0f} ms to first token, {args.tokens_per_second:.0f} tokens/s)")
+        
+        results, elapsed, metrics = asyncio.run(run_in_process(args, requests))
+        report(results, elapsed, args.concurrency)
+        
+        coalesced = sum(
+            float(line.rsplit(' ', 1)[1]) for line in metrics.splitlines()
+            if line.startswith("llm_coalesced_requests_total{")
+        )
+        llm_calls = sum(
+            float(line.rsplit(' ', 1)[1]) for line in metrics.splitlines()
+            if line.startswith("llm_request_duration_seconds_count{")
+        )
+        print(f"   AI calls    {llm_calls:.0f} sent, {coalesced:.0f} coalesced")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Micro-benchmarks of the request hot path at synthetic database sizes
+
+For each size: database loading (JSON parse, JSON + index build, binary
+snapshot), requirement matching, the calculate_total_* estimates, the
+template report and PDF/DOCX rendering of the matched requirements.
+
+Usage (from backend/):
+    python benchmarks/micro.py --sizes 100,10000,100000 --surveys 20
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.database_loader import DatabaseLoader
+from app.services.docx_converter import DocxReportConverter
+from app.services.pdf_generator import DocumentGenerator
+from app.services.report_generator import ReportGenerator
+from app.services.requirements_matcher import RequirementsMatcher
+from benchmarks.synthetic import build_database, sample_surveys, write_database
+from benchmarks.timing import print_summary, time_calls
+
+GENERATED_AT = "01/01/2025 09:00"
+
+def load_snapshot(db_path: str, use_binary: bool):
+    loader = DatabaseLoader(db_path)
+    loader.use_binary = use_binary
+    if not asyncio.run(loader.load_requirements_database()):
+        raise SystemExit(f"Could not load {db_path}")
+    return loader.get_snapshot()
+
+def bench_loading(db_path: str, repeat: int):
+    with open(db_path, 'rb') as f:
+        raw = f.read()
+    print(f"  JSON file {len(raw) / 1024 / 1024:.1f} MB")
+    print_summary("  json.loads", time_calls(lambda: json.loads(raw), [()], repeat))
+    print_summary("  load JSON + build indexes", time_calls(load_snapshot, [(db_path, False)], repeat))
+    print_summary("  load binary snapshot + indexes", time_calls(load_snapshot, [(db_path, True)], repeat))
+    return load_snapshot(db_path, True)
+
+def bench_matching(snapshot, surveys, repeat: int):
+    matcher = RequirementsMatcher(snapshot.data, snapshot.index, snapshot.payloads)
+    print_summary("  index match (mask only)", time_calls(snapshot.index.match, [(s,) for s in surveys], repeat))
+    print_summary("  filter_requirements_for_business", time_calls(
+        matcher.filter_requirements_for_business, [(s,) for s in surveys], repeat
+    ))
+    return [matcher.filter_requirements_for_business(survey) for survey in surveys]
+
+def bench_estimates(matched, repeat: int):
+    generator = ReportGenerator()
+    arguments = [(requirements,) for requirements in matched]
+    print_summary("  calculate_total_cost_estimate", time_calls(generator.calculate_total_cost_estimate, arguments, repeat))
+    print_summary("  calculate_total_time_estimate", time_calls(generator.calculate_total_time_estimate, arguments, repeat))
+
+def bench_rendering(snapshot, surveys, matched, max_reports: int, skip_pdf: bool):
+    """Returns False once PDF rendering turns out to be unavailable"""
+    pairs = list(zip(surveys, matched))[:max_reports]
+    reports = [snapshot.report_engine.render(survey, requirements) for survey, requirements in pairs]
+    print_summary("  template report", time_calls(snapshot.report_engine.render, pairs))
+    print(f"  reports average {sum(len(r) for r in reports) / len(reports) / 1024:.0f} KB of markdown")
+    
+    converter = DocxReportConverter()
+    print_summary("  DOCX render", time_calls(converter.convert, [(r, GENERATED_AT) for r in reports]))
+    
+    if skip_pdf:
+        return False
+    generator = DocumentGenerator()
+    try:
+        generator.render_pdf(reports[0], GENERATED_AT)
+    except Exception as e:
+        print(f"  PDF render skipped: {type(e).__name__}: {e}")
+        return False
+    print_summary("  PDF render", time_calls(generator.render_pdf, [(r, GENERATED_AT) for r in reports]))
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmark matching, estimates, loading and rendering")
+    parser.add_argument("--sizes", default="100,10000,100000", help="Comma-separated database sizes (requirements)")
+    parser.add_argument("--surveys", type=int, default=20, help="Distinct survey profiles to match")
+    parser.add_argument("--repeat", type=int, default=2, help="Passes over the surveys (loading: load count)")
+    parser.add_argument("--render-reports", type=int, default=5, help="Reports rendered per size")
+    parser.add_argument("--render-max-requirements", type=int, default=10000,
+                        help="Skip rendering for larger databases (reports grow with the database)")
+    parser.add_argument("--skip-pdf", action="store_true", help="Do not time PDF rendering")
+    args = parser.parse_args()
+    
+    surveys = sample_surveys(args.surveys)
+    pdf_available = not args.skip_pdf
+    with tempfile.TemporaryDirectory(prefix="bench_db_") as directory:
+        for size in (int(value) for value in args.sizes.split(',')):
+            started = time.perf_counter()
+            db_path = write_database(build_database(size), os.path.join(directory, f"requirements_{size}.json"))
+            print(f"\n📚 {size} requirements (generated in {time.perf_counter() - started:.1f} s)")
+            
+            snapshot = bench_loading(db_path, args.repeat)
+            matched = bench_matching(snapshot, surveys, args.repeat)
+            average = sum(len(requirements) for requirements in matched) / len(matched)
+            print(f"  {average:.0f} requirements matched per survey on average")
+            bench_estimates(matched, args.repeat)
+            
+            if size <= args.render_max_requirements:
+                pdf_available = bench_rendering(snapshot, surveys, matched, args.render_reports, not pdf_available)
+            else:
+                print(f"  rendering skipped above {args.render_max_requirements} requirements")
+
+if __name__ == "__main__":
+    main()
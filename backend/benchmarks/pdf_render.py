@@ -0,0 +1,124 @@
+"""
+PDF render benchmark - per-report render time before and after the precompiled stylesheet and bundled fonts
+
+Usage (from backend/):
+    python benchmarks/pdf_render.py --reports 50 --workers 4
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import markdown
+from app.models import SurveyRequest
+from app.services.database_loader import DatabaseLoader
+from app.services.requirements_matcher import RequirementsMatcher
+from app.services.pdf_generator import DocumentGenerator, REPORT_CSS, REPORT_HTML, REPORT_FONTS_DIR, font_face_rules
+from app.services.report_renderer import ReportRenderer
+
+def system_fonts_generator() -> DocumentGenerator:
+    """The precompiled path without the bundled fonts, so fontconfig picks the Hebrew font"""
+    from weasyprint import CSS
+    from weasyprint.text.fonts import FontConfiguration
+    
+    generator = DocumentGenerator()
+    generator._font_config = FontConfiguration()
+    generator._stylesheet = CSS(string=REPORT_CSS % {'font_family': 'Arial'}, font_config=generator._font_config)
+    return generator
+
+def legacy_render_pdf(markdown_text: str, generated_at: str) -> bytes:
+    """The previous render path: CSS inlined into every document, parsed and font-resolved per call"""
+    from weasyprint import HTML
+    
+    html_content = markdown.markdown(markdown_text, extensions=['tables', 'nl2br'])
+    style = REPORT_CSS % {'font_family': 'Arial'}
+    html = REPORT_HTML.format(generated_at=generated_at, html_content=html_content)
+    html = html.replace('<head><meta charset="UTF-8"></head>', f'<head><meta charset="UTF-8"><style>{style}</style></head>')
+    return HTML(string=html).write_pdf()
+
+async def build_reports(count: int):
+    """Template reports for a spread of business profiles (no AI calls)"""
+    loader = DatabaseLoader()
+    if not await loader.load_requirements_database():
+        raise SystemExit("Requirements database not found")
+    snapshot = loader.get_snapshot()
+    matcher = RequirementsMatcher(snapshot.data, snapshot.index, snapshot.payloads)
+    
+    reports = []
+    for i in range(count):
+        survey = SurveyRequest(
+            size=20 + (i * 37) % 480,
+            max_people=5 + (i * 13) % 300,
+            uses_gas=bool(i % 2),
+            has_delivery=bool(i % 3),
+            serves_meat=bool(i % 5),
+            business_name=f"עסק {i + 1}"
+        )
+        requirements = matcher.filter_requirements_for_business(survey)
+        reports.append(snapshot.report_engine.render(survey, requirements))
+    return reports
+
+def time_renders(render, reports, generated_at):
+    timings = []
+    for report in reports:
+        started = time.perf_counter()
+        render(report, generated_at)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+def summarize(name: str, timings):
+    timings = sorted(timings)
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{name:<28} mean {statistics.mean(timings):8.1f} ms   p50 {statistics.median(timings):8.1f} ms   p95 {p95:8.1f} ms")
+
+async def time_pool(reports, generated_at: str, workers: int):
+    renderer = ReportRenderer(max_workers=workers)
+    try:
+        # Start the workers (and compile their stylesheets) before timing
+        await asyncio.gather(*(renderer.render("pdf", f"warm-up {i}", generated_at) for i in range(workers)))
+        started = time.perf_counter()
+        await asyncio.gather(*(renderer.render("pdf", report, generated_at) for report in reports))
+        return time.perf_counter() - started
+    finally:
+        renderer.shutdown()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF rendering of personalized reports")
+    parser.add_argument("--reports", type=int, default=50, help="Number of distinct reports to render")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2, help="Render pool size for the throughput run")
+    parser.add_argument("--skip-pool", action="store_true", help="Only time single-process rendering")
+    args = parser.parse_args()
+    
+    reports = asyncio.run(build_reports(args.reports))
+    generated_at = "01/01/2025 09:00"
+    print(f"📄 {len(reports)} reports, {statistics.mean(len(r) for r in reports):.0f} characters on average")
+    
+    # One-time cost of the new path: stylesheet compilation and font loading
+    generator = DocumentGenerator()
+    started = time.perf_counter()
+    generator._pdf_resources()
+    print(f"🎨 Stylesheet and fonts compiled once in {(time.perf_counter() - started) * 1000:.1f} ms")
+    
+    print(f"🔤 Bundled fonts: {len(font_face_rules().splitlines())} faces in {REPORT_FONTS_DIR}")
+    system_fonts = system_fonts_generator()
+    
+    # Warm up every path (imports, first layout)
+    legacy_render_pdf(reports[0], generated_at)
+    system_fonts.render_pdf(reports[0], generated_at)
+    generator.render_pdf(reports[0], generated_at)
+    
+    summarize("before (inline CSS)", time_renders(legacy_render_pdf, reports, generated_at))
+    summarize("precompiled, system fonts", time_renders(system_fonts.render_pdf, reports, generated_at))
+    summarize("precompiled, bundled fonts", time_renders(generator.render_pdf, reports, generated_at))
+    
+    if not args.skip_pool:
+        elapsed = asyncio.run(time_pool(reports, generated_at, args.workers))
+        print(f"⚙️  Pool of {args.workers}: {len(reports)} reports in {elapsed:.2f} s ({len(reports) / elapsed:.1f} reports/s)")
+
+if __name__ == "__main__":
+    main()
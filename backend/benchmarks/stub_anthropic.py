@@ -0,0 +1,213 @@
+"""
+Stub Anthropic Messages API for benchmarks - configurable latency, token rate and streaming
+
+The API server and document_processor.py reach it through the Anthropic
+SDK's base URL setting, so benchmarks and load tests exercise the real
+request path without spending API credits:
+
+    python benchmarks/stub_anthropic.py --port 8765 --latency-ms 800 --tokens-per-second 60
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ANTHROPIC_API_KEY=stub uvicorn app.main:app
+
+Requests that ask for JSON (document extraction) get a small requirements
+object; all others get a markdown report of --output-tokens words.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+REPORT_PARAGRAPH = (
+    "## דרישות רישוי\n"
+    "על העסק להגיש בקשה לרישיון עסק ברשות המקומית, לצרף תרשים סביבה ותכנית עסק "
+    "חתומה, ולתאם ביקורת מול הרשות הארצית לכבאות והצלה ומשרד הבריאות.\n\n"
+)
+
+EXTRACTION_RESPONSE = {
+    "document_analysis": {
+        "total_requirements_found": 2,
+        "regulatory_authorities": ["רשות הרישוי (רשות מקומית)", "הרשות הארצית לכבאות והצלה"]
+    },
+    "general_requirements": [{
+        "id": "general_001", "name": "רישיון עסק", "category": "רישוי בסיסי",
+        "authority": "רשות הרישוי (רשות מקומית)", "description": "הגשת בקשה לרישיון עסק",
+        "timeline": "4-6 שבועות", "estimated_cost": "323 ₪", "priority": "גבוהה"
+    }],
+    "size_specific_requirements": [{
+        "id": "size_001", "name": "מערכת גילוי אש", "category": "בטיחות אש",
+        "authority": "הרשות הארצית לכבאות והצלה", "description": "התקנת מערכת גילוי אש ועשן",
+        "conditions": {"min_size_sqm": 51, "max_size_sqm": None},
+        "timeline": "כחודש", "estimated_cost": "לא מוגדר", "priority": "גבוהה"
+    }],
+    "capacity_specific_requirements": [],
+    "feature_specific_requirements": []
+}
+
+@dataclass
+class StubConfig:
+    latency_ms: float = 500          # Time to the first token
+    jitter_ms: float = 0             # Uniform +/- jitter added to the latency
+    tokens_per_second: float = 80    # Output rate after the first token
+    output_tokens: int = 600         # Report length in words (~tokens)
+    error_rate: float = 0.0          # Share of requests answered with 529 overloaded
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _block_text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(block.get('text', '') for block in content or [] if isinstance(block, dict))
+
+def create_app(config: StubConfig) -> FastAPI:
+    """Stub app answering POST /v1/messages"""
+    app = FastAPI(title="Stub Anthropic Messages API")
+    app.state.stats = {'requests': 0, 'streamed': 0, 'errors': 0}
+    cached_prefixes = set()
+    report_words = " ".join(REPORT_PARAGRAPH.split(" ") * (config.output_tokens // 30 + 1)).split(" ")
+    
+    def _usage(body: dict, output_tokens: int) -> dict:
+        system = _block_text(body.get('system'))
+        prompt = "".join(_block_text(m.get('content')) for m in body.get('messages', []))
+        system_tokens = _estimate_tokens(system) if system else 0
+        
+        # Mimic prompt caching: the first request with a system prefix writes it, later ones read it
+        cache_write = cache_read = 0
+        if system_tokens and 'cache_control' in json.dumps(body.get('system')):
+            prefix = hashlib.sha256(system.encode('utf-8')).hexdigest()
+            if prefix in cached_prefixes:
+                cache_read = system_tokens
+            else:
+                cached_prefixes.add(prefix)
+                cache_write = system_tokens
+            system_tokens = 0
+        return {
+            'input_tokens': system_tokens + _estimate_tokens(prompt),
+            'output_tokens': output_tokens,
+            'cache_creation_input_tokens': cache_write,
+            'cache_read_input_tokens': cache_read
+        }
+    
+    def _response_text(body: dict) -> str:
+        messages = body.get('messages') or [{}]
+        if 'JSON' in _block_text(messages[-1].get('content')):
+            return json.dumps(EXTRACTION_RESPONSE, ensure_ascii=False)
+        return " ".join(report_words[:min(config.output_tokens, body.get('max_tokens', config.output_tokens))])
+    
+    async def _first_token_delay():
+        jitter = random.uniform(-config.jitter_ms, config.jitter_ms) if config.jitter_ms else 0
+        await asyncio.sleep(max(0.0, config.latency_ms + jitter) / 1000)
+    
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        app.state.stats['requests'] += 1
+        
+        if config.error_rate and random.random() < config.error_rate:
+            app.state.stats['errors'] += 1
+            await _first_token_delay()
+            return JSONResponse(status_code=529, content={
+                'type': 'error', 'error': {'type': 'overloaded_error', 'message': 'Overloaded (stub)'}
+            })
+        
+        text = _response_text(body)
+        words = text.split(" ")
+        usage = _usage(body, len(words))
+        message = {
+            'id': f"msg_stub_{uuid.uuid4().hex[:20]}",
+            'type': 'message',
+            'role': 'assistant',
+            'model': body.get('model', 'stub'),
+            'stop_reason': 'end_turn',
+            'stop_sequence': None
+        }
+        
+        if not body.get('stream'):
+            await _first_token_delay()
+            await asyncio.sleep(len(words) / config.tokens_per_second)
+            return {**message, 'content': [{'type': 'text', 'text': text}], 'usage': usage}
+        
+        app.state.stats['streamed'] += 1
+        
+        def event(name: str, data: dict) -> str:
+            return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+        
+        async def events():
+            await _first_token_delay()
+            yield event('message_start', {'type': 'message_start', 'message': {
+                **message, 'stop_reason': None, 'content': [], 'usage': {**usage, 'output_tokens': 1}
+            }})
+            yield event('content_block_start', {'type': 'content_block_start', 'index': 0,
+                                                'content_block': {'type': 'text', 'text': ''}})
+            # A few words per event, paced at the configured token rate
+            step = 5
+            for start in range(0, len(words), step):
+                chunk = " ".join(words[start:start + step]) + (" " if start + step < len(words) else "")
+                yield event('content_block_delta', {'type': 'content_block_delta', 'index': 0,
+                                                    'delta': {'type': 'text_delta', 'text': chunk}})
+                await asyncio.sleep(step / config.tokens_per_second)
+            yield event('content_block_stop', {'type': 'content_block_stop', 'index': 0})
+            yield event('message_delta', {'type': 'message_delta',
+                                          'delta': {'stop_reason': 'end_turn', 'stop_sequence': None},
+                                          'usage': {'output_tokens': usage['output_tokens']}})
+            yield event('message_stop', {'type': 'message_stop'})
+        
+        return StreamingResponse(events(), media_type="text/event-stream")
+    
+    @app.get("/stats")
+    async def stats():
+        return app.state.stats
+    
+    return app
+
+def start_in_thread(config: StubConfig, host: str = "127.0.0.1", port: int = 8765):
+    """Serve the stub from a background thread; returns the base URL once it accepts requests"""
+    import uvicorn
+    
+    server = uvicorn.Server(uvicorn.Config(create_app(config), host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Stub server failed to start on {host}:{port}")
+        time.sleep(0.05)
+    return f"http://{host}:{port}"
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Stub options shared by this script and the load generator"""
+    parser.add_argument("--latency-ms", type=float, default=StubConfig.latency_ms, help="Time to the first token")
+    parser.add_argument("--jitter-ms", type=float, default=StubConfig.jitter_ms, help="Uniform latency jitter")
+    parser.add_argument("--tokens-per-second", type=float, default=StubConfig.tokens_per_second, help="Output token rate")
+    parser.add_argument("--output-tokens", type=int, default=StubConfig.output_tokens, help="Report length in tokens")
+    parser.add_argument("--error-rate", type=float, default=StubConfig.error_rate, help="Share of 529 overloaded responses")
+
+def config_from_args(args) -> StubConfig:
+    return StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate
+    )
+
+def main():
+    import uvicorn
+    
+    parser = argparse.ArgumentParser(description="Serve a stub Anthropic Messages API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args()
+    
+    print(f"🧪 Stub Anthropic API on http://{args.host}:{args.port} - set ANTHROPIC_BASE_URL to use it")
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
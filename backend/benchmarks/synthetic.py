@@ -0,0 +1,135 @@
+"""
+Synthetic requirements databases for benchmarks
+
+Requirements are cloned from the processed database with fresh ids and
+randomized conditions, costs and timelines, so any size keeps the real
+field shapes and Hebrew text. Output is deterministic for a given seed.
+
+Usage (from backend/):
+    python benchmarks/synthetic.py --requirements 10000 --output /tmp/requirements_10k.json
+"""
+
+import argparse
+import copy
+import hashlib
+import json
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models import SurveyRequest
+from app.services.binary_snapshot import write_snapshot
+from app.services.database_loader import DEFAULT_DB_PATH
+from app.services.requirements_index import REQUIREMENT_SECTIONS
+from app.utils.estimates import parse_cost, parse_timeline
+
+# Share of each section; general requirements apply to every business, so they stay rare
+SECTION_SHARES = {'general': 0.02, 'size': 0.3, 'capacity': 0.3, 'feature': 0.38}
+
+COSTS = ["323 ₪", "500-800 ₪", "1,200 ₪ לשנה", "בין 2,000 ל-5,000 ₪", "לא מוגדר", None]
+TIMELINES = ["כחודש", "4-6 שבועות", "14 ימי עבודה", "שלושה חודשים", "לא מוגדר", None]
+FEATURE_VALUES = (True, True, None, None, None, False)
+
+def _random_interval(rng: random.Random, low: int, high: int):
+    minimum = rng.choice([None, rng.randint(low, high // 2)])
+    maximum = rng.choice([None, rng.randint(high // 2, high)])
+    return minimum, maximum
+
+def _conditions(rng: random.Random, category: str, base: dict):
+    conditions = dict(base.get('conditions') or {})
+    if category == 'size':
+        conditions['min_size_sqm'], conditions['max_size_sqm'] = _random_interval(rng, 10, 1000)
+    elif category == 'capacity':
+        conditions['min_capacity'], conditions['max_capacity'] = _random_interval(rng, 1, 500)
+    elif category == 'feature':
+        for key in ('requires_gas', 'has_delivery', 'serves_meat'):
+            conditions[key] = rng.choice(FEATURE_VALUES)
+    return conditions
+
+def build_database(count: int, seed: int = 0, source_path: str = DEFAULT_DB_PATH):
+    """Database dict with count requirements, cloned from the processed database"""
+    with open(source_path, 'r', encoding='utf-8') as f:
+        source = json.load(f)
+    
+    rng = random.Random(seed)
+    data = {
+        'document_analysis': source.get('document_analysis', {}),
+        'important_information': source.get('important_information', [])
+    }
+    
+    counts = {}
+    for category, section in REQUIREMENT_SECTIONS:
+        templates = source.get(section) or []
+        size = round(count * SECTION_SHARES[category]) if templates else 0
+        requirements = []
+        for i in range(size):
+            base = templates[i % len(templates)]
+            req = copy.deepcopy(base)
+            req['id'] = f"{category}_{i + 1:06d}"
+            req['name'] = f"{base.get('name', '')} ({i + 1})"
+            if category != 'general':
+                req['conditions'] = _conditions(rng, category, base)
+            req['estimated_cost'] = rng.choice(COSTS)
+            req['timeline'] = rng.choice(TIMELINES)
+            req['cost_estimate'] = parse_cost(req['estimated_cost'])
+            req['timeline_estimate'] = parse_timeline(req['timeline'])
+            requirements.append(req)
+        data[section] = requirements
+        counts[category] = size
+    
+    data['processing_metadata'] = {
+        'processed_at': datetime.now().isoformat(),
+        'processor_version': 'synthetic',
+        'seed': seed
+    }
+    data['summary'] = {
+        'total_requirements': sum(counts.values()),
+        'general_requirements_count': counts['general'],
+        'size_specific_count': counts['size'],
+        'capacity_specific_count': counts['capacity'],
+        'feature_specific_count': counts['feature']
+    }
+    return data
+
+def sample_surveys(count: int, seed: int = 0):
+    """Survey profiles spread over the size, occupancy and feature ranges"""
+    rng = random.Random(seed)
+    return [
+        SurveyRequest(
+            size=rng.randint(10, 1000),
+            max_people=rng.randint(1, 500),
+            uses_gas=rng.random() < 0.5,
+            has_delivery=rng.random() < 0.5,
+            serves_meat=rng.random() < 0.5,
+            business_name=f"עסק {i + 1}"
+        )
+        for i in range(count)
+    ]
+
+def write_database(data: dict, output_path: str, snapshot: bool = True):
+    """Write the JSON database (and the binary snapshot next to it)"""
+    raw = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(output_path, 'wb') as f:
+        f.write(raw)
+    if snapshot:
+        write_snapshot(data, os.path.splitext(output_path)[0] + ".snapshot", hashlib.sha256(raw).hexdigest()[:12])
+    return output_path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic requirements database")
+    parser.add_argument("--requirements", type=int, default=10000, help="Number of requirements")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--output", required=True, help="Where to write the JSON database")
+    parser.add_argument("--no-snapshot", action="store_true", help="Skip the binary snapshot")
+    args = parser.parse_args()
+    
+    data = build_database(args.requirements, args.seed)
+    write_database(data, args.output, snapshot=not args.no_snapshot)
+    print(f"✅ {data['summary']['total_requirements']} requirements written to {args.output}")
+    print(f"   Serve it with REQUIREMENTS_DB_PATH={os.path.abspath(args.output)}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Timing helpers shared by the benchmark scripts
+"""
+
+import statistics
+import time
+from typing import Callable, Dict, List, Sequence
+
+def percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Nearest-rank percentile of already sorted values"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+def latency_summary(timings_ms: List[float]) -> Dict[str, float]:
+    """Mean, p50, p95, p99 and max of millisecond timings"""
+    timings = sorted(timings_ms)
+    return {
+        'count': len(timings),
+        'mean': statistics.mean(timings) if timings else 0.0,
+        'p50': percentile(timings, 0.5),
+        'p95': percentile(timings, 0.95),
+        'p99': percentile(timings, 0.99),
+        'max': timings[-1] if timings else 0.0
+    }
+
+def print_summary(name: str, timings_ms: List[float], width: int = 34):
+    summary = latency_summary(timings_ms)
+    print(
+        f"{name:<{width}} mean {_ms(summary['mean'])}   p50 {_ms(summary['p50'])}   "
+        f"p95 {_ms(summary['p95'])}   p99 {_ms(summary['p99'])}   (n={summary['count']})"
+    )
+
+def _ms(value: float) -> str:
+    return f"{value:9.3f} ms" if value < 10 else f"{value:9.1f} ms"
+
+def time_calls(function: Callable, arguments: Sequence, repeat: int = 1) -> List[float]:
+    """Milliseconds per function(*args) call, for each argument tuple, repeat times"""
+    timings = []
+    for _ in range(repeat):
+        for args in arguments:
+            started = time.perf_counter()
+            function(*args)
+            timings.append((time.perf_counter() - started) * 1000)
+    return timings
@@ -4,101 +4,603 @@ Processes Hebrew regulatory documents with AI to extract all requirements accura
 """
 
 import anthropic
-import docx
+import argparse
+import asyncio
+import hashlib
+import httpx
 import json
+import logging
 import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
+from llm_cache import LLMResponseCache
+from app.models import DEFAULT_BUSINESS_TYPE, business_type_name
+from app.services.binary_snapshot import write_snapshot
+from app.services.requirement_payloads import RequirementPayloads
+from app.utils.docx_text import iter_docx_lines
+from app.utils.estimates import parse_cost, parse_timeline
+from app.services.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS, LLM_COST_DOLLARS, request_labels
+from app.utils.logging_config import configure_logging
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+AI_MODEL = "claude-sonnet-4-20250514"
+
+# Bump whenever the extraction prompts change so cached responses are not reused
+PROMPT_TEMPLATE_VERSION = "2"
+
+# Prefix of every chunk prompt; it does not name the chunk's position, so a
+# chunk's prompt (and its cache key) only depends on its own text
+CHUNK_NOTE = "(קטע מתוך המסמך; שאר הקטעים מעובדים בנפרד)\n"
+
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", os.path.join("data", "cache", "llm"))
+
+# Database sections holding requirement lists, with their ID prefixes
+REQUIREMENT_SECTIONS = {
+    'general_requirements': 'general',
+    'size_specific_requirements': 'size',
+    'capacity_specific_requirements': 'capacity',
+    'feature_specific_requirements': 'feature'
+}
+
+# Structure markers emitted by _extract_text_from_word (table rows stay inside their section)
+SECTION_MARKERS = ('=== SECTION_HEADER', '--- SUBSECTION')
+
+CONFIDENCE_LEVELS = ['נמוכה', 'בינונית', 'גבוהה']
+
+# Per-chunk document_analysis fields, kept so the summary can be rebuilt
+# from the chunks that remain after an incremental run
+CHUNK_ANALYSIS_FIELDS = ('document_sections', 'regulatory_authorities', 'processing_notes', 'extraction_confidence')
+
+# Static extraction instructions, sent as a cached system prompt so only the
+# document text varies between calls (and between chunks)
+EXTRACTION_SYSTEM_PROMPT = """
+אתה מערכת AI מתקדמת המתמחה בעיבוד מסמכים רגולטוריים בעברית לצורך רישוי עסקים.
+
+המשימה שלך: לנתח בצורה מקיפה ומדויקת את המסמך (או חלק המסמך) שיישלח אליך ולחלץ את כל המידע הרלוונטי לבעלי עסקים.
+
+עליך לחלץ מידע מובנה ומפורט על:
+
+1. **דרישות כלליות לעסקים** - דרישות שחלות על כל סוגי העסקים
+2. **דרישות ספציפיות לפי גודל** - דרישות המתייחסות לגודל העסק במ"ר
+3. **דרישות ספציפיות לפי תפוסה** - דרישות המתייחסות למספר אנשים
+4. **דרישות למאפיינים מיוחדים** - גז, משלוחים, הגשת בשר
+5. **גופים רגולטוריים** - כל הרשויות והמשרדים הרלוונטיים שמורשים לתת אישורים לפי המסמך
+6. **זמנים ועלויות** - לוחות זמנים ועלויות לכל דרישה
+7. **פרטים חשובים נוספים** - כל מידע רלוונטי אחר
+
+
+עבור כל דרישה, ציין בדיוק:
+- שם הדרישה המדויק (כפי שמופיע במסמך)
+- הגוף/רשות המוסמכת
+- תיאור מפורט של הדרישה
+- תנאי התפוסה (מספר מקומות/אנשים - אם רלוונטי)
+- תנאי שטח (גודל במ"ר - אם רלוונטי)  
+- תנאים מיוחדים (שימוש בגז, משלוחים, הגשת בשר - אם רלוונטי)
+- זמן טיפול משוער
+- עלות משוערת
+- רמת חשיבות/עדיפות
+- היכן במסמך הדרישה מופיעה
+- הערות או תנאים נוספים
+- הערות חשובות 
+
+שים לב מיוחד לגופים רגולטוריים כמו:
+- דרישות של משרד הבריאות
+- דרישות כבאות ובטיחות
+- רישיונות עסק ברשויות מקומיות
+- דרישות לעסקי מזון
+- אישורי בנייה ותכנון
+- דרישות סביבתיות
+- דרישות עבודה וביטחון
+- מיסוי ורישום
+
+החזר תשובה בפורמט JSON הבא:
+{
+"document_analysis": {
+    "total_requirements_found": מספר_כולל,
+    "document_sections": ["רשימת החלקים הראשיים במסמך"],
+    "regulatory_authorities": ["רשימת כל הגופים המוסמכים"],
+    "processing_notes": "הערות על תהליך העיבוד",
+    "document_length": מספר_מילים,
+    "extraction_confidence": "גבוהה/בינונית/נמוכה"
+},
+"general_requirements": [
+    {
+    "id": "general_001",
+    "name": "שם הדרישה",
+    "category": "קטגוריה כללית",
+    "authority": "הגוף המוסמך",
+    "description": "תיאור מפורט של הדרישה",
+    "applies_to": "כל העסקים/עסקים מסוג מסוים",
+    "timeline": "זמן טיפול",
+    "estimated_cost": "עלות משוערת",
+    "priority": "גבוהה/בינונית/נמוכה",
+    "source_location": "היכן במסמך",
+    "additional_notes": "הערות נוספות"
+    }
+],
+"size_specific_requirements": [
+    {
+    "id": "size_001",
+    "name": "שם הדרישה",
+    "category": "דרישות לפי גודל",
+    "authority": "הגוף המוסמך",
+    "description": "תיאור מפורט",
+    "conditions": {
+        "min_size_sqm": מספר_או_null,
+        "max_size_sqm": מספר_או_null,
+        "size_notes": "הערות על הגודל"
+    },
+    "timeline": "זמן טיפול",
+    "estimated_cost": "עלות",
+    "priority": "רמת חשיבות",
+    "source_location": "מיקום במסמך",
+    "additional_notes": "הערות"
+    }
+],
+"capacity_specific_requirements": [
+    {
+    "id": "capacity_001",
+    "name": "שם הדרישה",
+    "category": "דרישות לפי תפוסה",
+    "authority": "הגוף המוסמך",
+    "description": "תיאור מפורט",
+    "conditions": {
+        "min_capacity": מספר_או_null,
+        "max_capacity": מספר_או_null,
+        "capacity_notes": "הערות על התפוסה"
+    },
+    "timeline": "זמן טיפול",
+    "estimated_cost": "עלות",
+    "priority": "רמת חשיבות",
+    "source_location": "מיקום במסמך",
+    "additional_notes": "הערות"
+    }
+],
+"feature_specific_requirements": [
+    {
+    "id": "feature_001",
+    "name": "שם הדרישה",
+    "category": "דרישות לפי מאפיינים",
+    "authority": "הגוף המוסמך",
+    "description": "תיאור מפורט",
+    "conditions": {
+        "requires_gas": true/false/null,
+        "has_delivery": true/false/null,
+        "serves_meat": true/false/null,
+        "feature_notes": "הערות על המאפיינים"
+    },
+    "timeline": "זמן טיפול",
+    "estimated_cost": "עלות",
+    "priority": "רמת חשיבות",
+    "source_location": "מיקום במסמך",
+    "additional_notes": "הערות"
+    }
+],
+"important_information": [
+    {
+    "topic": "נושא חשוב",
+    "description": "מידע חשוב שלא נכנס לקטגוריות הקודמות",
+    "relevance": "למה זה חשוב",
+    "source_location": "מיקום במסמך"
+    }
+]
+}
+
+הוראות חשובות:
+1. אל תמציא מידע - רק מה שמופיע במסמך
+2. אם משהו לא ברור, ציין "לא מוגדר" או "דורש בדיקה נוספת"
+3. שמור על דיוק מקסימלי - זה ייושם במערכת אמיתית
+4. התמקד בדרישות מעשיות לבעלי עסקים קטנים-בינוניים
+5. זהה קשרים בין דרישות שונות
+6. שים לב לחריגים ותנאים מיוחדים
+7. שים לב לגופים שנדרשים לאשר ורלוונטים לדרישות
+8. נא התעלם מדרישות שמוגדרות כלא רלוונטיות
+9. שים לב להערות חשובות במסמך, כמו פטורים או דרישות שלא חייבות באישור
+10. לא להכניס גופים שלא נדרשים לתת אישור או קיים פטור מהם, יש להתעלם מדרישות כאלה
+"""
+
 class ComprehensiveDocumentProcessor:
-    def __init__(self):
+    def __init__(self, use_cache:bool=True):
         self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        
+        # Shared non-blocking client for the API server, with one pooled
+        # connection set per process and a cap on concurrent AI calls
+        self.async_client = anthropic.AsyncAnthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            http_client=anthropic.DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv("AI_MAX_CONNECTIONS", "20")),
+                    max_keepalive_connections=int(os.getenv("AI_MAX_KEEPALIVE_CONNECTIONS", "10"))
+                )
+            )
+        )
+        self.ai_semaphore = asyncio.Semaphore(int(os.getenv("AI_MAX_CONCURRENCY", "8")))
         self.usage_tracker={
             'total_calls': 0,
             'total_cost': 0.0,
             'input_tokens': 0,
-            'output_tokens': 0
+            'output_tokens': 0,
+            'cache_hits': 0,
+            # Anthropic prompt caching (cache_hits above counts the on-disk response cache)
+            'prompt_cache_write_tokens': 0,
+            'prompt_cache_read_tokens': 0
         }
+        
+        # Responses to identical prompts are reused across runs
+        self.response_cache = LLMResponseCache(
+            cache_dir=LLM_CACHE_DIR,
+            max_bytes=int(os.getenv("LLM_CACHE_MAX_MB", "200")) * 1024 * 1024
+        ) if use_cache else None
+        
+        # Chunks are processed from worker threads
+        self._usage_lock = threading.Lock()
+        self.chunk_max_chars = int(os.getenv("CHUNK_MAX_CHARS", "12000"))
+        self.chunk_workers = int(os.getenv("CHUNK_WORKERS", "4"))
+        
+        # Extraction calls in flight across all chunks (and all documents of a corpus)
+        self._ai_call_slots = threading.BoundedSemaphore(int(os.getenv("AI_MAX_CONCURRENCY", "8")))
+        self.corpus_extract_workers = int(os.getenv("CORPUS_EXTRACT_WORKERS", str(os.cpu_count() or 2)))
+        self.corpus_document_workers = int(os.getenv("CORPUS_DOCUMENT_WORKERS", "4"))
     
-    def process_document(self, file_path:str,output_path:str):
+    def process_document(self, file_path:str,output_path:str, chunked:bool=True, incremental:bool=False):
         """
         Main processing function - extracts all requirements from document
         
         Args:
             file_path: Path to Word document
             output_path: Where to save the processed requirements
+            chunked: Split the document by section and process chunks in parallel
+            incremental: Only reprocess sections changed since the existing output
             
         Returns:
             Dict: Complete requirements database
         """
-        print("Starting comprehensive document processing...")
+        logger.info("Starting comprehensive document processing", extra={'document': file_path})
 
         # Step 1: Extract text from Word document
-        print("🔍 Extracting text from Word document...")
         document_text = self._extract_text_from_word(file_path)
         if not document_text:
             raise Exception("Failed to extract text from Word document")
         
-        print(f"✅ Successfully extracted {len(document_text)} characters from Word document")
-        print(f"📊 Estimated tokens: {len(document_text.split()) * 1.3:.0f}")
+        logger.info("Extracted text from Word document", extra={
+            'characters': len(document_text),
+            'estimated_tokens': round(len(document_text.split()) * 1.3)
+        })
 
         # Step 2: Process document with AI using comprehensive prompt
-        print("🤖 Processing document with AI, this may take a few minutes...")
-        requirements_data=self._process_with_ai(document_text)
+        logger.info("Processing document with AI, this may take a few minutes")
+        previous = self._load_previous_output(output_path) if incremental else None
+        if previous:
+            requirements_data=self._process_incrementally(document_text, previous)
+        elif chunked:
+            requirements_data=self._process_in_chunks(document_text)
+        else:
+            requirements_data=self._process_with_ai(document_text)
         if not requirements_data:
             raise Exception("Failed to process document with AI")
-        print("✅ Successfully processed document with AI")
+        logger.info("Processed document with AI")
 
         # Step 3 validate and claen results
-        print("🔍 Validating and cleaning extracted requirements...")
         validated_data=self._validate_and_clean_requirements(requirements_data)
 
         # Stage 4: save to json file
-        print(f"💾 Saving validated requirements to JSON file {output_path}")
+        logger.info("Saving validated requirements", extra={'output': output_path})
         self._save_to_json(validated_data, output_path)
+        self._save_binary_snapshot(validated_data, output_path)
 
         # Step 5: Print summary
         self._print_summary(validated_data)
 
         return validated_data
     
-    def _extract_text_from_word(self, file_path:str):
+    def _load_previous_output(self, output_path:str):
         """
-        Extracts text from a Word document using python-docx with structure preservation
+        Loads a previous output that carries chunk metadata for incremental runs
         
         Args:
-            file_path: Path to Word document
+            output_path: Path of the existing requirements JSON
         """
         try:
-            doc=docx.Document(file_path)
-            full_text=""
-
-            for paragraph in doc.paragraphs:
-                text=paragraph.text.strip()
-                if text:
-                    # Adding structure markers based on paragraph style
-                    style = paragraph.style.name.lower()
-                    
-                    if 'heading' in style or 'title' in style:
-                        full_text += f"\n\n=== SECTION_HEADER: {text} ===\n"
-                    elif paragraph.runs and paragraph.runs[0].bold:
-                        full_text += f"\n--- SUBSECTION: {text} ---\n"
-                    else:
-                        full_text += f"{text}\n"
+            with open(output_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.warning("No previous output found - running full processing")
+            return None
+        
+        if not previous.get('processing_metadata', {}).get('chunks'):
+            logger.warning("Previous output has no section metadata - running full processing")
+            return None
+        
+        return previous
+    
+    def process_corpus(self, corpus_dir:str, output_path:str, chunked:bool=True, incremental:bool=False):
+        """
+        Processes a directory of licensing specifications into one database
+        partitioned by business type
+        
+        Each Word document is one business type, named after the file
+        (food.docx -> 'food'). Text is extracted in worker processes, then
+        the documents are processed with AI concurrently; the API calls in
+        flight across all documents stay bounded by AI_MAX_CONCURRENCY.
+        Requirement IDs are namespaced by business type ('food.size_003')
+        and the authorities of all documents are merged into one table.
+        
+        Args:
+            corpus_dir: Directory of Word documents
+            output_path: Where to save the corpus database
+            chunked: Split each document by section and process chunks in parallel
+            incremental: Only reprocess sections changed since the existing output
+            
+        Returns:
+            Dict: Corpus database
+        """
+        documents = self._find_corpus_documents(corpus_dir)
+        if not documents:
+            raise Exception(f"No Word documents found in {corpus_dir}")
+        logger.info("Starting corpus processing", extra={'corpus': corpus_dir, 'documents': len(documents)})
+        
+        previous = self._load_previous_corpus(output_path) if incremental else {}
+        
+        # Step 1: Extract text from all documents in worker processes
+        texts = self._extract_corpus_texts(documents)
+        
+        # Step 2: Process documents with AI, several at a time
+        partitions = {}
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.corpus_document_workers) as executor:
+            futures = {
+                business_type: executor.submit(self._process_corpus_document, business_type, text, previous.get(business_type), chunked)
+                for business_type, text in texts.items()
+            }
+            for business_type in documents:
+                partition = futures[business_type].result() if business_type in futures else None
+                if partition:
+                    partition['source_document'] = os.path.basename(documents[business_type])
+                    partitions[business_type] = partition
+                elif business_type in previous:
+                    # Serve the last good version rather than dropping the business type
+                    logger.warning("Keeping previous version of failed document", extra={'business_type': business_type})
+                    partitions[business_type] = previous[business_type]
+                    failed.append(business_type)
+                else:
+                    failed.append(business_type)
+        
+        if not partitions:
+            raise Exception("Failed to process any corpus document")
+        
+        # Step 3: Merge partitions and the shared authorities table, then save
+        corpus = self._merge_corpus(partitions, failed)
+        logger.info("Saving corpus database", extra={'output': output_path})
+        self._save_to_json(corpus, output_path)
+        self._remove_binary_snapshot(output_path)
+        
+        self._print_corpus_summary(corpus)
+        return corpus
+    
+    def _find_corpus_documents(self, corpus_dir:str):
+        """
+        Maps business type -> document path for the Word documents in a directory
+        
+        Args:
+            corpus_dir: Directory of Word documents
+        """
+        documents = {}
+        for name in sorted(os.listdir(corpus_dir)):
+            stem, extension = os.path.splitext(name)
+            # Skip Word lock files (~$name.docx)
+            if extension.lower() != '.docx' or name.startswith('~$'):
+                continue
+            business_type = self._business_type_key(stem)
+            if business_type in documents:
+                raise ValueError(f"Documents {os.path.basename(documents[business_type])} and {name} map to the same business type")
+            documents[business_type] = os.path.join(corpus_dir, name)
+        return documents
+    
+    def _business_type_key(self, name:str):
+        """
+        Business type key of a document name ('.' is reserved for namespaced IDs)
+        
+        Args:
+            name: Document file name without extension
+        """
+        return re.sub(r'[\s.]+', '_', name.strip().lower())
+    
+    def _load_previous_corpus(self, output_path:str):
+        """
+        Loads the partitions of a previous corpus output for incremental runs
+        
+        Args:
+            output_path: Path of the existing corpus JSON
+        """
+        try:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            logger.warning("No previous corpus output found - running full processing")
+            return {}
+        
+        if 'business_types' not in previous:
+            logger.warning("Previous output is not a corpus database - running full processing")
+            return {}
+        
+        return previous['business_types']
+    
+    def _extract_corpus_texts(self, documents:Dict[str, str]):
+        """
+        Extracts the text of every document in worker processes
+        
+        Args:
+            documents: Business type -> document path
+            
+        Returns:
+            Dict: Business type -> section-marked text (failed documents are left out)
+        """
+        texts = {}
+        workers = max(1, min(self.corpus_extract_workers, len(documents)))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {business_type: pool.submit(extract_word_text, path) for business_type, path in documents.items()}
+            for business_type, future in futures.items():
+                try:
+                    texts[business_type] = future.result()
+                except Exception as e:
+                    logger.error("Error extracting from Word", extra={'document': documents[business_type], 'error': str(e)})
+        
+        logger.info("Extracted corpus text", extra={
+            'documents': len(texts),
+            'characters': sum(len(text) for text in texts.values()),
+            'workers': workers
+        })
+        return texts
+    
+    def _process_corpus_document(self, business_type:str, document_text:str, previous:Optional[Dict], chunked:bool):
+        """
+        Processes one corpus document into a validated, namespaced partition
+        
+        Args:
+            business_type: Business type key of the document
+            document_text: Section-marked text
+            previous: Previous partition of this business type (incremental runs)
+            chunked: Split the document by section and process chunks in parallel
             
-            # Clean and normalize
-            full_text = self._clean_text(full_text)
+        Returns:
+            Dict: Partition database, or None if processing failed
+        """
+        try:
+            logger.info("Processing corpus document", extra={'business_type': business_type, 'characters': len(document_text)})
+            if previous and previous.get('processing_metadata', {}).get('chunks'):
+                requirements_data = self._process_incrementally(document_text, previous)
+            elif chunked:
+                requirements_data = self._process_in_chunks(document_text)
+            else:
+                requirements_data = self._process_with_ai(document_text)
+            if not requirements_data or 'error' in requirements_data:
+                logger.error("Failed to process corpus document", extra={'business_type': business_type})
+                return None
             
-            return full_text
+            partition = self._validate_and_clean_requirements(requirements_data)
+            self._namespace_ids(partition, business_type)
+            return partition
+        
+        except Exception as e:
+            logger.error("Corpus document processing error", extra={'business_type': business_type, 'error': str(e)})
+            return None
+    
+    def _namespace_ids(self, data:Dict, business_type:str):
+        """
+        Prefixes requirement IDs with the business type, so IDs are unique across the corpus
+        
+        IDs kept from a previous run are already prefixed; new ones continue
+        their numbering.
+        
+        Args:
+            data: Partition database (modified in place)
+            business_type: Business type key
+        """
+        prefix = f"{business_type}."
+        
+        def namespaced(requirement_id:str):
+            return requirement_id if requirement_id.startswith(prefix) else prefix + requirement_id
+        
+        for section in REQUIREMENT_SECTIONS:
+            for req in data.get(section, []):
+                req['id'] = namespaced(req.get('id') or 'unknown')
+        for chunk in data.get('processing_metadata', {}).get('chunks', []):
+            chunk['requirement_ids'] = [namespaced(req_id) for req_id in chunk['requirement_ids']]
+    
+    def _merge_corpus(self, partitions:Dict[str, Dict], failed:List[str]):
+        """
+        Builds the corpus database: partitions by business type plus a shared authorities table
+        
+        Every requirement gets an authority_id into the shared table; its
+        authority text is kept for display.
+        
+        Args:
+            partitions: Business type -> partition database
+            failed: Business types whose document could not be processed
+        """
+        authorities = {}
+        
+        def authority_entry(name:str):
+            key = self._normalize_text(name)
+            if not key:
+                return None
+            if key not in authorities:
+                authorities[key] = {
+                    'id': f"authority_{len(authorities) + 1:03d}",
+                    'name': name.strip(),
+                    'business_types': [],
+                    'requirements_count': 0
+                }
+            return authorities[key]
+        
+        for business_type in sorted(partitions):
+            partition = partitions[business_type]
+            partition['business_type'] = business_type
+            # Reports and AI prompts name the business type after its document
+            document_name = os.path.splitext(partition.get('source_document') or '')[0]
+            partition['business_type_name'] = business_type_name(business_type, document_name or None)
+            for section in REQUIREMENT_SECTIONS:
+                for req in partition.get(section, []):
+                    entry = authority_entry(req.get('authority', ''))
+                    if entry is None:
+                        continue
+                    req['authority_id'] = entry['id']
+                    entry['requirements_count'] += 1
+                    if business_type not in entry['business_types']:
+                        entry['business_types'].append(business_type)
+            for name in partition.get('document_analysis', {}).get('regulatory_authorities', []):
+                entry = authority_entry(name)
+                if entry and business_type not in entry['business_types']:
+                    entry['business_types'].append(business_type)
+        
+        default_business_type = DEFAULT_BUSINESS_TYPE if DEFAULT_BUSINESS_TYPE in partitions else min(partitions)
+        return {
+            'default_business_type': default_business_type,
+            'business_types': {business_type: partitions[business_type] for business_type in sorted(partitions)},
+            'authorities': list(authorities.values()),
+            'processing_metadata': {
+                'processed_at': datetime.now().isoformat(),
+                'processor_version': '1.0.0',
+                'documents': {business_type: partition.get('source_document') for business_type, partition in sorted(partitions.items())},
+                'failed_documents': failed,
+                'api_calls_used': self.usage_tracker['total_calls'],
+                'total_cost': round(self.usage_tracker['total_cost'], 4)
+            },
+            'summary': {
+                'business_types': len(partitions),
+                'total_requirements': sum(partition.get('summary', {}).get('total_requirements', 0) for partition in partitions.values()),
+                'authorities': len(authorities)
+            }
+        }
+    
+    def _extract_text_from_word(self, file_path:str):
+        """
+        Extracts section-marked text from a Word document, tables included
+        
+        The document XML is streamed from the docx archive block by block
+        (see app.utils.docx_text), so extraction time is linear and memory
+        flat however large the document is.
+        
+        Args:
+            file_path: Path to Word document
+        """
+        try:
+            return extract_word_text(file_path)
             
         except Exception as e:
-            print(f"❌ Error extracting from Word: {e}")
+            logger.error("Error extracting from Word", extra={'error': str(e)})
             return None
     
-    def _clean_text(self, text:str):
+    @staticmethod
+    def _clean_text(text:str):
         """
         Cleans and normalizes text for better AI processing
         
@@ -128,177 +630,469 @@ class ComprehensiveDocumentProcessor:
         Args:
             document_text: Raw text to process
         """
-
-        prompt = f"""
-        אתה מערכת AI מתקדמת המתמחה בעיבוד מסמכים רגולטוריים בעברית לצורך רישוי עסקים.
-
-        המשימה שלך: לנתח בצורה מקיפה ומדויקת את המסמך הבא ולחלץ את כל המידע הרלוונטי לבעלי עסקים.
-
-        המסמך לעיבוד:
-        {document_text}
-
-        עליך לחלץ מידע מובנה ומפורט על:
-
-        1. **דרישות כלליות לעסקים** - דרישות שחלות על כל סוגי העסקים
-        2. **דרישות ספציפיות לפי גודל** - דרישות המתייחסות לגודל העסק במ"ר
-        3. **דרישות ספציפיות לפי תפוסה** - דרישות המתייחסות למספר אנשים
-        4. **דרישות למאפיינים מיוחדים** - גז, משלוחים, הגשת בשר
-        5. **גופים רגולטוריים** - כל הרשויות והמשרדים הרלוונטיים שמורשים לתת אישורים לפי המסמך
-        6. **זמנים ועלויות** - לוחות זמנים ועלויות לכל דרישה
-        7. **פרטים חשובים נוספים** - כל מידע רלוונטי אחר
-
-
-        עבור כל דרישה, ציין בדיוק:
-        - שם הדרישה המדויק (כפי שמופיע במסמך)
-        - הגוף/רשות המוסמכת
-        - תיאור מפורט של הדרישה
-        - תנאי התפוסה (מספר מקומות/אנשים - אם רלוונטי)
-        - תנאי שטח (גודל במ"ר - אם רלוונטי)  
-        - תנאים מיוחדים (שימוש בגז, משלוחים, הגשת בשר - אם רלוונטי)
-        - זמן טיפול משוער
-        - עלות משוערת
-        - רמת חשיבות/עדיפות
-        - היכן במסמך הדרישה מופיעה
-        - הערות או תנאים נוספים
-        - הערות חשובות 
-
-        שים לב מיוחד לגופים רגולטוריים כמו:
-        - דרישות של משרד הבריאות
-        - דרישות כבאות ובטיחות
-        - רישיונות עסק ברשויות מקומיות
-        - דרישות לעסקי מזון
-        - אישורי בנייה ותכנון
-        - דרישות סביבתיות
-        - דרישות עבודה וביטחון
-        - מיסוי ורישום
-
-        החזר תשובה בפורמט JSON הבא:
-        {{
-        "document_analysis": {{
-            "total_requirements_found": מספר_כולל,
-            "document_sections": ["רשימת החלקים הראשיים במסמך"],
-            "regulatory_authorities": ["רשימת כל הגופים המוסמכים"],
-            "processing_notes": "הערות על תהליך העיבוד",
-            "document_length": מספר_מילים,
-            "extraction_confidence": "גבוהה/בינונית/נמוכה"
-        }},
-        "general_requirements": [
-            {{
-            "id": "general_001",
-            "name": "שם הדרישה",
-            "category": "קטגוריה כללית",
-            "authority": "הגוף המוסמך",
-            "description": "תיאור מפורט של הדרישה",
-            "applies_to": "כל העסקים/עסקים מסוג מסוים",
-            "timeline": "זמן טיפול",
-            "estimated_cost": "עלות משוערת",
-            "priority": "גבוהה/בינונית/נמוכה",
-            "source_location": "היכן במסמך",
-            "additional_notes": "הערות נוספות"
-            }}
-        ],
-        "size_specific_requirements": [
-            {{
-            "id": "size_001",
-            "name": "שם הדרישה",
-            "category": "דרישות לפי גודל",
-            "authority": "הגוף המוסמך",
-            "description": "תיאור מפורט",
-            "conditions": {{
-                "min_size_sqm": מספר_או_null,
-                "max_size_sqm": מספר_או_null,
-                "size_notes": "הערות על הגודל"
-            }},
-            "timeline": "זמן טיפול",
-            "estimated_cost": "עלות",
-            "priority": "רמת חשיבות",
-            "source_location": "מיקום במסמך",
-            "additional_notes": "הערות"
-            }}
-        ],
-        "capacity_specific_requirements": [
-            {{
-            "id": "capacity_001",
-            "name": "שם הדרישה",
-            "category": "דרישות לפי תפוסה",
-            "authority": "הגוף המוסמך",
-            "description": "תיאור מפורט",
-            "conditions": {{
-                "min_capacity": מספר_או_null,
-                "max_capacity": מספר_או_null,
-                "capacity_notes": "הערות על התפוסה"
-            }},
-            "timeline": "זמן טיפול",
-            "estimated_cost": "עלות",
-            "priority": "רמת חשיבות",
-            "source_location": "מיקום במסמך",
-            "additional_notes": "הערות"
-            }}
-        ],
-        "feature_specific_requirements": [
-            {{
-            "id": "feature_001",
-            "name": "שם הדרישה",
-            "category": "דרישות לפי מאפיינים",
-            "authority": "הגוף המוסמך",
-            "description": "תיאור מפורט",
-            "conditions": {{
-                "requires_gas": true/false/null,
-                "has_delivery": true/false/null,
-                "serves_meat": true/false/null,
-                "feature_notes": "הערות על המאפיינים"
-            }},
-            "timeline": "זמן טיפול",
-            "estimated_cost": "עלות",
-            "priority": "רמת חשיבות",
-            "source_location": "מיקום במסמך",
-            "additional_notes": "הערות"
-            }}
-        ],
-        "important_information": [
-            {{
-            "topic": "נושא חשוב",
-            "description": "מידע חשוב שלא נכנס לקטגוריות הקודמות",
-            "relevance": "למה זה חשוב",
-            "source_location": "מיקום במסמך"
-            }}
-        ]
-        }}
-
-        הוראות חשובות:
-        1. אל תמציא מידע - רק מה שמופיע במסמך
-        2. אם משהו לא ברור, ציין "לא מוגדר" או "דורש בדיקה נוספת"
-        3. שמור על דיוק מקסימלי - זה ייושם במערכת אמיתית
-        4. התמקד בדרישות מעשיות לבעלי עסקים קטנים-בינוניים
-        5. זהה קשרים בין דרישות שונות
-        6. שים לב לחריגים ותנאים מיוחדים
-        7. שים לב לגופים שנדרשים לאשר ורלוונטים לדרישות
-        8. נא התעלם מדרישות שמוגדרות כלא רלוונטיות
-        9. שים לב להערות חשובות במסמך, כמו פטורים או דרישות שלא חייבות באישור
-        10. לא להכניס גופים שלא נדרשים לתת אישור או קיים פטור מהם, יש להתעלם מדרישות כאלה
-        """
         try:
-            print("📤 Sending document to Claude AI...")
-            
-            response = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=10000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            # Track usage
-            self._update_usage_tracker(response.usage)
+            logger.info("Sending document to Claude AI")
             
             # Extract JSON response
-            response_text = response.content[0].text
+            response_text = self._call_ai(self._build_extraction_prompt(document_text))
             requirements_data = self._extract_json_from_response(response_text)
             
-            print("✅ AI processing completed successfully")
+            logger.info("AI processing completed")
             
             return requirements_data
             
         except Exception as e:
-            print(f"❌ AI processing error: {e}")
+            logger.error("AI processing error", extra={'error': str(e)})
+            return None
+    
+    def _process_in_chunks(self, document_text:str):
+        """
+        Processes the document as section chunks sent to AI concurrently
+        
+        Args:
+            document_text: Section-marked text from _extract_text_from_word
+        """
+        sections = self._split_into_sections(document_text)
+        section_hashes = [self._section_hash(section) for section in sections]
+        chunks = self._pack_chunks(sections)
+        
+        results = self._run_chunks([text for text, _ in chunks])
+        if results is None:
+            return None
+        
+        chunk_hashes = [[section_hashes[i] for i in indices] for _, indices in chunks]
+        merged = self._merge_chunk_results(results, chunk_hashes)
+        merged['document_analysis']['document_length'] = len(document_text.split())
+        merged['processing_metadata']['section_hashes'] = section_hashes
+        return merged
+    
+    def _process_incrementally(self, document_text:str, previous:Dict):
+        """
+        Reprocesses only the sections that changed since the previous output
+        
+        A previous chunk is kept (with its requirement IDs) when every section
+        it was built from still exists unchanged. All other sections - added,
+        modified, or sharing a chunk with a removed/modified section - are
+        re-packed and sent to AI, and the results are spliced into the kept
+        requirements. Requirements extracted again from those sections keep
+        their previous IDs; the numbers of removed ones are not reused.
+        
+        Args:
+            document_text: Section-marked text from _extract_text_from_word
+            previous: Previous requirements database with chunk metadata
+        """
+        sections = self._split_into_sections(document_text)
+        section_hashes = [self._section_hash(section) for section in sections]
+        current = set(section_hashes)
+        
+        previous_chunks = previous.get('processing_metadata', {}).get('chunks', [])
+        kept_chunks = [chunk for chunk in previous_chunks if set(chunk['section_hashes']) <= current]
+        covered = {h for chunk in kept_chunks for h in chunk['section_hashes']}
+        changed = {i for i, h in enumerate(section_hashes) if h not in covered}
+        
+        logger.info("Incremental update", extra={
+            'sections_changed': len(changed),
+            'sections': len(sections),
+            'chunks_reused': len(kept_chunks),
+            'chunks': len(previous_chunks)
+        })
+        
+        # Requirements survive if any kept chunk produced them; the others are
+        # offered back by key, so a re-extracted requirement keeps its ID
+        kept_ids = {req_id for chunk in kept_chunks for req_id in chunk['requirement_ids']}
+        high_water = dict(previous.get('processing_metadata', {}).get('id_high_water', {}))
+        base = {
+            'document_analysis': dict(previous.get('document_analysis', {})),
+            'important_information': list(previous.get('important_information', [])),
+            'processing_metadata': {'chunks': kept_chunks, 'id_high_water': high_water},
+            'previous_ids': {}
+        }
+        for section in REQUIREMENT_SECTIONS:
+            requirements = previous.get(section, [])
+            base[section] = [req for req in requirements if req.get('id') in kept_ids]
+            base['previous_ids'][section] = {
+                self._requirement_key(req): req['id'] for req in requirements if req.get('id') not in kept_ids
+            }
+            high_water[section] = max(
+                [high_water.get(section, 0)] + [self._id_number(req.get('id')) for req in requirements]
+            )
+        
+        # Information survives if a kept chunk reported its topic (older
+        # outputs have no per-chunk topics, so theirs is kept as is)
+        if all('information_topics' in chunk for chunk in previous_chunks):
+            kept_topics = {topic for chunk in kept_chunks for topic in chunk['information_topics']}
+            base['important_information'] = [
+                info for info in base['important_information']
+                if self._normalize_text(info.get('topic', '')) in kept_topics
+            ]
+        
+        chunks = self._pack_chunks(sections, include=changed) if changed else []
+        results = self._run_chunks([text for text, _ in chunks])
+        if results is None:
+            return None
+        
+        chunk_hashes = [[section_hashes[i] for i in indices] for _, indices in chunks]
+        merged = self._merge_chunk_results(results, chunk_hashes, base=base)
+        merged['document_analysis']['document_length'] = len(document_text.split())
+        merged['processing_metadata']['section_hashes'] = section_hashes
+        return merged
+    
+    def _run_chunks(self, chunks:List[str]):
+        """
+        Sends chunks to AI through the worker pool
+        
+        Args:
+            chunks: Chunk texts
+            
+        Returns:
+            List of parsed results in chunk order, or None if any chunk failed
+        """
+        if not chunks:
+            return []
+        
+        logger.info("Processing chunks", extra={'chunks': len(chunks), 'workers': self.chunk_workers})
+        
+        with ThreadPoolExecutor(max_workers=self.chunk_workers) as executor:
+            results = list(executor.map(self._process_chunk, range(len(chunks)), chunks, [len(chunks)] * len(chunks)))
+        
+        failed = [i + 1 for i, result in enumerate(results) if result is None or 'error' in result]
+        if failed:
+            logger.error("Chunks failed", extra={'chunks': failed})
+            return None
+        
+        return results
+    
+    def _process_chunk(self, index:int, chunk_text:str, total_chunks:int):
+        """
+        Processes a single chunk with AI
+        
+        Args:
+            index: Chunk position (0-based)
+            chunk_text: Chunk text
+            total_chunks: Number of chunks in the document
+        """
+        try:
+            logger.info("Sending chunk to Claude AI", extra={'chunk': index + 1, 'chunks': total_chunks})
+            response_text = self._call_ai(self._build_extraction_prompt(CHUNK_NOTE + chunk_text))
+            return self._extract_json_from_response(response_text)
+        
+        except Exception as e:
+            logger.error("AI processing error in chunk", extra={'chunk': index + 1, 'error': str(e)})
+            return None
+    
+    def _split_into_sections(self, document_text:str):
+        """
+        Splits section-marked text into sections at header/subsection markers
+        
+        Args:
+            document_text: Section-marked text
+        """
+        sections = []
+        current = []
+        
+        for line in document_text.split('\n'):
+            if line.startswith(SECTION_MARKERS) and current:
+                sections.append('\n'.join(current))
+                current = []
+            current.append(line)
+        
+        if current:
+            sections.append('\n'.join(current))
+        
+        return sections
+    
+    def _section_hash(self, section:str):
+        """
+        Content hash identifying a section across document revisions
+        
+        Args:
+            section: Section text
+        """
+        return hashlib.sha256(section.encode('utf-8')).hexdigest()[:16]
+    
+    def _pack_chunks(self, sections:List[str], include:Optional[set]=None):
+        """
+        Packs consecutive sections into chunks of at most chunk_max_chars
+        
+        A chunk that starts inside a top-level section is prefixed with that
+        section's header so it keeps its document context.
+        
+        Args:
+            sections: Section texts in document order
+            include: Indices of the sections to pack (default: all)
+            
+        Returns:
+            List of (chunk_text, section_indices) tuples
+        """
+        chunks = []
+        current = []
+        current_indices = []
+        current_len = 0
+        current_header = None
+        
+        for index, section in enumerate(sections):
+            if section.startswith(SECTION_MARKERS[0]):
+                current_header = section.split('\n', 1)[0]
+            if include is not None and index not in include:
+                continue
+            
+            for piece in self._split_oversized(section):
+                if current and current_len + len(piece) + 1 > self.chunk_max_chars:
+                    chunks.append(('\n'.join(current), current_indices))
+                    current, current_indices, current_len = [], [], 0
+                if not current and current_header and not piece.startswith(current_header):
+                    current.append(current_header)
+                    current_len += len(current_header) + 1
+                current.append(piece)
+                current_len += len(piece) + 1
+                if not current_indices or current_indices[-1] != index:
+                    current_indices.append(index)
+        
+        if current:
+            chunks.append(('\n'.join(current), current_indices))
+        
+        return chunks
+    
+    def _split_oversized(self, section:str):
+        """
+        Splits a section longer than chunk_max_chars on line boundaries
+        
+        Args:
+            section: Section text
+        """
+        if len(section) <= self.chunk_max_chars:
+            return [section]
+        
+        pieces, piece, piece_len = [], [], 0
+        for line in section.split('\n'):
+            if piece and piece_len + len(line) + 1 > self.chunk_max_chars:
+                pieces.append('\n'.join(piece))
+                piece, piece_len = [], 0
+            piece.append(line)
+            piece_len += len(line) + 1
+        pieces.append('\n'.join(piece))
+        
+        return pieces
+    
+    def _merge_chunk_results(self, results:List[Dict], chunk_hashes:List[List[str]], base:Optional[Dict]=None):
+        """
+        Merges per-chunk extraction results into a single database
+        
+        Requirements are de-duplicated on (name, authority, conditions). A new
+        requirement reuses its ID from base['previous_ids'] when it was
+        extracted before, or gets the next number above the section's high-water
+        mark, so IDs are never handed to a different requirement. Each chunk's
+        section hashes, requirement IDs, information topics and analysis are
+        recorded in processing_metadata['chunks'], and document_analysis is
+        rebuilt from the chunks present in this run.
+        
+        Args:
+            results: Parsed JSON results, in chunk order
+            chunk_hashes: Section hashes each chunk was built from
+            base: Existing database to splice the results into
+        """
+        base = base or {}
+        base_metadata = base.get('processing_metadata', {})
+        merged = {
+            'document_analysis': {
+                'total_requirements_found': 0,
+                'document_sections': [],
+                'regulatory_authorities': [],
+                'processing_notes': '',
+                'document_length': 0,
+                'extraction_confidence': CONFIDENCE_LEVELS[-1]
+            },
+            'important_information': list(base.get('important_information', [])),
+            'processing_metadata': {
+                'chunks': list(base_metadata.get('chunks', [])),
+                'id_high_water': dict(base_metadata.get('id_high_water', {}))
+            }
+        }
+        seen_topics = {self._normalize_text(info.get('topic', '')) for info in merged['important_information']}
+        high_water = merged['processing_metadata']['id_high_water']
+        chunk_ids = [[] for _ in results]
+        
+        for section, prefix in REQUIREMENT_SECTIONS.items():
+            merged[section] = list(base.get(section, []))
+            previous_ids = base.get('previous_ids', {}).get(section, {})
+            seen = {self._requirement_key(req): req['id'] for req in merged[section]}
+            next_number = max(
+                [high_water.get(section, 0)] + [self._id_number(req['id']) for req in merged[section]]
+            ) + 1
+            
+            for chunk_index, result in enumerate(results):
+                for req in result.get(section, []):
+                    key = self._requirement_key(req)
+                    if key not in seen:
+                        if key in previous_ids:
+                            req['id'] = previous_ids[key]
+                        else:
+                            req['id'] = f"{prefix}_{next_number:03d}"
+                            next_number += 1
+                        seen[key] = req['id']
+                        merged[section].append(req)
+                    chunk_ids[chunk_index].append(seen[key])
+            
+            high_water[section] = next_number - 1
+        
+        for result, hashes, ids in zip(results, chunk_hashes, chunk_ids):
+            topics = []
+            for info in result.get('important_information', []):
+                topic = self._normalize_text(info.get('topic', ''))
+                topics.append(topic)
+                if topic not in seen_topics:
+                    seen_topics.add(topic)
+                    merged['important_information'].append(info)
+            
+            chunk_analysis = result.get('document_analysis', {})
+            merged['processing_metadata']['chunks'].append({
+                'section_hashes': hashes,
+                'requirement_ids': ids,
+                'information_topics': topics,
+                'analysis': {field: chunk_analysis.get(field) for field in CHUNK_ANALYSIS_FIELDS}
+            })
+        
+        # Chunks from older outputs carry no analysis; the previous summary stands in for them
+        analyses = [chunk['analysis'] for chunk in merged['processing_metadata']['chunks'] if 'analysis' in chunk]
+        if len(analyses) < len(merged['processing_metadata']['chunks']):
+            analyses.insert(0, base.get('document_analysis', {}))
+        
+        analysis = merged['document_analysis']
+        notes = []
+        for chunk_analysis in analyses:
+            for field in ('document_sections', 'regulatory_authorities'):
+                for value in chunk_analysis.get(field) or []:
+                    if value not in analysis[field]:
+                        analysis[field].append(value)
+            if chunk_analysis.get('processing_notes'):
+                notes.append(chunk_analysis['processing_notes'])
+            
+            # Overall confidence is the lowest reported by any chunk
+            confidence = chunk_analysis.get('extraction_confidence')
+            if confidence in CONFIDENCE_LEVELS and CONFIDENCE_LEVELS.index(confidence) < CONFIDENCE_LEVELS.index(analysis['extraction_confidence']):
+                analysis['extraction_confidence'] = confidence
+        
+        analysis['processing_notes'] = ' | '.join(notes)
+        analysis['total_requirements_found'] = sum(len(merged[section]) for section in REQUIREMENT_SECTIONS)
+        
+        return merged
+    
+    def _id_number(self, requirement_id:str):
+        """
+        Numeric suffix of a requirement ID such as 'size_007'
+        
+        Args:
+            requirement_id: Requirement ID
+        """
+        match = re.search(r'(\d+)$', requirement_id or '')
+        return int(match.group(1)) if match else 0
+    
+    def _requirement_key(self, req:Dict):
+        """
+        Identity of a requirement for de-duplication across chunks
+        
+        Args:
+            req: Requirement dict
+        """
+        return (
+            self._normalize_text(req.get('name', '')),
+            self._normalize_text(req.get('authority', '')),
+            json.dumps(req.get('conditions', {}), sort_keys=True, ensure_ascii=False)
+        )
+    
+    def _normalize_text(self, text:str):
+        """
+        Collapses whitespace and quote variants for comparisons
+        
+        Args:
+            text: Text to normalize
+        """
+        text = re.sub(r'\s+', ' ', str(text or '')).strip()
+        return text.replace('״', '"').replace('׳', "'")
+    
+    def _build_extraction_prompt(self, document_text:str):
+        """
+        Builds the per-call part of the extraction prompt for a document or chunk
+        
+        The instructions and JSON schema are in EXTRACTION_SYSTEM_PROMPT.
+        
+        Args:
+            document_text: Text to embed in the prompt
+        """
+        return f"""המסמך לעיבוד:
+{document_text}
+
+חלץ את כל הדרישות מהמסמך לפי ההוראות והחזר JSON בלבד בפורמט שהוגדר."""
+    
+    def _call_ai(self, prompt:str, max_tokens:int=10000, system:str=None):
+        """
+        Sends a single prompt to Claude and returns the response text
+        
+        The system prompt is marked for prompt caching, so consecutive calls
+        (e.g. document chunks) only pay full price for the variable prompt.
+        Responses are served from the on-disk cache when the same request was
+        already sent with the same model and template version. Only complete
+        responses are cached: ones that ended normally (not at max_tokens)
+        and contain valid JSON, so a bad response is not replayed on the
+        next run.
+        
+        Args:
+            prompt: Prompt to send
+            max_tokens: Output token limit
+            system: Static system prompt (defaults to EXTRACTION_SYSTEM_PROMPT)
+        """
+        system = system or EXTRACTION_SYSTEM_PROMPT
+        
+        cache_key = None
+        if self.response_cache:
+            cache_key = self.response_cache.make_key(AI_MODEL, PROMPT_TEMPLATE_VERSION, max_tokens, system + "\0" + prompt)
+            cached = self.response_cache.get(cache_key)
+            if cached and self._parse_json_response(cached['text']) is not None:
+                with self._usage_lock:
+                    self.usage_tracker['cache_hits'] += 1
+                logger.info("Using cached AI response", extra={'input_tokens_saved': cached['usage']['input_tokens']})
+                return cached['text']
+        
+        with self._ai_call_slots:
+            started = time.perf_counter()
+            try:
+                response = self.client.messages.create(
+                    model=AI_MODEL,
+                    max_tokens=max_tokens,
+                    system=[{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}],
+                    messages=[{"role": "user", "content": prompt}]
+                )
+            except Exception:
+                LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, task="extraction", outcome="error", **request_labels())
+                raise
+            LLM_REQUEST_SECONDS.observe(time.perf_counter() - started, task="extraction", outcome="ok", **request_labels())
+        
+        # Track usage
+        self._update_usage_tracker(response.usage)
+        
+        response_text = response.content[0].text
+        if cache_key:
+            if response.stop_reason == "end_turn" and self._parse_json_response(response_text) is not None:
+                self.response_cache.put(cache_key, AI_MODEL, response_text, response.usage)
+            else:
+                logger.warning("Incomplete AI response not cached", extra={'stop_reason': response.stop_reason})
+        
+        return response_text
+    
+    def _parse_json_response(self, response_text:str):
+        """
+        Parses the JSON object in an AI response, or returns None
+        
+        Args:
+            response_text: Raw response text
+        """
+        start_idx = response_text.find('{')
+        end_idx = response_text.rfind('}') + 1
+        if start_idx == -1 or end_idx <= start_idx:
+            return None
+        try:
+            return json.loads(response_text[start_idx:end_idx])
+        except json.JSONDecodeError:
             return None
         
     def _extract_json_from_response(self, response_text:str):
@@ -321,8 +1115,7 @@ class ComprehensiveDocumentProcessor:
                 raise ValueError("No JSON found in response")
                 
         except json.JSONDecodeError as e:
-            print(f"❌ JSON parsing error: {e}")
-            print("Raw response preview:", response_text[:500])
+            logger.error("JSON parsing error", extra={'error': str(e), 'response_preview': response_text[:500]})
             
             # Save problematic response for debugging
             with open(f"debug_response_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt", 'w', encoding='utf-8') as f:
@@ -352,10 +1145,17 @@ class ComprehensiveDocumentProcessor:
         for section in required_sections:
             if section not in data:
                 data[section] = []
-                print(f"⚠️ Missing section: {section} - added empty list")
+                logger.warning("Missing section - added empty list", extra={'section': section})
+        
+        # Parse cost and timeline text once, so requests only sum numeric ranges
+        for section in required_sections[1:]:
+            for req in data[section]:
+                req['cost_estimate'] = parse_cost(req.get('estimated_cost'))
+                req['timeline_estimate'] = parse_timeline(req.get('timeline'))
         
-        # Add metadata
+        # Add metadata (keeping section/chunk records from the chunked pipeline)
         data['processing_metadata'] = {
+            **data.get('processing_metadata', {}),
             'processed_at': datetime.now().isoformat(),
             'processor_version': '1.0.0',
             'api_calls_used': self.usage_tracker['total_calls'],
@@ -396,12 +1196,50 @@ class ComprehensiveDocumentProcessor:
             with open(output_path, 'w', encoding='utf-8') as f:
                 json.dump(data, f, ensure_ascii=False, indent=2)
             
-            print(f"✅ Data saved to {output_path}")
+            logger.info("Data saved", extra={'output': output_path})
             
         except Exception as e:
-            print(f"❌ Error saving data: {e}")
+            logger.error("Error saving data", extra={'output': output_path, 'error': str(e)})
             raise 
     
+    def _save_binary_snapshot(self, data:dict, output_path:str):
+        """
+        Writes the memory-mappable snapshot next to the JSON output
+        
+        The snapshot carries the JSON file's content hash so the API reports
+        the same database version whichever file it loads. The API decodes
+        snapshot requirements only when they are used, so every requirement's
+        response fields are validated here, as loading the JSON would.
+        
+        Args:
+            data: Data to save
+            output_path: Path of the saved JSON file
+        """
+        RequirementPayloads([req for section in REQUIREMENT_SECTIONS for req in data.get(section, [])])
+        
+        with open(output_path, 'rb') as f:
+            version = hashlib.sha256(f.read()).hexdigest()[:12]
+        
+        snapshot_path = os.path.splitext(output_path)[0] + ".snapshot"
+        write_snapshot(data, snapshot_path, version)
+        logger.info("Binary snapshot saved", extra={'output': snapshot_path})
+    
+    def _remove_binary_snapshot(self, output_path:str):
+        """
+        Deletes a snapshot left next to the JSON output by a single-document run
+        
+        Snapshots only hold the single-document layout. The API prefers the
+        snapshot whenever it is at least as new as the JSON (mtimes can tie
+        after copies or restores), so a stale one would replace the corpus.
+        
+        Args:
+            output_path: Path of the saved JSON file
+        """
+        snapshot_path = os.path.splitext(output_path)[0] + ".snapshot"
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+            logger.info("Removed single-document binary snapshot", extra={'output': snapshot_path})
+    
     def _print_summary(self, data:dict):
         """Print processing summary"""
         print("\n" + "="*60)
@@ -426,6 +1264,8 @@ class ComprehensiveDocumentProcessor:
         print(f"\n💰 API Usage:")
         print(f"   • API Calls: {metadata.get('api_calls_used', 0)}")
         print(f"   • Total Cost: ${metadata.get('total_cost', 0):.4f}")
+        print(f"   • Cached Responses Used: {self.usage_tracker.get('cache_hits', 0)}")
+        print(f"   • Prompt Cache Tokens (read/write): {self.usage_tracker['prompt_cache_read_tokens']:,}/{self.usage_tracker['prompt_cache_write_tokens']:,}")
         print(f"   • Remaining Credits: ${5.0 - metadata.get('total_cost', 0):.4f}")
         
         print(f"\n⏰ Processing Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
@@ -433,42 +1273,120 @@ class ComprehensiveDocumentProcessor:
         
         print("\n✅ Document processing completed successfully!")
     
-    def _update_usage_tracker(self, usage:dict):
+    def _print_corpus_summary(self, corpus:dict):
+        """Print corpus processing summary"""
+        print("\n" + "="*60)
+        print("📚 CORPUS PROCESSING SUMMARY")
+        print("="*60)
+        
+        summary = corpus.get('summary', {})
+        metadata = corpus.get('processing_metadata', {})
+        
+        print(f"📄 Business Types: {summary.get('business_types', 0)}   Total Requirements: {summary.get('total_requirements', 0)}")
+        for business_type, partition in corpus.get('business_types', {}).items():
+            print(f"   • {business_type}: {partition.get('summary', {}).get('total_requirements', 0)} requirements ({partition.get('source_document')})")
+        print(f"\n🏛️ Shared Authorities: {summary.get('authorities', 0)}")
+        
+        if metadata.get('failed_documents'):
+            print(f"\n⚠️ Failed Documents: {', '.join(metadata['failed_documents'])}")
+        
+        print(f"\n💰 API Usage:")
+        print(f"   • API Calls: {metadata.get('api_calls_used', 0)}")
+        print(f"   • Total Cost: ${metadata.get('total_cost', 0):.4f}")
+        print(f"   • Cached Responses Used: {self.usage_tracker.get('cache_hits', 0)}")
+        print("="*60)
+        
+        print("\n✅ Corpus processing completed successfully!")
+    
+    async def aclose(self):
+        """Close the pooled connections of the async client"""
+        await self.async_client.close()
+    
+    def _update_usage_tracker(self, usage:dict, task:str="extraction"):
         """
-        Updates usage tracker with AI API usage
+        Updates usage tracker (and token/cost metrics) with AI API usage
         
         Args:
             usage: Usage data from AI API
+            task: What the call was for (extraction, report, narrative, ...)
         """
-        self.usage_tracker['total_calls'] += 1
-        self.usage_tracker['input_tokens'] += usage.input_tokens
-        self.usage_tracker['output_tokens'] += usage.output_tokens
+        # Prompt cache fields are None/absent when caching was not used
+        cache_write_tokens = getattr(usage, 'cache_creation_input_tokens', None) or 0
+        cache_read_tokens = getattr(usage, 'cache_read_input_tokens', None) or 0
         
-        # Calculate cost (Claude 3.5 Sonnet pricing)
+        # Calculate cost (Claude Sonnet pricing: cache writes 1.25x, cache reads 0.1x of input)
         input_cost = (usage.input_tokens / 1_000_000) * 3.0
+        cache_write_cost = (cache_write_tokens / 1_000_000) * 3.75
+        cache_read_cost = (cache_read_tokens / 1_000_000) * 0.30
         output_cost = (usage.output_tokens / 1_000_000) * 15.0
-        call_cost = input_cost + output_cost
+        call_cost = input_cost + cache_write_cost + cache_read_cost + output_cost
+        
+        with self._usage_lock:
+            self.usage_tracker['total_calls'] += 1
+            self.usage_tracker['input_tokens'] += usage.input_tokens
+            self.usage_tracker['output_tokens'] += usage.output_tokens
+            self.usage_tracker['prompt_cache_write_tokens'] += cache_write_tokens
+            self.usage_tracker['prompt_cache_read_tokens'] += cache_read_tokens
+            self.usage_tracker['total_cost'] += call_cost
         
-        self.usage_tracker['total_cost'] += call_cost
+        labels = request_labels()
+        for kind, tokens in (('input', usage.input_tokens), ('output', usage.output_tokens),
+                             ('cache_write', cache_write_tokens), ('cache_read', cache_read_tokens)):
+            LLM_TOKENS.observe(tokens, task=task, kind=kind, **labels)
+        LLM_COST_DOLLARS.inc(call_cost, task=task)
         
-        print(f"💸 API Call Cost: ${call_cost:.4f}")
-        print(f"💰 Total Cost So Far: ${self.usage_tracker['total_cost']:.4f}")
+        logger.info("API call", extra={
+            'task': task,
+            'input_tokens': usage.input_tokens,
+            'output_tokens': usage.output_tokens,
+            'cost': round(call_cost, 4),
+            'total_cost': round(self.usage_tracker['total_cost'], 4)
+        })
+    
+def extract_word_text(file_path:str):
+    """
+    Section-marked, cleaned text of a Word document
     
+    Module-level so corpus processing can run it in worker processes.
+    
+    Args:
+        file_path: Path to Word document
+    """
+    return ComprehensiveDocumentProcessor._clean_text('\n'.join(iter_docx_lines(file_path)))
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract licensing requirements from a regulatory Word document")
+    parser.add_argument("--document", default=os.getenv("DOCUMENT_PATH","regulatory_document.docx"), help="Path to the Word document")
+    parser.add_argument("--output", default=os.getenv("OUTPUT_PATH","requirements.json"), help="Where to write the requirements JSON")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the LLM response cache")
+    parser.add_argument("--purge-cache", action="store_true", help="Delete all cached LLM responses before processing")
+    parser.add_argument("--incremental", action="store_true", help="Only reprocess sections changed since the existing output")
+    parser.add_argument("--corpus", help="Directory of Word documents, one per business type, to process into one partitioned database")
+    args = parser.parse_args()
+    configure_logging()
+    
     # Initialize processor
-    processor = ComprehensiveDocumentProcessor()
+    processor = ComprehensiveDocumentProcessor(use_cache=not args.no_cache)
+    
+    if args.purge_cache:
+        purged = (processor.response_cache or LLMResponseCache(LLM_CACHE_DIR)).purge()
+        print(f"🗑️ Purged {purged} cached AI responses")
     
     # Process document
-    document_path =os.getenv("DOCUMENT_PATH","regulatory_document.docx")
-    output_path = os.getenv("OUTPUT_PATH","requirements.json")
+    document_path = args.document
+    output_path = args.output
+    chunked = os.getenv("CHUNKED_PROCESSING", "true").lower() != "false"
     
     try:
-        if not os.path.exists(document_path):
+        if args.corpus:
+            # Process every business type's document
+            results = processor.process_corpus(args.corpus, output_path, chunked=chunked, incremental=args.incremental)
+        elif not os.path.exists(document_path):
             print(f"❌ Document not found: {document_path}")
             print("Please place your Word document in the same directory and update the path.")
         else:
             # Process the document
-            results = processor.process_document(document_path, output_path)
+            results = processor.process_document(document_path, output_path, chunked=chunked, incremental=args.incremental)
             
     except Exception as e:
         print(f"❌ Processing failed: {e}")
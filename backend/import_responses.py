@@ -0,0 +1,27 @@
+"""
+One-time import of saved survey responses into the SQLite analytics store
+"""
+
+import argparse
+import os
+from app.services.analytics_store import AnalyticsStore
+from app.services.database_loader import BACKEND_DIR
+
+def main():
+    parser = argparse.ArgumentParser(description="Import survey responses (survey_*.json, responses*.jsonl) into the analytics store")
+    parser.add_argument("--responses-dir", default=os.path.join(BACKEND_DIR, "data", "responses"), help="Directory with saved survey responses")
+    parser.add_argument("--db", default=os.getenv("ANALYTICS_DB_PATH", os.path.join(BACKEND_DIR, "data", "analytics.sqlite3")), help="Analytics SQLite database")
+    args = parser.parse_args()
+    
+    print(f"📥 Importing survey responses from {args.responses_dir}")
+    store = AnalyticsStore(args.db)
+    try:
+        counts = store.import_directory(args.responses_dir)
+    finally:
+        store.close()
+    
+    print(f"✅ Imported {counts['added']} new surveys ({counts['records']} records in {counts['files']} files, {counts['errors']} errors)")
+    print(f"📊 Analytics database: {args.db}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Persistent content-addressed cache for LLM responses used by document processing
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Optional
+
+class LLMResponseCache:
+    """
+    On-disk cache of raw LLM responses keyed by a hash of the request.
+
+    Each entry is one JSON file named by the SHA-256 of (model, prompt
+    template version, max_tokens, prompt). Reads refresh the file mtime so
+    size-based eviction drops the least recently used entries first.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 200 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(model: str, template_version: str, max_tokens: int, prompt: str) -> str:
+        """Hash the parts of a request that determine its response"""
+        digest = hashlib.sha256()
+        for part in (model, template_version, str(max_tokens), prompt):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return the cached entry for key, or None"""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def put(self, key: str, model: str, text: str, usage) -> None:
+        """Store a response and its token usage, then enforce the size limit"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = {
+            'model': model,
+            'text': text,
+            'usage': {
+                'input_tokens': usage.input_tokens,
+                'output_tokens': usage.output_tokens
+            },
+            'created_at': datetime.now().isoformat()
+        }
+
+        # Write then rename so concurrent readers never see a partial file
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+        self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits max_bytes"""
+        with self._lock:
+            entries = []
+            total = 0
+            for name in os.listdir(self.cache_dir):
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+                total += stat.st_size
+
+            entries.sort()
+            for _, size, name in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    continue
+                total -= size
+
+    def purge(self) -> int:
+        """Delete every cache entry, returning the number removed"""
+        if not os.path.isdir(self.cache_dir):
+            return 0
+
+        removed = 0
+        with self._lock:
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.cache_dir, name))
+                    removed += 1
+        return removed
@@ -0,0 +1,8 @@
+"""
+Shared pytest setup - tests import the app package from backend/
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
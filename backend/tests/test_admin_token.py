@@ -0,0 +1,31 @@
+"""
+Admin token - admin and analytics endpoints are closed unless ADMIN_TOKEN is set
+"""
+
+import pytest
+from fastapi import HTTPException
+from app.api.admin import verify_admin_token
+
+
+def test_disabled_without_a_configured_token(monkeypatch):
+    monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+
+    for header in (None, "", "anything"):
+        with pytest.raises(HTTPException) as error:
+            verify_admin_token(header)
+        assert error.value.status_code == 503
+
+
+@pytest.mark.parametrize("header", [None, "", "wrong", "secret "])
+def test_wrong_token_is_rejected(monkeypatch, header):
+    monkeypatch.setenv("ADMIN_TOKEN", "secret")
+
+    with pytest.raises(HTTPException) as error:
+        verify_admin_token(header)
+    assert error.value.status_code == 403
+
+
+def test_configured_token_is_accepted(monkeypatch):
+    monkeypatch.setenv("ADMIN_TOKEN", "סוד")
+
+    assert verify_admin_token("סוד") is None
@@ -0,0 +1,129 @@
+"""
+Analytics store ingestion - deduplication of response log records
+"""
+
+import json
+import sqlite3
+import pytest
+from app.api import survey as survey_api
+from app.models import SurveyRequest, BatchSurveyResult, BatchProfile
+from app.services.analytics_store import AnalyticsStore, SCHEMA
+
+SURVEY = {
+    'size': 120.0, 'max_people': 40, 'uses_gas': True, 'has_delivery': False,
+    'serves_meat': True, 'business_name': None, 'location': None
+}
+
+
+class RecordingLog:
+    """Response log stand-in that keeps the queued records"""
+
+    def __init__(self):
+        self.records = []
+
+    def record(self, entry):
+        self.records.append(entry)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalyticsStore(str(tmp_path / "analytics.sqlite3"))
+    yield store
+    store.close()
+
+
+def _survey_record(**overrides):
+    record = {
+        'timestamp': "2025-01-01T09:00:00",
+        'kind': 'survey',
+        'database_version': "v1",
+        'survey_data': SURVEY,
+        'requirement_ids': ["general_001", "size_001"],
+        'estimated_total_cost': "1,000 ₪ (אומדן)",
+        'estimated_total_time': "4 שבועות (משוער)"
+    }
+    record.update(overrides)
+    return record
+
+
+def test_reinserting_records_does_not_duplicate(store):
+    records = [_survey_record(), _survey_record(timestamp="2025-01-01T10:00:00")]
+    assert store.insert_records(records) == 2
+    assert store.insert_records(records) == 0
+    assert store.summary()['surveys'] == 2
+
+
+def test_batch_of_identical_surveys_counts_every_survey(store, monkeypatch):
+    log = RecordingLog()
+    monkeypatch.setattr(survey_api, '_response_log', log)
+
+    surveys = [SurveyRequest(**SURVEY) for _ in range(5)]
+    results = [
+        BatchSurveyResult(index=i, profile_id="p1", requirement_ids=["general_001"], requirements_count=1)
+        for i in range(5)
+    ]
+    profiles = [BatchProfile(profile_id="p1", survey_indexes=list(range(5)), requirement_ids=["general_001"])]
+    survey_api.log_batch_response(surveys, results, profiles, "v1")
+
+    assert store.insert_records(log.records) == 5
+    assert store.insert_records(log.records) == 0
+    summary = store.summary(kind='batch')
+    assert summary['surveys'] == 5
+    assert summary['batch_surveys'] == 5
+    assert store.top_requirements() == [{'requirement_id': "general_001", 'matches': 5}]
+
+
+def test_import_numbers_legacy_batch_records(store, tmp_path):
+    # Logged before records carried batch_index: five identical lines
+    responses_dir = tmp_path / "responses"
+    responses_dir.mkdir()
+    record = _survey_record(kind='batch', batch_id="abc123")
+    (responses_dir / "responses.jsonl").write_text(
+        "".join(json.dumps(record, ensure_ascii=False) + "\n" for _ in range(5)), encoding='utf-8'
+    )
+
+    counts = store.import_directory(str(responses_dir))
+    assert counts == {'files': 1, 'records': 5, 'added': 5, 'errors': 0}
+    assert store.import_directory(str(responses_dir))['added'] == 0
+    assert store.summary()['surveys'] == 5
+
+
+def test_cost_and_time_totals_are_parsed(store):
+    store.insert_records([_survey_record()])
+    costs = store.cost_distribution()
+    assert costs['surveys'] == 1
+    assert costs['avg_cost'] == 1000
+    assert costs['max_weeks'] == 4
+
+
+def test_business_type_is_stored_and_filtered(store):
+    store.insert_records([
+        _survey_record(),
+        _survey_record(survey_data={**SURVEY, 'business_type': "bakery"}),
+        _survey_record(survey_data={**SURVEY, 'business_type': "bakery"}, timestamp="2025-01-02T09:00:00")
+    ])
+    assert store.summary()['business_types'] == 2
+    assert store.summary(business_type="bakery")['surveys'] == 2
+    # Records logged before surveys had a business type are food surveys
+    assert store.summary(business_type="food")['surveys'] == 1
+
+
+def test_business_type_column_is_added_to_an_existing_database(tmp_path):
+    db_path = str(tmp_path / "analytics.sqlite3")
+    old_schema = "\n".join(line for line in SCHEMA.splitlines() if 'business_type' not in line)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(old_schema)
+    conn.execute(
+        "INSERT INTO surveys (record_hash, submitted_at, kind, size, max_people, uses_gas, has_delivery, serves_meat, requirements_count) "
+        "VALUES ('h1', '2025-01-01T09:00:00', 'survey', 100, 20, 0, 0, 0, 3)"
+    )
+    conn.commit()
+    conn.close()
+
+    store = AnalyticsStore(db_path)
+    try:
+        assert store.summary(business_type="food")['surveys'] == 1
+        store.insert_records([_survey_record(survey_data={**SURVEY, 'business_type': "bakery"})])
+        assert store.summary(business_type="bakery")['surveys'] == 1
+    finally:
+        store.close()
@@ -0,0 +1,107 @@
+"""
+Binary snapshot - round trip of the requirements database through write_snapshot/BinarySnapshot
+"""
+
+import asyncio
+import json
+import os
+import pytest
+from app.services.binary_snapshot import BinarySnapshot, write_snapshot
+from app.services.database_loader import DatabaseLoader, DEFAULT_DB_PATH
+from app.services.requirements_index import REQUIREMENT_SECTIONS, RequirementsIndex
+from benchmarks.synthetic import build_database, sample_surveys, write_database
+
+
+def without_none(requirement):
+    """Missing and None fields read the same (req.get); the snapshot does not store None text"""
+    return {key: value for key, value in dict(requirement).items() if value is not None}
+
+
+@pytest.fixture(params=["processed", "synthetic"])
+def database(request):
+    if request.param == "processed":
+        with open(DEFAULT_DB_PATH, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return build_database(600, seed=7)
+
+
+@pytest.fixture
+def snapshot(database, tmp_path):
+    path = str(tmp_path / "requirements.snapshot")
+    write_snapshot(database, path, "0123456789ab")
+    return BinarySnapshot(path)
+
+
+def test_requirements_round_trip(database, snapshot):
+    restored = snapshot.to_database()
+
+    for _, section in REQUIREMENT_SECTIONS:
+        original = database.get(section, [])
+        assert len(restored[section]) == len(original)
+        for before, after in zip(original, restored[section]):
+            assert without_none(after) == without_none(before)
+
+
+def test_database_parts_round_trip(database, snapshot):
+    restored = snapshot.to_database()
+    sections = {section for _, section in REQUIREMENT_SECTIONS}
+
+    assert snapshot.source_version == "0123456789ab"
+    assert {key: value for key, value in restored.items() if key not in sections} == \
+        {key: value for key, value in database.items() if key not in sections}
+
+
+def test_conditions_columns_match_the_json_index(database, snapshot):
+    json_index = RequirementsIndex(database)
+    snapshot_index = RequirementsIndex(snapshot.to_database(), snapshot.conditions)
+
+    for survey in sample_surveys(100, seed=7):
+        assert snapshot_index.match_ids(survey) == json_index.match_ids(survey)
+
+
+def test_loader_prefers_a_current_snapshot(tmp_path):
+    db_path = write_database(build_database(300, seed=11), str(tmp_path / "requirements.json"))
+    json_loader = DatabaseLoader(db_path)
+    json_loader.use_binary = False
+    snapshot_loader = DatabaseLoader(db_path)
+    for loader in (json_loader, snapshot_loader):
+        assert asyncio.run(loader.load_requirements_database()) is not None
+
+    from_json = json_loader.get_snapshot()
+    from_snapshot = snapshot_loader.get_snapshot()
+
+    assert from_snapshot.path == os.path.join(str(tmp_path), "requirements.snapshot")
+    assert from_snapshot.version == from_json.version
+    count = len(from_json.index.requirements)
+    assert [from_snapshot.payloads.fragment(position) for position in range(count)] == from_json.payloads.fragments
+    assert from_snapshot.search_index.doc_count == count
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "requirements.snapshot"
+    path.write_bytes(b'{"general_requirements": []}'.ljust(256, b' '))
+
+    with pytest.raises(ValueError):
+        BinarySnapshot(str(path))
+
+
+def test_snapshot_builds_requirement_structures_on_first_use(tmp_path):
+    db_path = write_database(build_database(300, seed=13), str(tmp_path / "requirements.json"))
+    json_loader = DatabaseLoader(db_path)
+    json_loader.use_binary = False
+    snapshot_loader = DatabaseLoader(db_path)
+    for loader in (json_loader, snapshot_loader):
+        assert asyncio.run(loader.load_requirements_database()) is not None
+
+    from_json = json_loader.get_snapshot()
+    from_snapshot = snapshot_loader.get_snapshot()
+    assert from_snapshot._search_index is None
+    assert set(from_snapshot.payloads.fragments) == set(from_snapshot.report_engine.fragments) == {None}
+
+    for survey in sample_surveys(20, seed=13):
+        reports = []
+        for snapshot in (from_json, from_snapshot):
+            positions = list(snapshot.index.iter_positions(snapshot.index.match(survey)))
+            requirements = [snapshot.payloads.requirement(position, "") for position in positions]
+            reports.append(snapshot.report_engine.render(survey, requirements))
+        assert reports[0] == reports[1]
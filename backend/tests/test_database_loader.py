@@ -0,0 +1,154 @@
+"""
+Database loader - corpus partitions by business type and database info
+"""
+
+import asyncio
+import json
+import os
+import pytest
+from app.services.database_loader import DatabaseLoader
+
+
+def _requirement(id, **fields):
+    return {
+        'id': id, 'name': f"name {id}", 'category': "רישוי", 'authority': "רשות הרישוי",
+        'description': "", 'timeline': "4 שבועות", 'estimated_cost': "500 ₪", 'priority': "גבוהה", **fields
+    }
+
+
+def _partition(prefix, general=1, sized=1):
+    return {
+        'document_analysis': {'regulatory_authorities': ["רשות הרישוי"]},
+        'general_requirements': [_requirement(f"{prefix}.general_{i:03d}") for i in range(general)],
+        'size_specific_requirements': [
+            _requirement(f"{prefix}.size_{i:03d}", conditions={'min_size_sqm': 100, 'max_size_sqm': None})
+            for i in range(sized)
+        ],
+        'capacity_specific_requirements': [],
+        'feature_specific_requirements': [],
+        'summary': {'total_requirements': general + sized}
+    }
+
+
+@pytest.fixture
+def corpus_loader(tmp_path):
+    db_path = tmp_path / "requirements.json"
+    db_path.write_text(json.dumps({
+        'default_business_type': "food",
+        'business_types': {
+            'bakery': {**_partition("bakery", general=2, sized=3), 'business_type_name': "מאפייה"},
+            'food': _partition("food"),
+        },
+        'authorities': [{'id': "authority_001", 'name': "רשות הרישוי", 'business_types': ["bakery", "food"], 'requirements_count': 7}],
+        'summary': {'business_types': 2, 'total_requirements': 7}
+    }, ensure_ascii=False), encoding='utf-8')
+
+    loader = DatabaseLoader(str(db_path))
+    assert asyncio.run(loader.load_requirements_database()) is not None
+    return loader
+
+
+def test_default_partition_is_published(corpus_loader):
+    snapshot = corpus_loader.get_snapshot()
+    assert snapshot.business_type == "food"
+    assert sorted(snapshot.partitions) == ["bakery", "food"]
+    assert snapshot.partition("bakery").partitions is snapshot.partitions
+    assert snapshot.partition("unknown") is None
+
+
+def test_partitions_have_their_own_index_and_names(corpus_loader):
+    bakery = corpus_loader.get_snapshot().partition("bakery")
+    assert len(bakery.index.requirements) == 5
+    assert all(req['id'].startswith("bakery.") for req in bakery.index.requirements)
+    assert bakery.report_engine.business_type == "מאפייה"
+    assert corpus_loader.get_snapshot().report_engine.business_type == "עסק מזון"
+
+
+def test_info_covers_every_partition(corpus_loader):
+    info = corpus_loader.get_requirements_info()
+    assert info['total_requirements'] == 7
+    assert info['categories']['general'] == 3
+    assert info['categories']['size_specific'] == 4
+    assert info['partitions']['bakery']['total_requirements'] == 5
+    assert info['partitions']['food']['total_requirements'] == 2
+    assert info['regulatory_authorities'] == ["רשות הרישוי"]
+
+
+def test_reload_reports_totals_per_partition(corpus_loader):
+    result = asyncio.run(corpus_loader.reload())
+    assert result['reloaded'] is False
+    assert result['total_requirements'] == 7
+    assert result['business_types'] == {'bakery': 5, 'food': 2}
+
+
+def _watch(loader, changes, polls=10, interval=0.01):
+    """Run the watch loop while applying each change, counting snapshot builds"""
+    builds = []
+    build_snapshot = loader._build_snapshot
+
+    def counting_build(path):
+        builds.append(path)
+        return build_snapshot(path)
+
+    loader._build_snapshot = counting_build
+
+    async def scenario():
+        watcher = asyncio.create_task(loader.watch(interval))
+        try:
+            for change in changes:
+                change()
+                await asyncio.sleep(interval * polls)
+        finally:
+            watcher.cancel()
+
+    asyncio.run(scenario())
+    return builds
+
+
+def _touch(path, mtime):
+    return lambda: os.utime(path, (mtime, mtime))
+
+
+def test_watch_rebuilds_a_touched_file_once(corpus_loader):
+    version = corpus_loader.get_snapshot().version
+    mtime = os.stat(corpus_loader.db_path).st_mtime
+
+    builds = _watch(corpus_loader, [_touch(corpus_loader.db_path, mtime + 10)])
+
+    assert len(builds) == 1
+    assert corpus_loader.get_snapshot().version == version
+
+
+def test_watch_reloads_changed_content(corpus_loader):
+    def change():
+        data = json.loads(open(corpus_loader.db_path, encoding='utf-8').read())
+        data['business_types']['food']['general_requirements'].append(_requirement("food.general_new"))
+        with open(corpus_loader.db_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        _touch(corpus_loader.db_path, os.stat(corpus_loader.db_path).st_mtime + 10)()
+
+    builds = _watch(corpus_loader, [change])
+
+    assert len(builds) == 1
+    assert corpus_loader.get_snapshot().total_requirements() == 8
+
+
+def test_watch_retries_a_broken_file_only_after_it_changes(corpus_loader):
+    version = corpus_loader.get_snapshot().version
+    mtime = os.stat(corpus_loader.db_path).st_mtime
+    content = open(corpus_loader.db_path, encoding='utf-8').read()
+
+    def break_file():
+        with open(corpus_loader.db_path, 'w', encoding='utf-8') as f:
+            f.write("{ not json")
+        _touch(corpus_loader.db_path, mtime + 10)()
+
+    def restore_file():
+        with open(corpus_loader.db_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        _touch(corpus_loader.db_path, mtime + 20)()
+
+    builds = _watch(corpus_loader, [break_file, restore_file])
+
+    assert len(builds) == 2
+    assert corpus_loader.get_snapshot().version == version
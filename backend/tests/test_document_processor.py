@@ -0,0 +1,166 @@
+"""
+Document processing - LLM response caching of extraction calls
+"""
+
+import json
+import os
+from types import SimpleNamespace
+import pytest
+import document_processor
+from document_processor import ComprehensiveDocumentProcessor
+from llm_cache import LLMResponseCache
+
+VALID_RESPONSE = '{"general_requirements": [{"id": "gen_001", "name": "רישיון עסק"}]}'
+
+
+class FakeMessages:
+    """Messages API stand-in returning queued (text, stop_reason) responses"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def create(self, **request):
+        self.prompts.append(request['messages'][0]['content'])
+        text, stop_reason = self.responses.pop(0)
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            stop_reason=stop_reason,
+            usage=SimpleNamespace(input_tokens=100, output_tokens=50)
+        )
+
+
+@pytest.fixture
+def processor(tmp_path, monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    processor = ComprehensiveDocumentProcessor()
+    processor.response_cache = LLMResponseCache(str(tmp_path / "llm"))
+    return processor
+
+
+def _respond(processor, *responses):
+    processor.client = SimpleNamespace(messages=FakeMessages(responses))
+    return processor.client.messages
+
+
+def test_complete_response_is_cached(processor):
+    messages = _respond(processor, (VALID_RESPONSE, "end_turn"))
+
+    assert processor._call_ai("prompt") == VALID_RESPONSE
+    assert processor._call_ai("prompt") == VALID_RESPONSE
+    assert len(messages.prompts) == 1
+    assert processor.usage_tracker['cache_hits'] == 1
+
+
+@pytest.mark.parametrize("text, stop_reason", [
+    (VALID_RESPONSE[:40], "max_tokens"),
+    (VALID_RESPONSE, "max_tokens"),
+    ("אין כאן JSON", "end_turn"),
+    ('{"general_requirements": [}', "end_turn"),
+])
+def test_incomplete_response_is_not_cached(processor, text, stop_reason):
+    messages = _respond(processor, (text, stop_reason), (VALID_RESPONSE, "end_turn"))
+
+    assert processor._call_ai("prompt") == text
+    assert processor._call_ai("prompt") == VALID_RESPONSE
+    assert processor._call_ai("prompt") == VALID_RESPONSE
+    assert len(messages.prompts) == 2
+
+
+def test_invalid_cached_entry_is_a_miss(processor):
+    key = processor.response_cache.make_key(
+        document_processor.AI_MODEL, document_processor.PROMPT_TEMPLATE_VERSION, 10000,
+        document_processor.EXTRACTION_SYSTEM_PROMPT + "\0" + "prompt"
+    )
+    processor.response_cache.put(key, document_processor.AI_MODEL, VALID_RESPONSE[:40], SimpleNamespace(input_tokens=1, output_tokens=1))
+    messages = _respond(processor, (VALID_RESPONSE, "end_turn"))
+
+    assert processor._call_ai("prompt") == VALID_RESPONSE
+    assert len(messages.prompts) == 1
+
+
+def test_chunk_prompt_does_not_depend_on_its_position(processor):
+    messages = _respond(processor, (VALID_RESPONSE, "end_turn"))
+
+    processor._process_chunk(0, "סעיף 1", total_chunks=3)
+    processor._process_chunk(4, "סעיף 1", total_chunks=8)
+
+    assert len(messages.prompts) == 1
+
+
+def _document(*sections):
+    return '\n'.join(f"=== SECTION_HEADER: {name}\n" + '\n'.join(lines) for name, lines in sections)
+
+
+def _extract(chunks):
+    """Stands in for the AI: 'req X' lines are requirements, 'info X' lines important information"""
+    results = []
+    for text in chunks:
+        lines = text.split('\n')
+        results.append({
+            'document_analysis': {'document_sections': [lines[0]], 'processing_notes': lines[0]},
+            'general_requirements': [{'name': line[4:], 'authority': 'עירייה'} for line in lines if line.startswith('req ')],
+            'important_information': [{'topic': line[5:]} for line in lines if line.startswith('info ')]
+        })
+    return results
+
+
+def _ids(data):
+    return {req['name']: req['id'] for req in data['general_requirements']}
+
+
+@pytest.fixture
+def chunked(processor, monkeypatch):
+    processor.chunk_max_chars = 60
+    chunks = []
+    monkeypatch.setattr(processor, '_run_chunks', lambda texts: chunks.extend(texts) or _extract(texts))
+    return processor, chunks
+
+
+def test_requirements_keep_their_ids_across_incremental_runs(chunked):
+    processor, chunks = chunked
+    first = processor._process_in_chunks(_document(('א', ['req 1']), ('ב', ['req 2', 'req 3']), ('ג', ['req 4'])))
+    chunks.clear()
+
+    second = processor._process_incrementally(
+        _document(('א', ['req 1']), ('ב', ['req 2', 'req 3', 'req 5']), ('ג', ['req 4'])), first
+    )
+
+    assert len(chunks) == 1
+    assert _ids(second) == {**_ids(first), '5': 'general_005'}
+
+
+def test_removed_requirement_numbers_are_not_reused(chunked):
+    processor, _ = chunked
+    first = processor._process_in_chunks(_document(('א', ['req 1']), ('ב', ['req 2']), ('ג', ['req 3'])))
+    second = processor._process_incrementally(_document(('א', ['req 1']), ('ב', ['req 2'])), first)
+    third = processor._process_incrementally(_document(('א', ['req 1']), ('ב', ['req 2']), ('ד', ['req 4'])), second)
+
+    assert _ids(second) == {'1': 'general_001', '2': 'general_002'}
+    assert _ids(third) == {'1': 'general_001', '2': 'general_002', '4': 'general_004'}
+
+
+def test_incremental_runs_rebuild_notes_and_information(chunked):
+    processor, _ = chunked
+    first = processor._process_in_chunks(_document(('א', ['info אש']), ('ב', ['info מים'])))
+    second = processor._process_incrementally(_document(('א', ['info אש']), ('ב', ['info מים', 'req 1'])), first)
+    third = processor._process_incrementally(_document(('א', ['info אש'])), second)
+
+    for data in (first, second):
+        assert sorted(data['document_analysis']['processing_notes'].split(' | ')) == \
+            ["=== SECTION_HEADER: א", "=== SECTION_HEADER: ב"]
+        assert [info['topic'] for info in data['important_information']] == ['אש', 'מים']
+    assert third['document_analysis']['processing_notes'] == "=== SECTION_HEADER: א"
+    assert third['document_analysis']['document_sections'] == ["=== SECTION_HEADER: א"]
+    assert [info['topic'] for info in third['important_information']] == ['אש']
+
+
+def test_snapshot_is_not_written_for_invalid_requirements(processor, tmp_path):
+    data = {'general_requirements': [{'id': 'gen_001', 'name': ['רישיון', 'עסק']}]}
+    output_path = str(tmp_path / "requirements.json")
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+
+    with pytest.raises(ValueError):
+        processor._save_binary_snapshot(data, output_path)
+    assert not os.path.exists(str(tmp_path / "requirements.snapshot"))
@@ -0,0 +1,78 @@
+"""
+Cost and timeline parsers and the totals built from them
+"""
+
+import pytest
+from app.utils.estimates import parse_cost, parse_timeline, total_cost, critical_path, format_total_cost
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("323 ₪ אגרת השגה במקרה של השגה", (323, 323, 'high')),
+    ("500-800 ש\"ח", (500, 800, 'high')),
+    ("₪ 500 עד 800", (500, 800, 'high')),
+    ("בין 2,000 ל-5,000 ₪", (2000, 5000, 'high')),
+    ("1,200 שקלים לשנה", (1200, 1200, 'high')),
+    ("5 אלף ₪", (5000, 5000, 'high')),
+    ("כ-500 ₪", (500, 500, 'medium')),
+    ("12,500 ₪ (אומדן)", (12500, 12500, 'high')),
+    ("ללא עלות", (0, 0, 'high')),
+    ("חינם", (0, 0, 'high')),
+])
+def test_parse_cost(text, expected):
+    cost = parse_cost(text)
+    assert (cost['min_ils'], cost['max_ils'], cost['confidence']) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "אגרה לפי סעיף 12 בתקנות",
+    "לפי תקנה 5(א) לתקנות רישוי עסקים",
+    "עלות שני שלטים",
+    "תשלום לפי פרק 3 בתוספת",
+    "עלות שלטים",
+])
+def test_numbers_without_currency_are_not_costs(text):
+    assert parse_cost(text) == {'min_ils': None, 'max_ils': None, 'confidence': 'low'}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("אגרה לפי סעיף 12 בתקנות: 323 ₪", (323, 323)),
+    ("תקנה 3, 1,200 ש\"ח לשנה", (1200, 1200)),
+    ("2 שלטים, 300 ₪ לשלט", (300, 300)),
+])
+def test_clause_numbers_next_to_a_price_are_ignored(text, expected):
+    cost = parse_cost(text)
+    assert (cost['min_ils'], cost['max_ils']) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "  ", "לא מוגדר"])
+def test_undefined_cost(text):
+    assert parse_cost(text) is None
+
+
+def test_clause_numbers_stay_out_of_totals():
+    total = total_cost([parse_cost("323 ₪"), parse_cost("אגרה לפי סעיף 12 בתקנות")])
+    assert (total['min_ils'], total['max_ils'], total['unknown']) == (323, 323, 1)
+    assert format_total_cost(total) == "323 ₪ (אומדן)"
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("4-6 שבועות", (28, 42, 'high')),
+    ("כחודש", (30, 30, 'medium')),
+    ("עד 30 ימים", (0, 30, 'high')),
+    ("שבועיים", (14, 14, 'high')),
+    ("מיידי", (0, 0, 'high')),
+    ("שלושה חודשים מראש", (90, 90, 'low')),
+])
+def test_parse_timeline(text, expected):
+    timeline = parse_timeline(text)
+    assert (timeline['min_days'], timeline['max_days'], timeline['confidence']) == expected
+
+
+def test_critical_path_runs_authorities_in_parallel():
+    path = critical_path([
+        ("כבאות", parse_timeline("4 שבועות")),
+        ("כבאות", parse_timeline("2 שבועות")),
+        ("משרד הבריאות", parse_timeline("5 שבועות")),
+        ("משטרה", parse_timeline("לא ידוע")),
+    ])
+    assert (path['authority'], path['max_days'], path['unknown']) == ("כבאות", 42, 1)
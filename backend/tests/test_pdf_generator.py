@@ -0,0 +1,44 @@
+"""
+PDF report rendering - user-supplied report text cannot pull server files into the PDF
+"""
+
+import os
+import pytest
+from app.services.pdf_generator import REPORT_FONTS_DIR, font_face_rules, is_bundled_font, report_markdown, report_url_fetcher
+
+
+def test_raw_html_in_report_text_is_escaped():
+    html = report_markdown().convert(
+        '# דוח - <a rel="attachment" href="file:///etc/passwd">x</a>\n\n<div>\n<img src="file:///etc/passwd">\n</div>'
+    )
+
+    assert '<a ' not in html
+    assert '<img' not in html
+    assert '&lt;a rel="attachment"' in html
+
+
+def test_markdown_formatting_still_renders():
+    html = report_markdown().convert("**חשוב**\n\n| א | ב |\n|---|---|\n| 1 | 2 |")
+
+    assert '<strong>חשוב</strong>' in html
+    assert '<table>' in html
+
+
+def test_bundled_fonts_are_the_only_allowed_resources():
+    font_urls = [rule.split("url('")[1].split("')")[0] for rule in font_face_rules().splitlines()]
+
+    assert font_urls and all(is_bundled_font(url) for url in font_urls)
+    for url in (
+        "file:///etc/passwd",
+        f"file://{os.path.join(REPORT_FONTS_DIR, '..', '..', 'app', 'main.py')}",
+        f"file://{os.path.join(REPORT_FONTS_DIR, 'README.md', '..', '..', 'fonts.txt')}",
+        "file://remote-host/share/font.ttf",
+        "http://169.254.169.254/latest/meta-data/",
+        "data:text/plain,x",
+    ):
+        assert not is_bundled_font(url)
+
+
+def test_fetcher_refuses_other_files():
+    with pytest.raises(ValueError):
+        report_url_fetcher("file:///etc/passwd")
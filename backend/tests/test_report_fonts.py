@@ -0,0 +1,26 @@
+"""
+Bundled report fonts - @font-face rules for PDF rendering
+"""
+
+import os
+from fontTools.ttLib import TTFont
+from app.services.pdf_generator import REPORT_FONTS_DIR, REPORT_FONT_FAMILY, font_face_rules
+
+
+def test_bundled_fonts_have_regular_and_bold_faces():
+    rules = font_face_rules().splitlines()
+
+    assert len(rules) == 2
+    assert all(f"font-family: '{REPORT_FONT_FAMILY}'" in rule for rule in rules)
+    assert sorted(rule.split("font-weight: ")[1] for rule in rules) == ["bold; }", "normal; }"]
+
+
+def test_bundled_fonts_cover_hebrew_and_shekel_sign():
+    for name in ("Heebo-Regular.ttf", "Heebo-Bold.ttf"):
+        cmap = TTFont(os.path.join(REPORT_FONTS_DIR, name)).getBestCmap()
+        assert all(code in cmap for code in range(ord('א'), ord('ת') + 1))
+        assert ord('₪') in cmap
+
+
+def test_missing_fonts_directory_has_no_rules(tmp_path):
+    assert font_face_rules(str(tmp_path)) == ""
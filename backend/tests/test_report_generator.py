@@ -0,0 +1,53 @@
+"""
+Report generation - AI prompts shared by every survey of a profile class
+"""
+
+import pytest
+from app.models import SurveyRequest
+from app.services.report_generator import ReportGenerator
+from app.services.requirements_index import RequirementsIndex
+from app.services.requirements_matcher import RequirementsMatcher
+
+DATABASE = {
+    'general_requirements': [{'id': 'general', 'name': 'רישיון עסק'}],
+    'size_specific_requirements': [
+        {'id': 'small', 'name': 'מטף', 'conditions': {'max_size_sqm': 50.5}},
+        {'id': 'medium', 'name': 'ספרינקלרים', 'conditions': {'min_size_sqm': 50.5, 'max_size_sqm': 200}},
+    ],
+    'capacity_specific_requirements': [
+        {'id': 'crowd', 'name': 'יציאת חירום', 'conditions': {'min_capacity': 20}},
+    ],
+    'feature_specific_requirements': [],
+}
+
+
+def _survey(size, max_people):
+    return SurveyRequest(size=size, max_people=max_people, uses_gas=False, has_delivery=True, serves_meat=False)
+
+
+@pytest.mark.parametrize("catalog", [None, "catalog"])
+def test_surveys_of_one_profile_class_get_the_same_prompt(catalog):
+    index = RequirementsIndex(DATABASE)
+    matcher = RequirementsMatcher(DATABASE, index)
+
+    requests = []
+    for survey in (_survey(60, 25), _survey(180.5, 400)):
+        key = index.profile_key(survey)
+        generator = ReportGenerator(catalog=catalog, profile_bounds=index.profile_bounds(key))
+        requests.append(generator._build_ai_request(survey, matcher.requirements_for_mask(index.match_profile(key), survey)))
+
+    prompt = requests[0]['messages'][0]['content']
+    assert requests[0] == requests[1]
+    assert 'מעל 50.5 ועד 200 מ"ר' in prompt
+    assert 'מ-20 מקומות ישיבה' in prompt
+    assert 'חל על עסקים עם תפוסה של מ-20 אנשים' in prompt
+    assert '60' not in prompt and '25' not in prompt
+
+
+def test_prompt_without_profile_bounds_names_the_survey():
+    survey = _survey(60, 25)
+    matcher = RequirementsMatcher(DATABASE)
+    prompt = ReportGenerator()._build_ai_prompt(survey, matcher.filter_requirements_for_business(survey))
+
+    assert '60.0 מ"ר' in prompt
+    assert 'חל על עסקים עם תפוסה של 25 אנשים' in prompt
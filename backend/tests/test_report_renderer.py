@@ -0,0 +1,66 @@
+"""
+Report renderer - shared renders of the same document and caller cancellation
+"""
+
+import asyncio
+from app.services.report_renderer import ReportRenderer
+
+
+class SlowRender:
+    """Stands in for the worker pool: counts renders and waits until released"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, document_format, markdown_text, generated_at):
+        self.calls += 1
+        await self.release.wait()
+        return f"{document_format}:{markdown_text}".encode('utf-8')
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_cancelled_caller_does_not_fail_other_waiters():
+    async def scenario():
+        renderer = ReportRenderer()
+        renderer._render_in_pool = render = SlowRender()
+        first = asyncio.ensure_future(renderer.render("pdf", "# דוח", "01/01/2026 10:00"))
+        second = asyncio.ensure_future(renderer.render("pdf", "# דוח", "01/01/2026 10:00"))
+        await settle()
+        first.cancel()
+        await settle()
+        render.release.set()
+        content, _ = await second
+        cached, _ = await renderer.render("pdf", "# דוח", "01/01/2026 10:00")
+        return renderer, render, first, content, cached
+
+    renderer, render, first, content, cached = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert content == cached == "pdf:# דוח".encode('utf-8')
+    assert render.calls == 1
+    assert renderer.stats['coalesced'] == 1
+    assert renderer.stats['cache_hits'] == 1
+    assert renderer.get_stats()['in_flight'] == 0
+
+
+def test_render_finishes_and_is_cached_when_every_caller_leaves():
+    async def scenario():
+        renderer = ReportRenderer()
+        renderer._render_in_pool = render = SlowRender()
+        caller = asyncio.ensure_future(renderer.render("docx", "# דוח", "01/01/2026 10:00"))
+        await settle()
+        caller.cancel()
+        render.release.set()
+        await settle()
+        return renderer, render, await renderer.render("docx", "# דוח", "01/01/2026 10:00")
+
+    renderer, render, (content, _) = asyncio.run(scenario())
+
+    assert content == "docx:# דוח".encode('utf-8')
+    assert render.calls == 1
+    assert renderer.stats['cache_hits'] == 1
@@ -0,0 +1,93 @@
+"""
+Report store - generated reports shared between server processes
+"""
+
+import asyncio
+import sqlite3
+import time
+import pytest
+from app.api import survey
+from app.models import SurveyRequest
+from app.services.report_store import ReportStore, report_id
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "reports.sqlite3")
+
+
+def test_report_saved_by_one_process_is_found_by_another(db_path):
+    writer = ReportStore(db_path)
+    reader = ReportStore(db_path)
+    try:
+        key = writer.put("מאפיית הגליל", "# דוח\nתוכן")
+        report = reader.get(key)
+    finally:
+        writer.close()
+        reader.close()
+
+    assert report['business_name'] == "מאפיית הגליל"
+    assert report['personalized_report'] == "# דוח\nתוכן"
+
+
+def test_report_id_is_a_content_hash(db_path):
+    store = ReportStore(db_path)
+    first = store.put("עסק", "דוח")
+    created_at = store.get(first)['created_at']
+    second = store.put("עסק", "דוח")
+
+    assert first == second == report_id("עסק", "דוח")
+    assert store.get(second)['created_at'] == created_at
+    assert store.put("עסק אחר", "דוח") != first
+    assert store.get_stats()['size'] == 2
+    store.close()
+
+
+def test_report_without_business_name(db_path):
+    store = ReportStore(db_path)
+    key = store.put(None, "דוח")
+
+    assert store.get(key)['business_name'] is None
+    assert key == report_id(None, "דוח")
+    store.close()
+
+
+def test_unknown_and_expired_reports_are_missing(db_path):
+    store = ReportStore(db_path, ttl_seconds=0.05)
+    key = store.put("עסק", "דוח")
+    time.sleep(0.1)
+
+    assert store.get(key) is None
+    assert store.get("0" * 32) is None
+    assert store.get_stats()['misses'] == 2
+    store.close()
+
+
+def test_store_keeps_at_most_max_entries(db_path):
+    store = ReportStore(db_path, max_entries=3, trim_interval_seconds=0)
+    keys = [store.put("עסק", f"דוח {n}") for n in range(5)]
+
+    assert [store.get(key) is not None for key in keys] == [False, False, True, True, True]
+    store.close()
+
+
+def test_store_is_trimmed_at_most_once_per_interval(db_path):
+    store = ReportStore(db_path, max_entries=2, trim_interval_seconds=0.1)
+    keys = [store.put("עסק", f"דוח {n}") for n in range(4)]
+    untrimmed = all(store.get(key) is not None for key in keys)
+    time.sleep(0.15)
+    store.put("עסק", "דוח 4")
+
+    assert untrimmed
+    assert store.get_stats()['size'] == 2
+    store.close()
+
+
+def test_report_is_returned_when_the_store_fails(monkeypatch):
+    class FailingStore:
+        def put(self, business_name, personalized_report):
+            raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(survey, "_report_store", FailingStore())
+
+    assert asyncio.run(survey._save_report(SurveyRequest(size=50, max_people=20, uses_gas=False, has_delivery=False, serves_meat=False), "דוח")) is None
@@ -0,0 +1,165 @@
+"""
+Compiled requirements index - matches agree with a linear scan of the requirement conditions
+"""
+
+import orjson
+import pytest
+from app.models import SurveyRequest
+from app.services.requirements_index import RequirementsIndex
+from app.services.requirements_matcher import RequirementsMatcher
+from benchmarks.synthetic import build_database, sample_surveys
+
+
+def linear_match(db, survey):
+    """Reference matcher: checks every requirement's conditions in database order"""
+    features = [
+        name for flag, name in (
+            (survey.uses_gas, "שימוש בגז"), (survey.has_delivery, "משלוחים"), (survey.serves_meat, "הגשת בשר")
+        ) if flag
+    ]
+    reasons = {
+        'general': 'חובה על כל העסקים',
+        'size': f'חל על עסקים בגודל {survey.size} מ"ר',
+        'capacity': f'חל על עסקים עם תפוסה של {survey.max_people} אנשים',
+        'feature': f'רלוונטי למאפיינים: {", ".join(features)}' if features else 'רלוונטי למאפיינים מיוחדים'
+    }
+
+    def in_range(value, low, high):
+        return (low is None or value >= low) and (high is None or value <= high)
+
+    def relevant(section, conditions):
+        if section == 'size':
+            return in_range(survey.size, conditions.get('min_size_sqm'), conditions.get('max_size_sqm'))
+        if section == 'capacity':
+            return in_range(survey.max_people, conditions.get('min_capacity'), conditions.get('max_capacity'))
+        if section == 'feature':
+            return all(
+                conditions.get(key) is None or conditions.get(key) == flag
+                for key, flag in (
+                    ('requires_gas', survey.uses_gas),
+                    ('has_delivery', survey.has_delivery),
+                    ('serves_meat', survey.serves_meat)
+                )
+            )
+        return True
+
+    matched = []
+    for section, key in (
+        ('general', 'general_requirements'), ('size', 'size_specific_requirements'),
+        ('capacity', 'capacity_specific_requirements'), ('feature', 'feature_specific_requirements')
+    ):
+        for req in db.get(key, []):
+            if relevant(section, req.get('conditions') or {}):
+                matched.append({
+                    'id': req.get('id', 'unknown'),
+                    'name': req.get('name', 'unknown'),
+                    'category': req.get('category', 'unknown'),
+                    'authority': req.get('authority', 'unknown'),
+                    'description': req.get('description', ''),
+                    'timeline': req.get('timeline'),
+                    'estimated_cost': req.get('estimated_cost'),
+                    'priority': req.get('priority', 'medium'),
+                    'source_location': req.get('source_location'),
+                    'why_relevant': reasons[section]
+                })
+    return matched
+
+
+def boundary_surveys(db):
+    """Surveys on, just below and just above every size and capacity bound"""
+    sizes = set()
+    capacities = set()
+    for req in db['size_specific_requirements']:
+        for key in ('min_size_sqm', 'max_size_sqm'):
+            if req['conditions'].get(key) is not None:
+                sizes.update(req['conditions'][key] + delta for delta in (-0.5, 0, 0.5))
+    for req in db['capacity_specific_requirements']:
+        for key in ('min_capacity', 'max_capacity'):
+            if req['conditions'].get(key) is not None:
+                capacities.update(req['conditions'][key] + delta for delta in (-1, 0, 1))
+
+    sizes = sorted(size for size in sizes if 10 <= size <= 10000)
+    capacities = sorted(capacity for capacity in capacities if 1 <= capacity <= 1000)
+    return [
+        SurveyRequest(
+            size=size, max_people=capacities[i % len(capacities)],
+            uses_gas=bool(i & 1), has_delivery=bool(i & 2), serves_meat=bool(i & 4)
+        )
+        for i, size in enumerate(sizes)
+    ]
+
+
+@pytest.fixture(scope="module")
+def database():
+    return build_database(1000, seed=5)
+
+
+@pytest.fixture(scope="module")
+def matcher(database):
+    return RequirementsMatcher(database)
+
+
+def test_index_matches_linear_scan(database, matcher):
+    for survey in sample_surveys(200, seed=5) + boundary_surveys(database):
+        expected = linear_match(database, survey)
+
+        assert orjson.loads(matcher.requirements_json(matcher.index.match(survey), survey)) == expected
+        assert [(req.id, req.why_relevant) for req in matcher.filter_requirements_for_business(survey)] == \
+            [(req['id'], req['why_relevant']) for req in expected]
+
+
+def test_surveys_with_the_same_profile_key_match_the_same_requirements(database, matcher):
+    surveys = sample_surveys(300, seed=9)
+    by_profile = {}
+    for survey in surveys:
+        by_profile.setdefault(matcher.index.profile_key(survey), []).append(survey)
+
+    assert len(by_profile) < len(surveys)
+    for profile_surveys in by_profile.values():
+        expected = [req['id'] for req in linear_match(database, profile_surveys[0])]
+        for survey in profile_surveys[1:]:
+            assert [req['id'] for req in linear_match(database, survey)] == expected
+
+
+@pytest.mark.parametrize("size, max_people, gas, ids", [
+    (10, 1, False, ['general', 'small', 'any_size', 'no_gas']),
+    (50.5, 20, True, ['general', 'small', 'medium', 'any_size', 'crowd', 'gas']),
+    (50.6, 21, True, ['general', 'medium', 'any_size', 'crowd', 'gas']),
+    (200, 1000, False, ['general', 'medium', 'any_size', 'crowd', 'no_gas']),
+    (200.1, 1000, False, ['general', 'any_size', 'crowd', 'no_gas']),
+])
+def test_inclusive_float_bounds_and_open_conditions(size, max_people, gas, ids):
+    db = {
+        'general_requirements': [{'id': 'general'}],
+        'size_specific_requirements': [
+            {'id': 'small', 'conditions': {'max_size_sqm': 50.5}},
+            {'id': 'medium', 'conditions': {'min_size_sqm': 50.5, 'max_size_sqm': 200}},
+            {'id': 'any_size'},
+        ],
+        'capacity_specific_requirements': [
+            {'id': 'crowd', 'conditions': {'min_capacity': 20, 'max_capacity': None}},
+        ],
+        'feature_specific_requirements': [
+            {'id': 'gas', 'conditions': {'requires_gas': True}},
+            {'id': 'no_gas', 'conditions': {'requires_gas': False, 'has_delivery': None}},
+        ],
+    }
+    survey = SurveyRequest(size=size, max_people=max_people, uses_gas=gas, has_delivery=True, serves_meat=False)
+
+    assert RequirementsIndex(db).match_ids(survey) == ids
+    assert [req['id'] for req in linear_match(db, survey)] == ids
+
+
+def test_profile_bounds_contain_every_survey_of_the_profile(database, matcher):
+    def within(value, bounds):
+        lower, upper = bounds
+        return (
+            (lower is None or (value >= lower[0] if lower[1] else value > lower[0])) and
+            (upper is None or (value <= upper[0] if upper[1] else value < upper[0]))
+        )
+
+    index = matcher.index
+    for survey in sample_surveys(200, seed=3) + boundary_surveys(database):
+        bounds = index.profile_bounds(index.profile_key(survey))
+        assert within(survey.size, bounds['size'])
+        assert within(survey.max_people, bounds['capacity'])
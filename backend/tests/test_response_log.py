@@ -0,0 +1,100 @@
+"""
+Survey response log - per-process files, rotation and retry of failed writes
+"""
+
+import asyncio
+import glob
+import os
+from app.services.analytics_store import AnalyticsStore
+from app.services.response_log import SurveyResponseLog
+
+
+def _record(n):
+    return {
+        'timestamp': f"2025-01-01T09:00:{n:02d}",
+        'kind': 'survey',
+        'survey_data': {'size': 100.0 + n, 'max_people': 20, 'uses_gas': False, 'has_delivery': False, 'serves_meat': False},
+        'requirement_ids': ["general_001"]
+    }
+
+
+def _lines(log_dir):
+    lines = []
+    for path in glob.glob(os.path.join(log_dir, "responses*.jsonl")):
+        with open(path, 'r', encoding='utf-8') as f:
+            lines.extend(f.read().splitlines())
+    return lines
+
+
+async def _until(condition, timeout=5):
+    async def poll():
+        while not condition():
+            await asyncio.sleep(0.005)
+    await asyncio.wait_for(poll(), timeout)
+
+
+def _write(log, records):
+    """Writes each record in its own flush"""
+    async def scenario():
+        log.start()
+        for n, record in enumerate(records, 1):
+            log.record(record)
+            await _until(lambda: log.stats['records_written'] == n)
+        await log.stop()
+
+    asyncio.run(scenario())
+
+
+def test_each_process_writes_and_rotates_its_own_file(tmp_path):
+    log_dir = str(tmp_path / "responses")
+    log = SurveyResponseLog(log_dir, max_batch=1, max_file_bytes=1)
+    _write(log, [_record(n) for n in range(3)])
+
+    names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(log_dir, "*")))
+    assert log.path == os.path.join(log_dir, f"responses-{os.getpid()}.jsonl")
+    assert f"responses-{os.getpid()}.jsonl" in names
+    assert all(name.startswith(f"responses-{os.getpid()}") for name in names)
+    assert log.stats['rotations'] == 2
+
+    store = AnalyticsStore(str(tmp_path / "analytics.sqlite3"))
+    try:
+        assert store.import_directory(log_dir)['added'] == 3
+    finally:
+        store.close()
+
+
+def test_failed_write_keeps_the_batch_for_the_next_flush(tmp_path):
+    # A file where the log directory should be makes every write fail
+    log_dir = tmp_path / "responses"
+    log_dir.write_text("")
+    log = SurveyResponseLog(str(log_dir), flush_interval=0.01)
+
+    async def scenario():
+        log.start()
+        for n in range(3):
+            log.record(_record(n))
+        await _until(lambda: log.stats['write_errors'])
+        log_dir.unlink()
+        log.record(_record(3))
+        await log.stop()
+
+    asyncio.run(scenario())
+
+    assert log.stats['records_written'] == 4
+    assert log.stats['records_dropped'] == 0
+    assert len(_lines(str(log_dir))) == 4
+
+
+def test_failed_rotation_still_writes_the_batch(tmp_path, monkeypatch):
+    def no_replace(src, dst):
+        raise PermissionError("file in use")
+
+    log_dir = str(tmp_path / "responses")
+    _write(SurveyResponseLog(log_dir, max_batch=1), [_record(0)])
+    monkeypatch.setattr(os, "replace", no_replace)
+    log = SurveyResponseLog(log_dir, max_batch=1, max_file_bytes=1)
+    _write(log, [_record(1)])
+
+    assert log.stats['rotations'] == 0
+    assert log.stats['write_errors'] == 0
+    assert len(_lines(log_dir)) == 2
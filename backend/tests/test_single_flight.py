@@ -0,0 +1,178 @@
+"""
+Single-flight execution - shared results, errors and cancellation of coalesced calls
+"""
+
+import asyncio
+import pytest
+from app.services.single_flight import SingleFlight
+
+
+class Upstream:
+    """Work function that counts its calls and waits until released"""
+
+    def __init__(self, result="report", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result
+
+
+class UpstreamStream:
+    """Stream function that yields each chunk once released, then optionally fails"""
+
+    def __init__(self, chunks, error=None):
+        self.chunks = chunks
+        self.error = error
+        self.calls = 0
+        self.closed = False
+        self.step = asyncio.Semaphore(0)
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            for chunk in self.chunks:
+                await self.step.acquire()
+                yield chunk
+            if self.error:
+                raise self.error
+        finally:
+            self.closed = True
+
+    def advance(self, count=1):
+        for _ in range(count):
+            self.step.release()
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def test_concurrent_calls_share_one_result():
+    async def scenario():
+        flight = SingleFlight()
+        work = Upstream()
+        waiters = [asyncio.ensure_future(flight.run("key", work)) for _ in range(3)]
+        await settle()
+        work.release.set()
+        return flight, work, await asyncio.gather(*waiters)
+
+    flight, work, results = asyncio.run(scenario())
+
+    assert results == ["report"] * 3
+    assert work.calls == 1
+    assert flight.stats == {'calls': 1, 'coalesced': 2}
+    assert not flight.is_in_flight("key")
+
+
+def test_error_reaches_every_waiter_and_is_not_kept():
+    async def scenario():
+        flight = SingleFlight()
+        failing = Upstream(error=RuntimeError("overloaded"))
+        waiters = [asyncio.ensure_future(flight.run("key", failing)) for _ in range(2)]
+        await settle()
+        failing.release.set()
+        errors = await asyncio.gather(*waiters, return_exceptions=True)
+
+        retry = Upstream(result="retried")
+        retry.release.set()
+        return errors, await flight.run("key", retry)
+
+    errors, retried = asyncio.run(scenario())
+
+    assert [str(error) for error in errors] == ["overloaded", "overloaded"]
+    assert retried == "retried"
+
+
+def test_cancelled_caller_does_not_cancel_other_waiters():
+    async def scenario():
+        flight = SingleFlight()
+        work = Upstream()
+        first = asyncio.ensure_future(flight.run("key", work))
+        second = asyncio.ensure_future(flight.run("key", work))
+        await settle()
+        first.cancel()
+        await settle()
+        work.release.set()
+        return first, await second
+
+    first, result = asyncio.run(scenario())
+
+    assert first.cancelled()
+    assert result == "report"
+
+
+def test_late_subscriber_receives_the_whole_stream():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = UpstreamStream(["a", "b", "c"])
+        first = asyncio.ensure_future(collect(flight.stream("key", upstream)))
+        upstream.advance(2)
+        await settle()
+        second = asyncio.ensure_future(collect(flight.stream("key", upstream)))
+        await settle()
+        upstream.advance()
+        return flight, upstream, await first, await second
+
+    flight, upstream, first, second = asyncio.run(scenario())
+
+    assert first == second == ["a", "b", "c"]
+    assert upstream.calls == 1
+    assert flight.stats == {'calls': 1, 'coalesced': 1}
+    assert not flight.is_in_flight("key")
+
+
+def test_stream_error_reaches_every_subscriber_after_its_chunks():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = UpstreamStream(["a"], error=RuntimeError("stream dropped"))
+        received = [[], []]
+
+        async def subscribe(chunks):
+            async for chunk in flight.stream("key", upstream):
+                chunks.append(chunk)
+
+        subscribers = [asyncio.ensure_future(subscribe(chunks)) for chunks in received]
+        await settle()
+        upstream.advance()
+        return received, await asyncio.gather(*subscribers, return_exceptions=True)
+
+    received, errors = asyncio.run(scenario())
+
+    assert received == [["a"], ["a"]]
+    assert [str(error) for error in errors] == ["stream dropped", "stream dropped"]
+
+
+def test_upstream_stream_is_cancelled_when_its_last_subscriber_leaves():
+    async def scenario():
+        flight = SingleFlight()
+        upstream = UpstreamStream(["a", "b", "c"])
+        subscribers = [asyncio.ensure_future(collect(flight.stream("key", upstream))) for _ in range(2)]
+        upstream.advance()
+        await settle()
+
+        subscribers[0].cancel()
+        await settle()
+        still_open = not upstream.closed
+
+        subscribers[1].cancel()
+        await settle()
+        return flight, upstream, still_open
+
+    flight, upstream, still_open = asyncio.run(scenario())
+
+    assert still_open
+    assert upstream.closed
+    assert not flight.is_in_flight("key")
+    assert flight.get_stats()['in_flight'] == 0
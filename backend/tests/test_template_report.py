@@ -0,0 +1,136 @@
+"""
+Template report engine - sectioned reports rendered from pre-built requirement fragments
+"""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from fastapi import HTTPException
+from app.api import survey as survey_api
+from app.models import SurveyRequest, RequirementResponse
+from app.services.template_report import TemplateReportEngine, PHASE_TITLES, requirement_phase
+
+REQUIREMENTS = [
+    {'id': 'gen_001', 'name': 'רישיון עסק', 'authority': 'הרשות המקומית', 'priority': 'גבוהה',
+     'timeline': '30 ימים', 'estimated_cost': '500 ש"ח', 'description': 'רישיון עסק כללי'},
+    {'id': 'gen_002', 'name': 'שילוט', 'authority': 'הרשות המקומית', 'priority': 'נמוכה'},
+    {'id': 'size_001', 'name': 'מטף כיבוי', 'authority': 'כבאות והצלה', 'priority': 'high',
+     'estimated_cost': 'לא מוגדר'},
+    {'id': 'size_002', 'name': 'ספרינקלרים', 'authority': 'כבאות והצלה', 'priority': 'גבוהה'},
+    {'id': 'feature_001', 'name': 'אישור תברואה', 'authority': 'משרד הבריאות'},
+]
+CATEGORIES = ['general', 'general', 'size', 'size', 'feature']
+
+
+@pytest.fixture(params=[False, True], ids=["eager", "lazy"])
+def engine(request):
+    return TemplateReportEngine(REQUIREMENTS, CATEGORIES, 'מסעדה', lazy=request.param)
+
+
+def _survey(**fields):
+    return SurveyRequest(size=80, max_people=40, uses_gas=True, has_delivery=False, serves_meat=True, **fields)
+
+
+def _section(report, number):
+    return report[report.index(f'\n### {number}. '):report.index(f'\n### {number + 1}. ')]
+
+
+def _responses(ids):
+    by_id = {req['id']: (req, category) for req, category in zip(REQUIREMENTS, CATEGORIES)}
+    return [
+        RequirementResponse(
+            id=req['id'], name=req['name'], category=category, authority=req['authority'],
+            description=req.get('description', ''), timeline=req.get('timeline'),
+            estimated_cost=req.get('estimated_cost'), priority=req.get('priority', 'medium'),
+            why_relevant=f"סיבה {req['id']}"
+        )
+        for req, category in (by_id[key] for key in ids)
+    ]
+
+
+@pytest.mark.parametrize("category, priority, phase", [
+    ('general', 'גבוהה', 1),
+    ('general', 'high', 1),
+    ('size', 'גבוהה', 2),
+    ('feature', ' high ', 2),
+    ('general', 'בינונית', 3),
+    ('size', 'low', 3),
+    ('general', None, 3),
+    ('size', 'דחוף', 3),
+])
+def test_requirement_phase(category, priority, phase):
+    assert requirement_phase(category, priority) == phase
+
+
+def test_report_has_every_section_in_order(engine):
+    report = engine.render(_survey(business_name="מסעדת הים", location="חיפה"), _responses(['gen_001', 'size_001']))
+
+    headings = ['# 📋 דוח רישוי עסקים - מסעדת הים'] + [f'\n### {number}. ' for number in range(1, 7)]
+    positions = [report.index(heading) for heading in headings]
+    assert positions == sorted(positions)
+    assert '- **סוג עסק**: מסעדה' in report
+    assert '- **מיקום**: חיפה' in report
+    assert '**סך הכל רישיונות ואישורים נדרשים**: 2' in report
+
+
+def test_requirements_are_grouped_into_phases_by_priority_and_authority(engine):
+    report = engine.render(_survey(), _responses(['gen_001', 'gen_002', 'size_001', 'size_002', 'feature_001']))
+    timeline = _section(report, 3)
+
+    assert timeline.index(PHASE_TITLES[1]) < timeline.index(PHASE_TITLES[2]) < timeline.index(PHASE_TITLES[3])
+    assert '- הרשות המקומית: רישיון עסק\n' in timeline
+    assert '- כבאות והצלה: מטף כיבוי, ספרינקלרים\n' in timeline
+    assert '- הרשות המקומית: שילוט\n' in timeline
+    assert '- משרד הבריאות: אישור תברואה\n' in timeline
+    assert f'התחל ב{PHASE_TITLES[1]} מול הרשות המקומית' in report
+
+
+def test_licenses_checklist_and_costs_follow_the_requirements(engine):
+    report = engine.render(_survey(), _responses(['size_001', 'gen_001']))
+
+    assert '#### 1. מטף כיבוי\n' in report
+    assert '#### 2. רישיון עסק\n' in report
+    assert '- **למה זה חשוב**: סיבה gen_001\n- **תיאור**: רישיון עסק כללי\n' in report
+    assert '- [ ] מטף כיבוי - מול כבאות והצלה\n- [ ] רישיון עסק - מול הרשות המקומית\n' in report
+    # Undefined costs are listed with the license but left out of the cost section
+    costs = _section(report, 4)
+    assert '- **רישיון עסק**: 500 ש"ח\n' in costs
+    assert 'מטף כיבוי' not in costs
+
+
+def test_narrative_is_only_added_when_given(engine):
+    survey = _survey()
+    requirements = _responses(['gen_001'])
+
+    assert 'המלצות מותאמות' not in engine.render(survey, requirements)
+    assert '#### 💡 המלצות מותאמות\nהתחילו בבקשת הרישיון\n' in engine.render(survey, requirements, "  התחילו בבקשת הרישיון\n")
+
+
+def test_requirements_not_in_the_snapshot_are_rendered_directly(engine):
+    survey = _survey()
+    requirements = _responses(['gen_001', 'size_002'])
+    outside = [requirement.copy(update={'id': requirement.id + '_x'}) for requirement in requirements]
+
+    assert engine.render(survey, outside) == engine.render(survey, requirements)
+    assert engine.estimate(outside) == engine.estimate(requirements)
+
+
+def test_report_without_requirements(engine):
+    report = engine.render(_survey(), [])
+
+    assert '**סך הכל רישיונות ואישורים נדרשים**: 0' in report
+    assert '**המלצה עיקרית**: אין דרישות רלוונטיות' in report
+
+
+def test_fast_mode_never_calls_the_ai(engine):
+    class NoAI:
+        def __getattr__(self, name):
+            raise AssertionError(f"AI processor used: {name}")
+
+    survey = _survey()
+    requirements = _responses(['gen_001', 'size_001'])
+    match = {'snapshot': SimpleNamespace(report_engine=engine), 'relevant_requirements': requirements, 'cached': None}
+
+    assert asyncio.run(survey_api._build_report(survey, match, NoAI(), "fast")) == engine.render(survey, requirements)
+    with pytest.raises(HTTPException):
+        survey_api._check_report_mode("template")
@@ -34,6 +34,85 @@ export const businessLicensingAPI = {
     }
   },
 
+  // Submit survey and receive the report as Server-Sent Events.
+  // Handlers: onRequirements(data), onReportDelta(text), onDone(data), onError(message)
+  submitSurveyStream: async (surveyData, handlers = {}) => {
+    const { onRequirements, onReportDelta, onDone, onError } = handlers;
+    let report = "";
+    let requirementsData = null;
+
+    try {
+      console.log("🚀 Sending survey data (stream):", surveyData);
+
+      const response = await fetch(`${BASE_URL}/survey/submit/stream`, {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+          Accept: "text/event-stream",
+        },
+        body: JSON.stringify(surveyData),
+      });
+
+      if (!response.ok) {
+        const errorBody = await response.json().catch(() => ({}));
+        const message = errorBody.detail || "שגיאה בשליחת הטופס";
+        onError && onError(message);
+        return { success: false, error: message, status: response.status };
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder("utf-8");
+      let buffer = "";
+
+      while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        // SSE events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf("\n\n")) !== -1) {
+          const rawEvent = buffer.slice(0, boundary);
+          buffer = buffer.slice(boundary + 2);
+
+          let eventName = "message";
+          let data = "";
+          rawEvent.split("\n").forEach((line) => {
+            if (line.startsWith("event:")) eventName = line.slice(6).trim();
+            else if (line.startsWith("data:")) data += line.slice(5).trim();
+          });
+          const payload = data ? JSON.parse(data) : {};
+
+          if (eventName === "requirements") {
+            requirementsData = payload;
+            onRequirements && onRequirements(payload);
+          } else if (eventName === "report_delta") {
+            report += payload.text;
+            onReportDelta && onReportDelta(payload.text, report);
+          } else if (eventName === "done") {
+            onDone && onDone(payload);
+          } else if (eventName === "error") {
+            onError && onError(payload.detail);
+            return { success: false, error: payload.detail };
+          }
+        }
+      }
+
+      console.log("✅ Survey stream completed");
+      return {
+        success: true,
+        data: { ...requirementsData, personalized_report: report },
+      };
+    } catch (error) {
+      console.error("❌ Survey stream failed:", error);
+      onError && onError("שגיאה בשליחת הטופס");
+      return {
+        success: false,
+        error: "שגיאה בשליחת הטופס",
+      };
+    }
+  },
+
   // Get system health (test connection)
   getHealth: async () => {
     try {
@@ -73,6 +152,7 @@ export const businessLicensingAPI = {
   },
 };
 
-export const { submitSurvey, getHealth, testConnection } = businessLicensingAPI;
+export const { submitSurvey, submitSurveyStream, getHealth, testConnection } =
+  businessLicensingAPI;
 
 export default businessLicensingAPI;